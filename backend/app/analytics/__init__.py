@@ -0,0 +1 @@
+# Analytics package - 대출/도서/리뷰 컬럼형 스냅샷과 집계 쿼리
@@ -0,0 +1,199 @@
+"""
+Analytics Query - 컬럼형 스냅샷 위의 벡터화 집계
+운영 DB 대신 스냅샷 파일을 NumPy 배열로 읽어 group-by / 집계를 수행한다.
+
+CLI 사용법:
+    python -m app.analytics.query loans-per-category-month
+    python -m app.analytics.query turnover --top 20
+    python -m app.analytics.query loans-per-category-month --since 2026-01 --until 2026-06
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analytics.snapshot import LOAN_STATUS_CODES, latest_snapshot, read_part
+
+
+class Snapshot:
+    """스냅샷 하나에 대한 읽기 도구 (월 범위로 파티션을 골라 필요한 컬럼만 읽음)"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else latest_snapshot()
+
+    def _partitions(self, table: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Path]:
+        directory = self.path / table
+        if not directory.exists():
+            return []
+        paths = []
+        for part_dir in sorted(directory.iterdir()):
+            key, _, value = part_dir.name.partition("=")
+            if key == "month" and ((since and value < since) or (until and value > until)):
+                continue
+            paths.extend(sorted(part_dir.glob("part.*")))
+        return paths
+
+    def read(
+        self,
+        table: str,
+        columns: Sequence[str],
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """테이블의 지정 컬럼을 파티션을 이어 붙여 반환 (since/until: 'YYYY-MM', 포함)"""
+        parts = [read_part(path, list(columns)) for path in self._partitions(table, since, until)]
+        if not parts:
+            return {column: np.array([]) for column in columns}
+        return {column: np.concatenate([part[column] for part in parts]) for column in columns}
+
+
+# ========== 벡터화 group-by ==========
+
+def group_by(keys: Sequence[np.ndarray], values: Optional[np.ndarray] = None, agg: str = "count") -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    여러 키 배열로 묶어 집계. (고유 키 배열 목록, 집계값 배열)을 반환.
+    agg: count | sum | mean | max | min
+    """
+    if not len(keys) or len(keys[0]) == 0:
+        return [np.array([]) for _ in keys], np.array([])
+
+    # 각 키를 정수 코드로 바꾼 뒤 하나의 복합 코드로 합쳐 한 번에 정렬/집계
+    uniques, codes = [], []
+    for key in keys:
+        unique, inverse = np.unique(key, return_inverse=True)
+        uniques.append(unique)
+        codes.append(inverse.astype(np.int64))
+    combined = np.ravel_multi_index(codes, [len(u) for u in uniques])
+    group_codes, group_index = np.unique(combined, return_inverse=True)
+
+    counts = np.bincount(group_index)
+    if agg == "count":
+        result = counts
+    elif agg in ("sum", "mean"):
+        sums = np.bincount(group_index, weights=values.astype(np.float64))
+        result = sums if agg == "sum" else sums / counts
+    elif agg in ("max", "min"):
+        order = np.lexsort((values, group_index))
+        boundaries = np.flatnonzero(np.diff(group_index[order])) + 1
+        if agg == "max":
+            picks = np.append(boundaries - 1, len(order) - 1)
+        else:
+            picks = np.insert(boundaries, 0, 0)
+        result = values[order][picks]
+    else:
+        raise ValueError(f"지원하지 않는 집계 함수: {agg}")
+
+    group_keys = np.unravel_index(group_codes, [len(u) for u in uniques])
+    return [unique[index] for unique, index in zip(uniques, group_keys)], result
+
+
+def lookup(ids: np.ndarray, table_ids: np.ndarray, table_values: np.ndarray, missing=None) -> np.ndarray:
+    """ids에 대응하는 table_values (정렬 + 이진 탐색 조인)"""
+    order = np.argsort(table_ids)
+    sorted_ids = table_ids[order]
+    positions = np.clip(np.searchsorted(sorted_ids, ids), 0, max(len(sorted_ids) - 1, 0))
+    if len(sorted_ids) == 0:
+        return np.full(len(ids), missing, dtype=object)
+    found = sorted_ids[positions] == ids
+    result = table_values[order][positions]
+    if missing is not None and not found.all():
+        result = np.where(found, result, missing)
+    return result
+
+
+def _months(dates: np.ndarray) -> np.ndarray:
+    return np.datetime_as_string(dates.astype("datetime64[M]"), unit="M")
+
+
+# ========== 분석 쿼리 ==========
+
+def loans_per_category_per_month(snapshot: Snapshot, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+    """월별/카테고리별 대출 건수"""
+    loans = snapshot.read("loans", ["book_id", "loan_date"], since, until)
+    books = snapshot.read("books", ["book_id", "category"])
+    categories = lookup(loans["book_id"], books["book_id"], books["category"], missing="")
+    categories = np.where(categories == "", "미분류", categories)
+    (months, cats), counts = group_by([_months(loans["loan_date"]), categories])
+    return [
+        {"month": str(m), "category": str(c), "loans": int(n)}
+        for m, c, n in zip(months, cats, counts)
+    ]
+
+
+def turnover_per_title(snapshot: Snapshot, top: int = 20, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+    """
+    도서별 회전율 = 기간 내 대출 건수 / 소장 권수.
+    소장 권수는 현재 재고 + 대출 중인 권수로 추정한다.
+    """
+    loans = snapshot.read("loans", ["book_id", "status"], since, until)
+    all_loans = snapshot.read("loans", ["book_id", "status"])
+    books = snapshot.read("books", ["book_id", "title", "stock_quantity"])
+    if len(books["book_id"]) == 0:
+        return []
+
+    size = int(books["book_id"].max()) + 1
+    loan_counts = np.bincount(loans["book_id"].astype(np.int64), minlength=size)
+    borrowed = all_loans["status"] == LOAN_STATUS_CODES["BORROWED"]
+    on_loan = np.bincount(all_loans["book_id"][borrowed].astype(np.int64), minlength=size)
+
+    book_ids = books["book_id"].astype(np.int64)
+    copies = np.maximum(books["stock_quantity"].astype(np.int64), 0) + on_loan[book_ids]
+    counts = loan_counts[book_ids]
+    turnover = counts / np.maximum(copies, 1)
+
+    order = np.argsort(-turnover, kind="stable")[:top]
+    return [
+        {
+            "book_id": int(book_ids[i]),
+            "title": str(books["title"][i]),
+            "loans": int(counts[i]),
+            "copies": int(copies[i]),
+            "turnover": round(float(turnover[i]), 3),
+        }
+        for i in order
+    ]
+
+
+def rating_per_category(snapshot: Snapshot, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+    """카테고리별 평균 평점과 리뷰 수"""
+    reviews = snapshot.read("reviews", ["book_id", "rating"], since, until)
+    books = snapshot.read("books", ["book_id", "category"])
+    categories = lookup(reviews["book_id"], books["book_id"], books["category"], missing="")
+    categories = np.where(categories == "", "미분류", categories)
+    (cats,), averages = group_by([categories], reviews["rating"], agg="mean")
+    (_,), counts = group_by([categories])
+    return [
+        {"category": str(c), "average_rating": round(float(a), 2), "reviews": int(n)}
+        for c, a, n in zip(cats, averages, counts)
+    ]
+
+
+QUERIES = {
+    "loans-per-category-month": loans_per_category_per_month,
+    "turnover": turnover_per_title,
+    "rating-per-category": rating_per_category,
+}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="컬럼형 스냅샷 분석 쿼리")
+    parser.add_argument("query", choices=sorted(QUERIES))
+    parser.add_argument("--snapshot", help="스냅샷 경로 (기본: 최신 스냅샷)")
+    parser.add_argument("--since", help="시작 월 (YYYY-MM)")
+    parser.add_argument("--until", help="종료 월 (YYYY-MM)")
+    parser.add_argument("--top", type=int, default=20, help="turnover 결과 수")
+    args = parser.parse_args(argv)
+
+    snapshot = Snapshot(args.snapshot)
+    kwargs = {"since": args.since, "until": args.until}
+    if args.query == "turnover":
+        kwargs["top"] = args.top
+    print(json.dumps(QUERIES[args.query](snapshot, **kwargs), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Analytics Snapshot - 운영 DB의 loans / books / reviews를 컬럼형 파일로 저장
+pyarrow가 설치되어 있으면 Parquet(zstd), 없으면 NumPy 압축 배열(.npz)로 저장한다.
+loans와 reviews는 월별 파티션으로 나눠 저장해 기간 조건이 있는 분석에서 필요한 파일만 읽는다.
+
+디렉터리 구조:
+    <root>/LATEST                         최신 스냅샷 ID
+    <root>/<snapshot_id>/books/chunk=00000/part.parquet
+    <root>/<snapshot_id>/loans/month=2026-01/part.parquet
+    <root>/<snapshot_id>/reviews/month=2026-01/part.parquet
+
+CLI 사용법:
+    python -m app.analytics.snapshot
+    python -m app.analytics.snapshot --root data/analytics --keep 3
+"""
+import argparse
+import enum
+import json
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Table, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db_models import Book as BookModel, Loan as LoanModel, LoanStatus, Review as ReviewModel
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 선택 의존성
+    pa = None
+    pq = None
+
+YIELD_PER = 5000
+# 월별 파티션이 없는 테이블(books)의 파일당 최대 행 수
+CHUNK_ROWS = 100_000
+LATEST_FILE = "LATEST"
+
+# 상태 값은 작은 정수 코드로 저장
+LOAN_STATUS_CODES = {status.value: code for code, status in enumerate(LoanStatus)}
+
+# 테이블별 저장 컬럼과 NumPy 자료형 (datetime은 초 단위, 결측은 NaT / 정수 결측은 -1)
+TABLE_COLUMNS: Dict[str, Dict[str, str]] = {
+    "books": {
+        "book_id": "int64",
+        "title": "str",
+        "author": "str",
+        "publisher": "str",
+        "published_year": "int32",
+        "category": "str",
+        "stock_quantity": "int32",
+        "created_at": "datetime64[s]",
+    },
+    "loans": {
+        "loan_id": "int64",
+        "user_id": "int64",
+        "book_id": "int64",
+        "loan_date": "datetime64[s]",
+        "due_date": "datetime64[s]",
+        "return_date": "datetime64[s]",
+        "extension_count": "int32",
+        "status": "int8",
+    },
+    "reviews": {
+        "review_id": "int64",
+        "user_id": "int64",
+        "book_id": "int64",
+        "rating": "int8",
+        "created_at": "datetime64[s]",
+    },
+}
+
+# 월별 파티션 기준 컬럼
+PARTITION_COLUMNS = {
+    "loans": "loan_date",
+    "reviews": "created_at",
+}
+
+TABLES = {
+    "books": BookModel.__table__,
+    "loans": LoanModel.__table__,
+    "reviews": ReviewModel.__table__,
+}
+
+
+def storage_format() -> str:
+    return "parquet" if pa is not None else "npz"
+
+
+# ========== 파일 입출력 ==========
+
+def to_arrays(table_name: str, rows: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """행 목록 → 컬럼별 NumPy 배열"""
+    arrays = {}
+    for column, dtype in TABLE_COLUMNS[table_name].items():
+        values = [row[column] for row in rows]
+        if dtype == "str":
+            arrays[column] = np.array(["" if v is None else str(v) for v in values], dtype=str)
+        elif dtype.startswith("datetime64"):
+            arrays[column] = np.array(
+                [np.datetime64("NaT") if v is None else np.datetime64(v.replace(tzinfo=None), "s") for v in values],
+                dtype=dtype
+            )
+        else:
+            arrays[column] = np.array([-1 if v is None else v for v in values], dtype=dtype)
+    return arrays
+
+
+def write_part(directory: Path, arrays: Dict[str, np.ndarray]) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    if pa is not None:
+        path = directory / "part.parquet"
+        pq.write_table(pa.table(arrays), path, compression="zstd")
+    else:
+        path = directory / "part.npz"
+        np.savez_compressed(path, **arrays)
+    return path
+
+
+def read_part(path: Path, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """파티션 파일 하나를 컬럼별 배열로 읽기 (필요한 컬럼만)"""
+    if path.suffix == ".parquet":
+        if pq is None:
+            raise RuntimeError("Parquet 스냅샷을 읽으려면 pyarrow가 필요합니다")
+        table = pq.read_table(path, columns=columns)
+        return {name: _arrow_to_numpy(table.column(name)) for name in table.column_names}
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in (columns or data.files)}
+
+
+def _arrow_to_numpy(column) -> np.ndarray:
+    array = column.to_numpy()
+    if array.dtype == object:
+        return array.astype(str)
+    return array
+
+
+# ========== 스냅샷 ==========
+
+def _normalize(row: Dict[str, Any]) -> Dict[str, Any]:
+    row = dict(row)
+    status = row.get("status")
+    if status is not None:
+        value = status.value if isinstance(status, enum.Enum) else status
+        row["status"] = LOAN_STATUS_CODES[value]
+    return row
+
+
+def _iter_rows(db: Session, table: Table, order_by) -> Iterator[Dict[str, Any]]:
+    result = db.execute(select(table).order_by(*order_by).execution_options(yield_per=YIELD_PER))
+    for partition in result.mappings().partitions():
+        for row in partition:
+            yield _normalize(row)
+
+
+def _iter_monthly(rows: Iterator[Dict[str, Any]], column: str) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """기준 컬럼으로 정렬된 행을 월 단위로 묶기 (한 번에 한 달치만 메모리에 유지)"""
+    month, bucket = None, []
+    for row in rows:
+        value = row[column]
+        row_month = value.strftime("%Y-%m") if value else "unknown"
+        if row_month != month and bucket:
+            yield month, bucket
+            bucket = []
+        month = row_month
+        bucket.append(row)
+    if bucket:
+        yield month, bucket
+
+
+def _iter_chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    bucket, index = [], 0
+    for row in rows:
+        bucket.append(row)
+        if len(bucket) >= size:
+            yield f"{index:05d}", bucket
+            bucket, index = [], index + 1
+    if bucket or index == 0:
+        yield f"{index:05d}", bucket
+
+
+def write_snapshot(db: Session, root: Optional[Path] = None, keep: int = 3) -> Dict[str, Any]:
+    """스냅샷 생성 후 LATEST를 교체하고, 오래된 스냅샷은 keep개만 남기고 삭제"""
+    root = Path(root or get_settings().analytics_snapshot_dir)
+    snapshot_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    target = root / snapshot_id
+    staging = root / f".{snapshot_id}.tmp"
+    if staging.exists():
+        shutil.rmtree(staging)
+
+    summary: Dict[str, Any] = {"snapshot_id": snapshot_id, "format": storage_format(), "tables": {}}
+    for name, table in TABLES.items():
+        partition_column = PARTITION_COLUMNS.get(name)
+        primary_key = list(table.primary_key.columns)
+        if partition_column is None:
+            parts = (
+                (f"chunk={chunk}", rows)
+                for chunk, rows in _iter_chunks(_iter_rows(db, table, primary_key), CHUNK_ROWS)
+            )
+        else:
+            ordered = _iter_rows(db, table, [table.c[partition_column], *primary_key])
+            parts = ((f"month={month}", rows) for month, rows in _iter_monthly(ordered, partition_column))
+        row_count, partitions = 0, 0
+        for partition, rows in parts:
+            write_part(staging / name / partition, to_arrays(name, rows))
+            row_count += len(rows)
+            partitions += 1
+        summary["tables"][name] = {"rows": row_count, "partitions": partitions}
+
+    (staging / "manifest.json").write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    staging.rename(target)
+    (root / LATEST_FILE).write_text(snapshot_id, encoding="utf-8")
+
+    # 오래된 스냅샷 정리
+    snapshots = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in snapshots[:-keep] if keep > 0 else []:
+        shutil.rmtree(old, ignore_errors=True)
+
+    summary["path"] = str(target)
+    return summary
+
+
+def latest_snapshot(root: Optional[Path] = None) -> Path:
+    root = Path(root or get_settings().analytics_snapshot_dir)
+    latest = root / LATEST_FILE
+    if not latest.exists():
+        raise FileNotFoundError(f"스냅샷이 없습니다: {root} (python -m app.analytics.snapshot 실행 필요)")
+    return root / latest.read_text(encoding="utf-8").strip()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="대출/도서/리뷰 컬럼형 스냅샷 생성")
+    parser.add_argument("--root", help="스냅샷 저장 경로 (기본: ANALYTICS_SNAPSHOT_DIR)")
+    parser.add_argument("--keep", type=int, default=3, help="보관할 스냅샷 수")
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        summary = write_snapshot(db, Path(args.root) if args.root else None, keep=args.keep)
+    finally:
+        db.close()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
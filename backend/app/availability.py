@@ -0,0 +1,160 @@
+"""
+Availability - 도서 재고 변경 실시간 알림 (프로세스 내 pub/sub)
+outbox의 도서 변경 이벤트 중 재고가 바뀐 것만 골라, 해당 도서를 구독 중인 연결에만 이벤트를 전달한다.
+대출/반납/예약/관리자 수정 등 어느 경로로 재고가 바뀌어도 커밋된 변경만 알림이 나간다.
+
+연결별 백프레셔: 연결마다 도서 ID별로 마지막 이벤트 하나만 보관하고(delta는 합산),
+전송이 밀리면 같은 도서의 이벤트를 합쳐 보낸다. 느린 연결의 메모리 사용은 구독 도서 수로 제한되고
+다른 연결이나 publish 하는 쪽을 기다리게 하지 않는다.
+
+워커 프로세스가 여러 개여도 각 프로세스가 outbox를 직접 읽으므로 다른 프로세스에서 처리된 변경도 전달된다.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.outbox import OutboxEvent, outbox_dispatcher
+
+logger = logging.getLogger("app.availability")
+
+
+class Subscription:
+    """연결 하나의 구독 상태와 대기 중인 이벤트 (이벤트 루프 스레드에서만 접근)"""
+
+    def __init__(self, max_books: int):
+        self.max_books = max_books
+        self.book_ids: Set[int] = set()
+        self.coalesced = 0
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+
+    def offer(self, event: Dict[str, Any]):
+        book_id = event["book_id"]
+        previous = self._pending.get(book_id)
+        if previous is not None:
+            event = {**event, "delta": previous["delta"] + event["delta"]}
+            self.coalesced += 1
+        self._pending[book_id] = event
+        self._wakeup.set()
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """대기 중인 이벤트를 모두 꺼냄. timeout 동안 이벤트가 없으면 빈 목록 (하트비트용)"""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self._wakeup.clear()
+        return batch
+
+
+class AvailabilityBroker:
+    """도서 ID → 구독 연결 목록 팬아웃"""
+
+    def __init__(self, max_books_per_connection: int = 200):
+        self.max_books_per_connection = max_books_per_connection
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._connections: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    @classmethod
+    def from_settings(cls) -> "AvailabilityBroker":
+        from app.config import get_settings
+        return cls(get_settings().availability_max_books_per_connection)
+
+    # ----- 연결 관리 (이벤트 루프에서 호출) -----
+
+    def open(self) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self.max_books_per_connection)
+        self._connections.add(subscription)
+        return subscription
+
+    def subscribe(self, subscription: Subscription, book_ids: Iterable[int]) -> List[int]:
+        """구독 추가. 연결당 상한을 넘는 ID는 무시하고, 실제로 추가된 ID 목록을 반환"""
+        added = []
+        for book_id in book_ids:
+            if book_id in subscription.book_ids:
+                continue
+            if len(subscription.book_ids) >= subscription.max_books:
+                break
+            subscription.book_ids.add(book_id)
+            self._subscribers[book_id].add(subscription)
+            added.append(book_id)
+        return added
+
+    def unsubscribe(self, subscription: Subscription, book_ids: Iterable[int]):
+        for book_id in book_ids:
+            subscription.book_ids.discard(book_id)
+            subscribers = self._subscribers.get(book_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[book_id]
+
+    def close(self, subscription: Subscription):
+        self.unsubscribe(subscription, list(subscription.book_ids))
+        self._connections.discard(subscription)
+
+    # ----- 발행 (어느 스레드에서든 호출 가능) -----
+
+    def publish(self, book_id: int, stock_quantity: int, delta: int):
+        """커밋된 재고 변경 알림. 요청 스레드/도구 실행 스레드에서 호출되면 이벤트 루프로 넘겨 전달"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        event = {"book_id": book_id, "stock_quantity": stock_quantity, "delta": delta}
+        with self._lock:
+            self.published += 1
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(event)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event: Dict[str, Any]):
+        subscribers = self._subscribers.get(event["book_id"])
+        if not subscribers:
+            return
+        for subscription in subscribers:
+            subscription.offer(event)
+        self.delivered += len(subscribers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self._connections),
+            "subscribed_books": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "coalesced": sum(s.coalesced for s in self._connections),
+        }
+
+
+availability_broker = AvailabilityBroker.from_settings()
+
+
+def publish_stock_changes(events: List[OutboxEvent]):
+    """outbox 소비자 - 재고가 실제로 바뀐 도서 변경만 알림"""
+    for event in events:
+        if event.op != "update":
+            continue
+        change = event.changed("stock_quantity")
+        if change is None or change[0] is None:
+            continue
+        previous, current = change
+        if current != previous:
+            availability_broker.publish(event.entity_id, current, current - previous)
+
+
+# 실시간 알림은 연결된 동안의 변경만 의미가 있으므로 체크포인트를 저장하지 않음
+outbox_dispatcher.register("availability", publish_stock_changes, entities=["books"], durable=False)
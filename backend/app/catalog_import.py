@@ -0,0 +1,328 @@
+"""
+Catalog Import - 대량 도서 등록 (CSV / JSONL / MARC-lite)
+파일을 한 줄씩 읽으면서 BookCreate로 검증하고, 여러 행을 묶어 한 번에 INSERT 한다.
+ISBN 중복은 시작 시 한 번의 쿼리로 읽어 둔 집합으로 확인하므로 행마다 조회하지 않는다.
+
+CLI 사용법:
+    python -m app.catalog_import books.csv
+    python -m app.catalog_import books.jsonl --batch-size 2000 --dry-run
+"""
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db_models import Book as BookModel
+from app.outbox import record_event
+from app.models import BookCreate
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_ERRORS = 100
+
+BOOK_FIELDS = list(BookCreate.model_fields)
+
+# (행 번호, 원본 레코드) 스트림
+Records = Iterator[Tuple[int, Dict[str, Any]]]
+
+
+# ========== 파서 ==========
+
+def iter_csv(stream: IO[str]) -> Records:
+    """CSV: 첫 줄은 헤더 (BookCreate 필드 이름)"""
+    reader = csv.DictReader(stream)
+    for record in reader:
+        # 헤더가 1행이므로 데이터는 2행부터
+        yield reader.line_num, {key.strip(): value for key, value in record.items() if key}
+
+
+def iter_jsonl(stream: IO[str]) -> Records:
+    """JSONL: 한 줄에 도서 하나 (JSON 객체)"""
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, {"__error__": f"JSON 형식 오류: {e.msg}"}
+            continue
+        if not isinstance(record, dict):
+            yield line_no, {"__error__": "JSON 객체가 아닙니다"}
+            continue
+        yield line_no, record
+
+
+# MARC 태그/서브필드 → 도서 필드
+MARC_FIELD_MAP = {
+    ("020", "a"): "isbn",
+    ("245", "a"): "title",
+    ("100", "a"): "author",
+    ("110", "a"): "author",
+    ("260", "b"): "publisher",
+    ("264", "b"): "publisher",
+    ("260", "c"): "published_year",
+    ("264", "c"): "published_year",
+    ("650", "a"): "category",
+    ("520", "a"): "description",
+    ("856", "u"): "cover_image",
+    ("949", "n"): "stock_quantity",  # 로컬 필드: 소장 권수
+}
+
+_MARC_TRAILING = " /:;,."
+_YEAR_PATTERN = re.compile(r"(\d{4})")
+
+
+def iter_marc_lite(stream: IO[str]) -> Records:
+    """
+    MARC-lite: MARC 니모닉(.mrk) 형식의 텍스트. 빈 줄로 레코드를 구분한다.
+        =245  10$a클린 코드 /$c로버트 C. 마틴
+        =100  1\\$a로버트 C. 마틴
+    """
+    record: Dict[str, Any] = {}
+    start_line = 0
+    for line_no, line in enumerate(stream, start=1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            if record:
+                yield start_line, record
+                record = {}
+            continue
+        if not line.startswith("=") or len(line) < 5:
+            continue
+        if not record:
+            start_line = line_no
+        tag = line[1:4]
+        # 태그 뒤 공백 2칸 + 지시기호 2자리 다음부터 서브필드
+        for subfield in line[6:].split("$")[1:]:
+            if not subfield:
+                continue
+            field = MARC_FIELD_MAP.get((tag, subfield[0]))
+            if field and field not in record:
+                record[field] = subfield[1:].strip().rstrip(_MARC_TRAILING).strip()
+    if record:
+        yield start_line, record
+
+
+PARSERS = {
+    "csv": iter_csv,
+    "jsonl": iter_jsonl,
+    "marc": iter_marc_lite,
+}
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".mrk": "marc",
+    ".marc": "marc",
+    ".txt": "marc",
+}
+
+
+def detect_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    """명시한 형식 또는 파일 확장자로 파서 결정"""
+    if fmt:
+        if fmt not in PARSERS:
+            raise ValueError(f"지원하지 않는 형식입니다: {fmt} (csv, jsonl, marc)")
+        return fmt
+    suffix = Path(filename or "").suffix.lower()
+    if suffix not in _EXTENSIONS:
+        raise ValueError("파일 형식을 알 수 없습니다. format 값을 지정해주세요 (csv, jsonl, marc)")
+    return _EXTENSIONS[suffix]
+
+
+# ========== 정규화/검증 ==========
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """빈 문자열 → None, 출판년도/재고 문자열 정리"""
+    data = {}
+    for field in BOOK_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        data[field] = value
+    year = data.get("published_year")
+    if isinstance(year, str):
+        found = _YEAR_PATTERN.search(year)
+        data["published_year"] = int(found.group(1)) if found else year
+    if data.get("stock_quantity") is None:
+        data.pop("stock_quantity")
+    return data
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+# ========== 가져오기 ==========
+
+class ImportReport:
+    """가져오기 결과 (오류는 max_errors개까지만 보관해 메모리를 일정하게 유지)"""
+
+    def __init__(self, max_errors: int = DEFAULT_MAX_ERRORS, dry_run: bool = False):
+        self.max_errors = max_errors
+        self.dry_run = dry_run
+        self.total = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+        self.elapsed_seconds = 0.0
+
+    def add_error(self, row: int, message: str, isbn: Optional[str] = None, duplicate: bool = False):
+        if duplicate:
+            self.duplicates += 1
+        else:
+            self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "isbn": isbn, "error": message})
+
+    def finish(self) -> "ImportReport":
+        self.elapsed_seconds = time.perf_counter() - self._started
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "total": self.total,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed + self.duplicates > len(self.errors),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.total / self.elapsed_seconds) if self.elapsed_seconds else 0,
+        }
+
+
+def load_existing_isbns(db: Session) -> Set[str]:
+    """등록된 ISBN 전체를 한 번의 쿼리로 읽어 옴"""
+    return set(db.execute(select(BookModel.isbn).where(BookModel.isbn.isnot(None))).scalars())
+
+
+def import_books(
+    db: Session,
+    records: Iterable[Tuple[int, Dict[str, Any]]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_errors: int = DEFAULT_MAX_ERRORS,
+    dry_run: bool = False,
+) -> ImportReport:
+    """레코드 스트림을 검증하고 batch_size 단위로 INSERT (배치마다 커밋)"""
+    report = ImportReport(max_errors=max_errors, dry_run=dry_run)
+    known_isbns = load_existing_isbns(db)
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    for row, record in records:
+        report.total += 1
+        if "__error__" in record:
+            report.add_error(row, record["__error__"])
+            continue
+
+        try:
+            book = BookCreate(**normalize_record(record))
+        except ValidationError as e:
+            report.add_error(row, _validation_message(e), record.get("isbn"))
+            continue
+
+        if book.isbn:
+            if book.isbn in known_isbns:
+                report.add_error(row, "이미 등록된 ISBN입니다", book.isbn, duplicate=True)
+                continue
+            known_isbns.add(book.isbn)
+
+        batch.append((row, book.model_dump()))
+        if len(batch) >= batch_size:
+            _flush_batch(db, batch, report)
+            batch = []
+
+    if batch:
+        _flush_batch(db, batch, report)
+    return report.finish()
+
+
+def _flush_batch(db: Session, batch: List[Tuple[int, Dict[str, Any]]], report: ImportReport):
+    """여러 행을 한 번의 INSERT로 저장. 실패하면 행 단위로 다시 시도해 문제 행만 기록"""
+    if report.dry_run:
+        report.inserted += len(batch)
+        return
+    try:
+        # Core INSERT는 flush 이벤트를 거치지 않으므로 outbox 이벤트를 직접 기록하고 그 번호를 변경 순번으로 사용
+        seq = record_event(db, "books", "bulk_insert", {"count": len(batch)})
+        db.execute(insert(BookModel), [{**values, "change_seq": seq} for _, values in batch])
+        db.commit()
+        report.inserted += len(batch)
+    except IntegrityError:
+        db.rollback()
+        for row, values in batch:
+            try:
+                seq = record_event(db, "books", "bulk_insert", {"count": 1})
+                db.execute(insert(BookModel), [{**values, "change_seq": seq}])
+                db.commit()
+                report.inserted += 1
+            except IntegrityError as e:
+                db.rollback()
+                report.add_error(row, f"저장 실패: {e.orig}", values.get("isbn"))
+
+
+def import_file(
+    db: Session,
+    stream: IO[bytes],
+    filename: Optional[str] = None,
+    fmt: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_errors: int = DEFAULT_MAX_ERRORS,
+    dry_run: bool = False,
+) -> ImportReport:
+    """바이너리 파일 스트림을 UTF-8(BOM 허용)로 읽으며 가져오기"""
+    parser = PARSERS[detect_format(filename, fmt)]
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        return import_books(db, parser(text), batch_size=batch_size, max_errors=max_errors, dry_run=dry_run)
+    finally:
+        # 호출 측이 소유한 원본 스트림은 닫지 않음
+        text.detach()
+
+
+# ========== CLI ==========
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="도서 대량 등록 (CSV / JSONL / MARC-lite)")
+    parser.add_argument("path", help="가져올 파일 경로")
+    parser.add_argument("--format", choices=sorted(PARSERS), help="파일 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-errors", type=int, default=DEFAULT_MAX_ERRORS, help="보고서에 남길 최대 오류 수")
+    parser.add_argument("--dry-run", action="store_true", help="검증만 하고 저장하지 않음")
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as f:
+            report = import_file(
+                db, f, filename=args.path, fmt=args.format,
+                batch_size=args.batch_size, max_errors=args.max_errors, dry_run=args.dry_run
+            )
+    finally:
+        db.close()
+
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
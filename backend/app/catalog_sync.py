@@ -0,0 +1,136 @@
+"""
+Catalog Sync - 도서 변경 순번(change_seq)과 삭제 기록(tombstone)
+도서 행이 추가/수정/삭제될 때마다 그 변경의 outbox event_id를 순번으로 붙여, 클라이언트가 마지막으로 받은 위치
+이후의 변경만 가져갈 수 있게 한다 (GET /api/books/changes).
+
+순번을 따로 발급하지 않고 outbox 이벤트 번호를 그대로 쓰므로 전역 카운터 행을 잠그지 않는다. 대신 작은 번호가
+큰 번호보다 늦게 커밋될 수 있어, 조회는 outbox 전달기가 빈 번호 없이 확정한 번호(safe_event_id)까지만 보여준다.
+(전달기가 gap_timeout으로 건너뛴 번호가 나중에 커밋되면 그 변경은 클라이언트에 전달되지 않을 수 있다 -
+outbox stats의 late_events)
+
+ORM 세션은 flush 후처리에서 자동으로 순번을 붙이고, Core INSERT(대량 등록)는 record_event로 받은 번호를 직접 넣는다.
+대량 등록은 한 배치가 같은 순번을 공유하므로 위치 토큰은 "<순번>.<book_id>" 형식이다.
+순번 0은 순번 도입 전부터 있던 도서와 시드 데이터 (전체 동기화에만 포함).
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, event, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db_models import Book as BookModel, BookTombstone, OutboxEvent as OutboxEventModel
+from app.outbox import flushed_events, outbox_dispatcher
+
+Position = Tuple[int, int]  # (순번, book_id) - 이 위치까지 전달함
+
+START: Position = (0, 0)
+
+_books = BookModel.__table__
+_tombstones = BookTombstone.__table__
+
+
+def parse_token(token: str) -> Optional[Position]:
+    """next_token → 위치 (형식이 맞지 않으면 None)"""
+    seq, _, book_id = token.partition(".")
+    try:
+        position = (int(seq), int(book_id))
+    except ValueError:
+        return None
+    return position if min(position) >= 0 else None
+
+
+def format_token(position: Position) -> str:
+    return f"{position[0]}.{position[1]}"
+
+
+def latest_seq(db: Session) -> int:
+    """지금까지 붙은 가장 큰 순번 (이보다 큰 토큰은 이 서버가 발급한 것이 아님)"""
+    return max(
+        db.execute(select(func.max(OutboxEventModel.event_id))).scalar() or 0,
+        db.execute(select(func.max(_books.c.change_seq))).scalar() or 0,
+        db.execute(select(func.max(_tombstones.c.change_seq))).scalar() or 0,
+    )
+
+
+def backfill_seqs(db: Session):
+    """순번이 없는 기존 도서(컬럼 추가 전부터 있던 행)에 순번 0 부여"""
+    db.execute(update(_books).where(_books.c.change_seq.is_(None)).values(change_seq=0))
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _assign_book_seqs(session: Session, flush_context):
+    """flush된 도서에 그 변경의 event_id를 순번으로 기록, 삭제된 도서는 tombstone 기록"""
+    changed: Dict[int, Tuple[BookModel, int]] = {}
+    deleted: Dict[int, int] = {}
+    for book, op, event_id in flushed_events(session, BookModel):
+        if op == "delete":
+            deleted[book.book_id] = event_id
+        else:
+            changed[book.book_id] = (book, event_id)
+    if not changed and not deleted:
+        return
+
+    # 이 트랜잭션이 이미 잠근 행만 갱신 (ORM 변경 추적을 거치지 않도록 Core로 실행)
+    if changed:
+        session.execute(
+            update(_books).where(_books.c.book_id == bindparam("target_id")).values(change_seq=bindparam("seq")),
+            [{"target_id": book_id, "seq": seq} for book_id, (_, seq) in changed.items()]
+        )
+        for book, seq in changed.values():
+            set_committed_value(book, "change_seq", seq)
+    if deleted:
+        existing = set(session.execute(
+            select(_tombstones.c.book_id).where(_tombstones.c.book_id.in_(list(deleted)))
+        ).scalars())
+        fresh = [{"book_id": book_id, "change_seq": seq} for book_id, seq in deleted.items() if book_id not in existing]
+        if fresh:
+            session.execute(insert(_tombstones), fresh)
+        if existing:
+            session.execute(
+                update(_tombstones).where(_tombstones.c.book_id == bindparam("target_id")).values(change_seq=bindparam("seq")),
+                [{"target_id": book_id, "seq": deleted[book_id]} for book_id in existing]
+            )
+
+
+def changes_since(db: Session, since: Position, limit: int) -> Tuple[List[BookModel], List[int], Position, bool]:
+    """
+    since 이후 변경된 도서와 삭제된 도서 ID ((순번, book_id) 순서로 최대 limit건, 확정된 순번까지만).
+    (변경 도서, 삭제 ID, 다음 위치, 더 있는지)를 반환
+    """
+    seq, book_id = since
+    # 전달기가 아직 한 번도 돌지 않았으면 순번 0(기존 도서)까지만
+    visible = outbox_dispatcher.safe_event_id or 0
+
+    def after(table):
+        return and_(
+            or_(table.c.change_seq > seq, and_(table.c.change_seq == seq, table.c.book_id > book_id)),
+            table.c.change_seq <= visible,
+        )
+
+    books = (
+        db.query(BookModel).filter(after(_books))
+        .order_by(BookModel.change_seq, BookModel.book_id).limit(limit + 1).all()
+    )
+    tombstones = db.execute(
+        select(_tombstones.c.book_id, _tombstones.c.change_seq)
+        .where(after(_tombstones))
+        .order_by(_tombstones.c.change_seq, _tombstones.c.book_id)
+        .limit(limit + 1)
+    ).all()
+
+    merged: List[Tuple[Position, Optional[BookModel]]] = sorted(
+        [((book.change_seq, book.book_id), book) for book in books] +
+        [((change_seq, deleted_id), None) for deleted_id, change_seq in tombstones],
+        key=lambda item: item[0]
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    # 같은 페이지에서 삭제 후 재등록된 ID는 최신 상태만 남김
+    latest: Dict[int, Tuple[Position, Optional[BookModel]]] = {}
+    for position, book in merged:
+        latest[position[1]] = (position, book)
+    changed = [book for _, book in sorted(latest.values(), key=lambda v: v[0]) if book is not None]
+    deleted = [deleted_id for deleted_id, (_, book) in latest.items() if book is None]
+    next_position = merged[-1][0] if merged else since
+    return changed, deleted, next_position, has_more
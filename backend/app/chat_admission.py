@@ -0,0 +1,197 @@
+"""
+Chat Admission - AI 챗봇 동시 요청 수 제한과 대기열
+동시에 처리하는 LLM 요청 수를 제한하고, 초과 요청은 사용자별 라운드 로빈 대기열에 넣는다.
+대기열이 가득 차면 Retry-After와 함께 즉시 거절해 요청이 쌓이지 않도록 한다.
+"""
+import asyncio
+import math
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Hashable
+
+from app.config import get_settings
+
+
+class AdmissionRejected(Exception):
+    """대기열 초과 또는 대기 시간 초과로 요청이 거절됨"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+class ChatAdmissionController:
+    """
+    동시 실행 슬롯 + 사용자별 공정 대기열.
+    이벤트 루프 안에서만 사용한다 (스레드 안전하지 않음).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        max_per_user: int,
+        queue_timeout: float,
+    ):
+        self.max_concurrent = max(max_concurrent, 1)
+        self.max_queue = max(max_queue, 0)
+        self.max_per_user = max(max_per_user, 1)
+        self.queue_timeout = queue_timeout
+
+        self._active = 0
+        self._queued = 0
+        # 사용자 키 → 대기 중인 Future 목록 (순서대로 한 명씩 돌아가며 슬롯 배정)
+        self._waiting: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        # 사용자 키 → 실행 중 + 대기 중인 요청 수
+        self._per_user: Dict[Hashable, int] = {}
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.queued_total = 0
+        self.wait_ms_sum = 0.0
+        self.max_wait_ms = 0.0
+        self.service_ms_sum = 0.0
+        self.completed = 0
+
+    @classmethod
+    def from_settings(cls) -> "ChatAdmissionController":
+        settings = get_settings()
+        return cls(
+            max_concurrent=settings.ai_max_concurrent_chats,
+            max_queue=settings.ai_chat_queue_size,
+            max_per_user=settings.ai_chat_max_per_user,
+            queue_timeout=settings.ai_chat_queue_timeout_seconds,
+        )
+
+    # ---------- 슬롯 획득/반환 ----------
+
+    async def acquire(self, key: Hashable, limit_per_user: bool = True) -> float:
+        """
+        슬롯을 얻을 때까지 대기하고, 대기 시간(ms)을 반환.
+        limit_per_user=False이면 키당 요청 수 상한을 적용하지 않는다 (여러 사람이 공유할 수 있는 IP 키 등)
+        """
+        loop = asyncio.get_running_loop()
+
+        if limit_per_user and self._per_user.get(key, 0) >= self.max_per_user:
+            self.rejected += 1
+            raise AdmissionRejected("이전 요청을 처리하는 중입니다. 잠시 후 다시 시도해주세요", self.retry_after())
+
+        if self._active < self.max_concurrent and not self._queued:
+            self._admit(key, 0.0)
+            return 0.0
+
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected("AI 사서가 많은 요청을 처리하고 있습니다. 잠시 후 다시 시도해주세요", self.retry_after())
+
+        future = loop.create_future()
+        self._waiting.setdefault(key, deque()).append(future)
+        self._queued += 1
+        self.queued_total += 1
+        self._per_user[key] = self._per_user.get(key, 0) + 1
+        started = loop.time()
+
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # 취소 직전에 슬롯이 배정된 경우 반환
+                self.release(key)
+            else:
+                self._discard_waiter(key, future)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                self.rejected += 1
+                raise AdmissionRejected("대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요", self.retry_after())
+            raise
+
+        wait_ms = (loop.time() - started) * 1000
+        self._record_wait(wait_ms)
+        return wait_ms
+
+    def release(self, key: Hashable, service_ms: float = 0.0):
+        self._active -= 1
+        self._decrement_user(key)
+        if service_ms:
+            self.service_ms_sum += service_ms
+            self.completed += 1
+        self._grant_next()
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable, limit_per_user: bool = True):
+        """async with chat_admission.slot(key): ... 형태로 슬롯을 점유"""
+        loop = asyncio.get_running_loop()
+        await self.acquire(key, limit_per_user)
+        started = loop.time()
+        try:
+            yield
+        finally:
+            self.release(key, (loop.time() - started) * 1000)
+
+    # ---------- 내부 처리 ----------
+
+    def _admit(self, key: Hashable, wait_ms: float):
+        self._active += 1
+        self._per_user[key] = self._per_user.get(key, 0) + 1
+        self._record_wait(wait_ms)
+
+    def _record_wait(self, wait_ms: float):
+        self.admitted += 1
+        self.wait_ms_sum += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def _grant_next(self):
+        """빈 슬롯을 대기 중인 사용자들에게 한 명씩 돌아가며 배정"""
+        while self._active < self.max_concurrent and self._waiting:
+            key, waiters = self._waiting.popitem(last=False)
+            future = waiters.popleft()
+            if waiters:
+                # 같은 사용자의 다음 요청은 다른 사용자들 뒤로
+                self._waiting[key] = waiters
+            self._queued -= 1
+            self._active += 1
+            future.set_result(None)
+
+    def _discard_waiter(self, key: Hashable, future: asyncio.Future):
+        waiters = self._waiting.get(key)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._waiting[key]
+            self._queued -= 1
+            self._decrement_user(key)
+
+    def _decrement_user(self, key: Hashable):
+        remaining = self._per_user.get(key, 0) - 1
+        if remaining > 0:
+            self._per_user[key] = remaining
+        else:
+            self._per_user.pop(key, None)
+
+    def retry_after(self) -> int:
+        """대기열이 한 바퀴 비워질 때까지의 예상 시간 (초)"""
+        avg_service_s = (self.service_ms_sum / self.completed / 1000) if self.completed else 1.0
+        rounds = (self._queued + 1) / self.max_concurrent
+        return max(1, math.ceil(avg_service_s * rounds))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": self._queued,
+            "max_queue": self.max_queue,
+            "waiting_users": len(self._waiting),
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_ms_avg": round(self.wait_ms_sum / self.admitted, 1) if self.admitted else 0.0,
+            "wait_ms_max": round(self.max_wait_ms, 1),
+            "service_ms_avg": round(self.service_ms_sum / self.completed, 1) if self.completed else 0.0,
+            "retry_after_seconds": self.retry_after(),
+        }
+
+
+chat_admission = ChatAdmissionController.from_settings()
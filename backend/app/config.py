@@ -20,14 +20,104 @@ class Settings(BaseSettings):
     database_name: str = "ibd_library"
     database_user: str = "root"
     database_password: str = ""
+    database_url: str = ""  # 전체 접속 URL (지정하면 위 MySQL 설정 대신 사용, 예: sqlite:///data/library.db)
+    
+    # SQLite (DATABASE_URL이 sqlite:///일 때 - 소규모 지점용 단일 프로세스 배포)
+    sqlite_journal_mode: str = "WAL"  # WAL: 읽기와 쓰기가 서로 막지 않음
+    sqlite_synchronous: str = "NORMAL"  # WAL에서는 NORMAL도 손상 없음 (전원 장애 시 마지막 커밋만 유실 가능)
+    sqlite_busy_timeout_ms: int = 5000  # 쓰기 잠금 대기 시간
+    sqlite_mmap_size_mb: int = 256  # 메모리 매핑 읽기 크기 (0이면 사용 안 함)
+    sqlite_cache_size_mb: int = 64  # 연결당 페이지 캐시 크기
     
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     debug: bool = True
     
+    # Auth
+    auth_secret_key: str = ""  # 토큰 서명 키 (비우면 프로세스마다 임시 키 사용)
+    auth_token_ttl_minutes: int = 720  # 토큰 유효 시간
+    password_hash_n: int = 2 ** 14  # scrypt CPU/메모리 비용 (2의 거듭제곱)
+    password_hash_r: int = 8  # scrypt 블록 크기
+    password_hash_p: int = 1  # scrypt 병렬화 계수
+    password_hash_workers: int = 4  # 해싱 워커 수
+    password_hash_executor: str = "thread"  # thread | process
+    
+    # AI Chat
+    llm_provider: str = "gemini"  # gemini | fake (오프라인 부하 테스트용)
+    fake_llm_latency_ms: float = 0.0  # fake 제공자의 응답 지연
+    fake_llm_stream_chunk_chars: int = 16  # fake 제공자의 스트리밍 청크 크기 (글자)
+    fake_llm_stream_delay_ms: float = 0.0  # fake 제공자의 스트리밍 청크 간격
+    fake_llm_script: str = ""  # fake 제공자 시나리오 JSON 파일 경로 (비우면 기본 시나리오)
+    ai_max_tool_iterations: int = 4  # 한 요청에서 허용하는 도구 호출 라운드 수
+    ai_chat_timeout_seconds: float = 30.0  # 한 요청의 전체 LLM/도구 처리 시간 상한
+    ai_prompt_token_budget: int = 6000  # 프롬프트 토큰 상한 (초과 시 RAG 컨텍스트 축소, 0이면 무제한)
+    ai_cost_per_1k_prompt_tokens: float = 0.0  # 비용 집계용 단가 (입력 1K 토큰당)
+    ai_cost_per_1k_response_tokens: float = 0.0  # 비용 집계용 단가 (출력 1K 토큰당)
+    ai_max_concurrent_chats: int = 8  # 동시에 처리하는 챗봇 요청 수
+    ai_chat_queue_size: int = 32  # 대기열 길이 (초과 시 429)
+    ai_chat_max_per_user: int = 2  # 로그인 사용자당 실행 + 대기 중 요청 수 상한 (비로그인 IP 키에는 적용 안 함)
+    ai_chat_queue_timeout_seconds: float = 10.0  # 대기열 최대 대기 시간
+    
+    # Holds
+    hold_max_per_user: int = 5  # 사용자당 대기/배정 중인 예약 수 상한
+    hold_pickup_days: int = 3  # 배정된 도서의 수령 기한 (일)
+    hold_expiry_interval_minutes: float = 10.0  # 수령 기한 만료 처리 주기 (0이면 자동 처리 안 함)
+    
+    # Availability Push
+    availability_max_books_per_connection: int = 200  # 연결 하나가 구독할 수 있는 도서 수
+    availability_heartbeat_seconds: float = 15.0  # SSE 하트비트 간격
+    
+    # Outbox
+    outbox_poll_interval_seconds: float = 2.0  # 커밋 알림이 없을 때 새 이벤트를 확인하는 주기
+    outbox_batch_size: int = 500  # 소비자에게 한 번에 전달하는 이벤트 수
+    outbox_gap_timeout_seconds: float = 2.0  # 트랜잭션이 끝났는지 확인할 수 없는 빈 이벤트 번호를 기다리는 최대 시간
+    outbox_gap_recheck_seconds: float = 300.0  # 건너뛴 빈 번호가 늦게 커밋되는지 다시 확인하는 기간
+    outbox_retention_days: int = 7  # 모든 소비자가 처리한 이벤트 보관 기간 (일)
+    
+    # HTTP Cache
+    http_cache_enabled: bool = True  # 공개 도서/리뷰 조회에 ETag / Last-Modified / Cache-Control 적용
+    http_cache_max_age_seconds: int = 5  # 브라우저/프록시가 재검증 없이 쓰는 시간
+    http_cache_stale_while_revalidate_seconds: int = 30  # max-age 이후 백그라운드 재검증하며 이전 응답을 쓰는 시간
+    http_cache_max_tracked_rows: int = 100000  # 행별 버전을 기억하는 최대 수 (넘으면 전체 버전을 올리고 비움)
+    
+    # Compression
+    compression_enabled: bool = True  # 응답 gzip/br 압축
+    compression_min_size_bytes: int = 1024  # 이보다 작은 응답은 압축하지 않음 (스트리밍 응답은 항상 압축)
+    compression_gzip_level: int = 6  # gzip 압축 수준 (1~9)
+    compression_brotli_quality: int = 4  # brotli 품질 (0~11, brotli 설치 시)
+    
+    # Read Cache
+    read_cache_enabled: bool = True  # 도서 상세/목록 조회 결과를 프로세스 메모리에 캐시
+    read_cache_ttl_seconds: float = 30.0  # 캐시 항목 유효 시간 (변경 시에는 outbox 이벤트로 즉시 무효화)
+    read_cache_max_entries: int = 10000  # 최대 항목 수 (넘으면 가장 오래 안 쓴 항목부터 제거)
+    
+    # Jobs
+    job_workers: int = 2  # 프로세스당 동시에 실행하는 백그라운드 작업 수 (0이면 이 프로세스는 작업을 실행하지 않음)
+    job_poll_interval_seconds: float = 2.0  # 새 작업/주기 작업 확인 간격
+    job_lease_seconds: float = 300.0  # 작업 실행 권한 유지 시간 (실행 중 1/3마다 연장, 만료되면 다른 워커가 가져감)
+    job_max_attempts: int = 3  # 실패 시 최대 시도 횟수
+    job_retry_base_seconds: float = 30.0  # 재시도 대기 시간 (시도마다 2배)
+    job_retention_days: int = 30  # 끝난 작업 기록 보관 기간 (일)
+    job_upload_dir: str = "data/uploads"  # 백그라운드 가져오기용 업로드 파일 임시 저장 경로
+    outbox_prune_interval_minutes: float = 60.0  # 처리된 outbox 이벤트 정리 주기 (0이면 정리 안 함)
+    analytics_snapshot_interval_hours: float = 0.0  # 분석 스냅샷 자동 생성 주기 (0이면 수동 실행만)
+    
+    # Deletes
+    purge_inline_max_rows: int = 1000  # 딸린 대출/리뷰/예약이 이보다 많은 회원/도서는 백그라운드 작업으로 나눠 삭제 (202)
+    purge_batch_size: int = 1000  # 백그라운드 삭제에서 한 번에 지우고 커밋하는 행 수
+
+    # Admin Dashboard
+    stats_rollup_days: int = 90  # 일별 집계 재계산 범위 / 활동 사용자 보관 기간 (일)
+    stats_reconcile_interval_minutes: float = 60.0  # 집계 재계산 주기 (0이면 자동 재계산 안 함)
+    
+    # Analytics
+    analytics_snapshot_dir: str = "data/analytics"  # 컬럼형 스냅샷 저장 경로
+    
     @property
-    def database_url(self) -> str:
+    def sqlalchemy_url(self) -> str:
+        if self.database_url:
+            return self.database_url
         # 특수문자 URL 인코딩
         encoded_password = quote_plus(self.database_password)
         return f"mysql+pymysql://{self.database_user}:{encoded_password}@{self.database_host}:{self.database_port}/{self.database_name}"
@@ -1,16 +1,125 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from pathlib import Path
 
-from app.config import get_settings
+from fastapi import Depends
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+
+from app.config import Settings, get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=settings.debug
-)
+
+def _create_engine(settings: Settings) -> Engine:
+    url = make_url(settings.sqlalchemy_url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url, pool_pre_ping=True, pool_recycle=3600, echo=settings.debug)
+
+    pool_options = {}
+    if url.database and url.database != ":memory:":
+        Path(url.database).parent.mkdir(parents=True, exist_ok=True)
+        # 파일 연결은 싸므로 풀 대기 없이 초과 연결을 허용 (async 라우트가 이벤트 루프에서 풀을 기다리며 멈추지 않도록)
+        pool_options = {"pool_size": 20, "max_overflow": -1}
+    sqlite_engine = create_engine(
+        url,
+        # 요청 스레드풀 / 작업 스레드에서 연결을 나눠 씀
+        connect_args={"check_same_thread": False},
+        echo=settings.debug,
+        **pool_options
+    )
+    _configure_sqlite(sqlite_engine, settings)
+    return sqlite_engine
+
+
+def _configure_sqlite(sqlite_engine: Engine, settings: Settings):
+    """
+    SQLite 프로필 - 연결마다 PRAGMA 적용, 트랜잭션 시작을 직접 제어.
+    pysqlite 드라이버는 BEGIN을 쓰기 직전에야 보내므로 드라이버의 트랜잭션 처리를 끄고 SQLAlchemy의 begin 시점에 BEGIN을 보낸다.
+    """
+    pragmas = [
+        f"journal_mode={settings.sqlite_journal_mode}",
+        f"synchronous={settings.sqlite_synchronous}",
+        f"busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}",
+        f"cache_size={-settings.sqlite_cache_size_mb * 1024}",  # 음수 = KiB 단위
+        "foreign_keys=ON",  # ON DELETE CASCADE 등 외래 키 제약 (SQLite 기본값은 OFF)
+        "temp_store=MEMORY",
+    ]
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    @event.listens_for(sqlite_engine, "begin")
+    def _on_begin(conn):
+        conn.info["sqlite_write_locked"] = False
+        conn.connection.dbapi_connection.execute("BEGIN")
+
+    @event.listens_for(sqlite_engine, "before_cursor_execute")
+    def _lock_before_write(conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get("sqlite_write_locked") and statement.lstrip()[:6].upper() in _SQLITE_WRITE_STATEMENTS:
+            _begin_immediate(conn)
+
+
+# 쓰기 잠금이 필요한 문장 (앞 6글자 기준)
+_SQLITE_WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLAC", "CREATE", "ALTER ", "DROP T", "DROP I")
+
+
+def _begin_immediate(conn):
+    """
+    읽기만 한 트랜잭션을 BEGIN IMMEDIATE로 다시 시작해 DB 쓰기 잠금을 먼저 잡는다.
+    WAL에서 읽기 트랜잭션이 쓰기로 올라갈 때 다른 쓰기와 겹치면 busy_timeout을 기다리지 않고 바로 "database is locked"가 나므로,
+    첫 쓰기 직전에 잠금을 기다리며 새로 시작한다. 아직 쓴 내용이 없으므로 COMMIT은 읽기 스냅샷만 놓는다.
+    주의: 그 전에 읽은 값은 잠금을 잡는 사이 다른 트랜잭션이 바꿨을 수 있다. 읽고 판단한 뒤 쓰는 코드는
+    lock_for_write 세션(쓰기 요청은 get_write_db)을 쓰거나 lock_book 같은 FOR UPDATE 조회 뒤에 다시 읽어야 한다.
+    """
+    dbapi_connection = conn.connection.dbapi_connection
+    if dbapi_connection.in_transaction:
+        dbapi_connection.execute("COMMIT")
+    dbapi_connection.execute("BEGIN IMMEDIATE")
+    conn.info["sqlite_write_locked"] = True
+
+
+_WRITE_SESSION_KEY = "write_session"
+
+
+def lock_for_write(db: Session) -> Session:
+    """
+    다음 트랜잭션을 쓰기 트랜잭션으로 표시 - SQLite에서는 첫 조회 전에 쓰기 잠금을 잡는다.
+    조회부터 커밋까지 다른 쓰기와 직렬화되므로 읽고 판단한 값(재고, 중복 여부 등)이 쓰는 시점에도 그대로다.
+    표시는 커밋/롤백하면 풀린다 (커밋 후 응답용 refresh가 응답을 보내는 동안 쓰기 잠금을 잡고 있지 않도록).
+    MySQL에서는 아무것도 하지 않는다 (행 단위 직렬화는 lock_book 등 FOR UPDATE 조회로).
+    """
+    db.info[_WRITE_SESSION_KEY] = True
+    return db
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _end_write_transaction(session: Session):
+    session.info.pop(_WRITE_SESSION_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _sqlite_write_lock(orm_execute_state):
+    """
+    SQLite에는 SELECT ... FOR UPDATE가 없으므로 FOR UPDATE 조회나 쓰기 세션의 첫 조회 전에 쓰기 잠금을 잡는다.
+    이후 조회는 최신 커밋을 읽고 다른 쓰기 트랜잭션은 커밋까지 기다린다 (InnoDB의 FOR UPDATE와 같은 효과).
+    """
+    session = orm_execute_state.session
+    for_update = orm_execute_state.is_select and getattr(orm_execute_state.statement, "_for_update_arg", None) is not None
+    if not for_update and not session.info.get(_WRITE_SESSION_KEY):
+        return
+    conn = session.connection()
+    if conn.dialect.name == "sqlite" and not conn.info.get("sqlite_write_locked"):
+        _begin_immediate(conn)
+
+
+engine = _create_engine(settings)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -28,7 +137,54 @@ def get_db():
         db.close()
 
 
+async def get_write_db(db: Session = Depends(get_db)):
+    """
+    쓰기 요청용 세션 의존성 (lock_for_write - 읽고 판단한 뒤 쓰는 라우트). Depends(get_write_db, scope="function")로 사용.
+    경로 함수가 커밋하지 않고 반환하거나 예외를 던지면(실패 응답 등) 응답을 보내기 전에 롤백해 쓰기 잠금을 놓는다.
+    async로 두어 경로 함수가 끝난 뒤 다른 요청으로 넘어가지 않고 바로 롤백한다 (스레드풀을 기다리는 사이
+    다른 쓰기 요청이 이벤트 루프를 막고 SQLite 잠금을 기다리면 서로 busy_timeout까지 멈춤).
+    """
+    lock_for_write(db)
+    try:
+        yield db
+    finally:
+        if db.info.pop(_WRITE_SESSION_KEY, None) and db.in_transaction():
+            db.rollback()
+
+
+def add_missing_columns():
+    """
+    모델에 새로 추가된 컬럼을 기존 테이블에 반영 (create_all은 이미 있는 테이블을 변경하지 않음).
+    추가 컬럼은 모두 nullable이어야 하며, 해당 컬럼의 인덱스도 함께 만든다.
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"))
+                for index in table.indexes:
+                    if column.name in index.columns:
+                        index.create(conn, checkfirst=True)
+
+
 def init_db():
     """데이터베이스 테이블 생성"""
     from app import db_models  # 모델 import로 테이블 등록
+    from app.catalog_sync import backfill_seqs
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    
+    # 순번이 없는 기존 도서에 순번 부여 (증분 동기화의 전체 동기화에 포함)
+    db = SessionLocal()
+    try:
+        backfill_seqs(db)
+        db.commit()
+    finally:
+        db.close()
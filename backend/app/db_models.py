@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Enum as SQLEnum, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import BigInteger, Column, Integer, String, Text, Enum as SQLEnum, Date, DateTime, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -18,12 +18,29 @@ class LoanStatus(str, enum.Enum):
     OVERDUE = "OVERDUE"
 
 
+class HoldStatus(str, enum.Enum):
+    WAITING = "WAITING"        # 대기 중
+    READY = "READY"            # 반납된 도서가 배정되어 수령 대기
+    FULFILLED = "FULFILLED"    # 대출로 전환
+    CANCELLED = "CANCELLED"
+    EXPIRED = "EXPIRED"        # 수령 기한 초과
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"          # 실행 대기 (재시도 대기 포함)
+    RUNNING = "RUNNING"        # 워커가 실행 중
+    SUCCEEDED = "SUCCEEDED"    # 완료
+    FAILED = "FAILED"          # 재시도 횟수 초과
+    CANCELLED = "CANCELLED"    # 관리자가 취소
+
+
 # Users 테이블
 class User(Base):
     __tablename__ = "users"
     
     user_id = Column(Integer, primary_key=True, autoincrement=True, comment="사용자 고유 ID")
-    email = Column(String(100), nullable=False, unique=True, comment="로그인 ID (이메일)")
+    # MySQL 기본 collation처럼 SQLite에서도 대소문자 구분 없이 비교/중복 검사
+    email = Column(String(100).with_variant(String(100, collation="NOCASE"), "sqlite"), nullable=False, unique=True, comment="로그인 ID (이메일)")
     password = Column(String(255), nullable=False, comment="암호화된 비밀번호")
     name = Column(String(50), nullable=False, comment="사용자 이름")
     phone = Column(String(20), nullable=True, comment="전화번호")
@@ -31,9 +48,9 @@ class User(Base):
     role = Column(SQLEnum(UserRole), default=UserRole.MEMBER, comment="역할 (일반회원/사서)")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="가입일")
     
-    # Relationships
-    loans = relationship("Loan", back_populates="user", cascade="all, delete-orphan")
-    reviews = relationship("Review", back_populates="user", cascade="all, delete-orphan")
+    # Relationships (삭제 시 딸린 행은 DB의 ON DELETE CASCADE로 지움 - 메모리로 읽지 않음, app/purge.py)
+    loans = relationship("Loan", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    reviews = relationship("Review", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<User(user_id={self.user_id}, email='{self.email}', name='{self.name}')>"
@@ -54,10 +71,11 @@ class Book(Base):
     stock_quantity = Column(Integer, default=1, comment="현재 대출 가능한 재고 수량")
     cover_image = Column(String(255), nullable=True, comment="표지 이미지 URL")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="등록일")
+    change_seq = Column(BigInteger, nullable=True, index=True, comment="마지막 변경의 outbox event_id (증분 동기화용, 0은 기존 데이터)")
     
-    # Relationships
-    loans = relationship("Loan", back_populates="book", cascade="all, delete-orphan")
-    reviews = relationship("Review", back_populates="book", cascade="all, delete-orphan")
+    # Relationships (삭제 시 딸린 행은 DB의 ON DELETE CASCADE로 지움 - 메모리로 읽지 않음, app/purge.py)
+    loans = relationship("Loan", back_populates="book", cascade="all, delete-orphan", passive_deletes=True)
+    reviews = relationship("Review", back_populates="book", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Book(book_id={self.book_id}, title='{self.title}')>"
@@ -107,6 +125,111 @@ class Review(Base):
         return f"<Review(review_id={self.review_id}, rating={self.rating})>"
 
 
+# Book Tombstones 테이블 (삭제된 도서 - 증분 동기화에서 삭제를 전달)
+class BookTombstone(Base):
+    __tablename__ = "book_tombstones"
+    
+    book_id = Column(Integer, primary_key=True, autoincrement=False, comment="삭제된 도서 ID")
+    change_seq = Column(BigInteger, nullable=False, index=True, comment="삭제 이벤트의 outbox event_id")
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), comment="삭제일")
+
+
+# Outbox Events 테이블 (도서/대출/리뷰 변경 이벤트 - 변경과 같은 트랜잭션에서 기록)
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+    
+    event_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True, comment="이벤트 순번")
+    entity = Column(String(30), nullable=False, comment="대상 테이블 (books, loans, reviews)")
+    entity_id = Column(Integer, nullable=True, comment="대상 행 ID")
+    op = Column(String(20), nullable=False, comment="insert | update | delete | bulk_insert")
+    payload = Column(Text, nullable=False, comment="이벤트 내용 (JSON)")
+    created_at = Column(DateTime, nullable=False, comment="기록 일시")
+    
+    __table_args__ = (
+        Index("ix_outbox_events_entity_id", "entity", "event_id"),
+    )
+
+
+# Outbox Checkpoints 테이블 (소비자별 마지막 처리 이벤트)
+class OutboxCheckpoint(Base):
+    __tablename__ = "outbox_checkpoints"
+    
+    consumer = Column(String(50), primary_key=True, comment="소비자 이름")
+    last_event_id = Column(BigInteger, nullable=False, default=0, comment="마지막으로 처리한 이벤트 순번")
+    updated_at = Column(DateTime, nullable=True, comment="갱신 일시")
+
+
+# Holds 테이블 (재고 없는 도서의 예약 대기열)
+class Hold(Base):
+    __tablename__ = "holds"
+    
+    hold_id = Column(Integer, primary_key=True, autoincrement=True, comment="예약 고유 ID")
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, comment="예약한 사용자 ID")
+    book_id = Column(Integer, ForeignKey("books.book_id", ondelete="CASCADE"), nullable=False, comment="예약한 도서 ID")
+    queue_seq = Column(Integer, nullable=False, comment="도서별 대기 순번 (hold_queues.head_seq 기준 상대 위치)")
+    status = Column(SQLEnum(HoldStatus), default=HoldStatus.WAITING, nullable=False, comment="예약 상태")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="예약일")
+    ready_at = Column(DateTime(timezone=True), nullable=True, comment="도서 배정 일시")
+    expires_at = Column(DateTime(timezone=True), nullable=True, comment="수령 기한")
+    
+    __table_args__ = (
+        Index("ix_holds_book_status_seq", "book_id", "status", "queue_seq"),
+        Index("ix_holds_user_status", "user_id", "status"),
+        Index("ix_holds_status_expires", "status", "expires_at"),
+    )
+    
+    def __repr__(self):
+        return f"<Hold(hold_id={self.hold_id}, book_id={self.book_id}, status={self.status})>"
+
+
+# Hold Queues 테이블 (도서별 대기열 포인터 - 대기 순번 = queue_seq - head_seq + 1)
+class HoldQueue(Base):
+    __tablename__ = "hold_queues"
+    
+    book_id = Column(Integer, ForeignKey("books.book_id", ondelete="CASCADE"), primary_key=True, comment="도서 ID")
+    head_seq = Column(Integer, nullable=False, default=0, comment="다음에 배정받을 예약의 순번")
+    tail_seq = Column(Integer, nullable=False, default=0, comment="다음에 추가될 예약의 순번")
+
+
+# Jobs 테이블 (백그라운드 작업 큐 - 외부 브로커 없이 DB로 관리, app/jobs.py)
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    job_id = Column(Integer, primary_key=True, autoincrement=True, comment="작업 고유 ID")
+    kind = Column(String(50), nullable=False, comment="작업 종류 (등록된 핸들러 이름)")
+    payload = Column(Text, nullable=False, default="{}", comment="작업 인자 (JSON)")
+    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED, nullable=False, comment="작업 상태")
+    attempts = Column(Integer, nullable=False, default=0, comment="실행 시도 횟수")
+    max_attempts = Column(Integer, nullable=False, default=3, comment="최대 시도 횟수")
+    run_after = Column(DateTime, nullable=False, comment="이 시각 이후 실행 (재시도 대기)")
+    locked_by = Column(String(100), nullable=True, comment="실행 중인 워커 ID")
+    lease_expires_at = Column(DateTime, nullable=True, comment="실행 권한 만료 시각 (지나면 다른 워커가 가져감)")
+    result = Column(Text, nullable=True, comment="실행 결과 (JSON)")
+    last_error = Column(Text, nullable=True, comment="마지막 오류")
+    created_at = Column(DateTime, nullable=False, comment="등록 일시")
+    started_at = Column(DateTime, nullable=True, comment="마지막 실행 시작 일시")
+    finished_at = Column(DateTime, nullable=True, comment="완료 일시")
+    
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_kind_status", "kind", "status"),
+    )
+    
+    def __repr__(self):
+        return f"<Job(job_id={self.job_id}, kind='{self.kind}', status={self.status})>"
+
+
+# Job Schedules 테이블 (주기 작업 - next_run_at을 조건부 UPDATE로 넘긴 워커 하나만 작업을 등록)
+class JobSchedule(Base):
+    __tablename__ = "job_schedules"
+    
+    name = Column(String(50), primary_key=True, comment="스케줄 이름")
+    kind = Column(String(50), nullable=False, comment="등록할 작업 종류")
+    interval_seconds = Column(Integer, nullable=False, comment="실행 간격 (초)")
+    next_run_at = Column(DateTime, nullable=False, comment="다음 실행 시각")
+    last_job_id = Column(Integer, nullable=True, comment="마지막으로 등록한 작업 ID")
+
+
 # System Config 테이블 (싱글톤 패턴처럼 키-값 저장)
 class SystemConfig(Base):
     __tablename__ = "system_config"
@@ -117,3 +240,50 @@ class SystemConfig(Base):
 
     def __repr__(self):
         return f"<SystemConfig(key='{self.key}', value='{self.value}')>"
+
+
+# ==================== 대시보드 집계(롤업) 테이블 ====================
+# 대출/반납 시 같은 트랜잭션에서 증분 갱신하고, 주기적으로 원본 테이블과 재계산해 맞춘다 (app/rollups.py)
+
+# 일별 대출/반납 건수
+class DailyLoanStat(Base):
+    __tablename__ = "stat_daily_loans"
+
+    stat_date = Column(Date, primary_key=True, comment="집계 일자")
+    loans = Column(Integer, nullable=False, default=0, comment="대출 건수")
+    returns = Column(Integer, nullable=False, default=0, comment="반납 건수")
+
+
+# 일별 활동(대출/반납) 사용자 - 보관 기간이 지난 행은 재계산 시 삭제
+class DailyActiveUser(Base):
+    __tablename__ = "stat_daily_active_users"
+
+    stat_date = Column(Date, primary_key=True, comment="집계 일자")
+    user_id = Column(Integer, primary_key=True, comment="활동한 사용자 ID")
+
+
+# 반납 예정일별 대출 중 건수 (오늘 이전 행의 합 = 연체 건수)
+class DueDateStat(Base):
+    __tablename__ = "stat_due_dates"
+
+    due_date = Column(Date, primary_key=True, comment="반납 예정일")
+    active_loans = Column(Integer, nullable=False, default=0, comment="대출 중 건수")
+
+
+# 도서별 누적/현재 대출 건수
+class BookLoanStat(Base):
+    __tablename__ = "stat_book_loans"
+
+    book_id = Column(Integer, ForeignKey("books.book_id", ondelete="CASCADE"), primary_key=True, comment="도서 ID")
+    total_loans = Column(Integer, nullable=False, default=0, index=True, comment="누적 대출 건수")
+    active_loans = Column(Integer, nullable=False, default=0, comment="대출 중 건수")
+
+
+# 카테고리별 대출 현황 (미분류는 빈 문자열)
+class CategoryLoanStat(Base):
+    __tablename__ = "stat_category_loans"
+
+    category = Column(String(50), primary_key=True, comment="카테고리")
+    total_loans = Column(Integer, nullable=False, default=0, comment="누적 대출 건수")
+    active_loans = Column(Integer, nullable=False, default=0, comment="대출 중 건수")
+    total_copies = Column(Integer, nullable=False, default=0, comment="소장 권수 (재계산 시 갱신)")
@@ -0,0 +1,195 @@
+"""
+Holds - 재고 없는 도서의 예약 대기열 (도서별 FIFO)
+대기 순번은 hold_queues의 head/tail 포인터로 계산하므로 대기열을 훑지 않는다.
+    - 예약: queue_seq = tail_seq, tail_seq += 1
+    - 배정: queue_seq == head_seq 인 예약을 READY로, head_seq += 1
+    - 대기 중 취소: 뒤 순번들을 1씩 당겨 순번이 연속되도록 유지 (취소는 순번 조회보다 드묾)
+대기열 변경은 항상 도서 행을 잠근(SELECT ... FOR UPDATE) 트랜잭션 안에서 처리하고, 커밋은 호출 측이 한다.
+반납된 도서는 다음 예약자에게 배정되어 재고로 돌아가지 않으며, 수령 기한이 지나면 다음 예약자에게 넘어간다.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db_models import Book as BookModel, Hold as HoldModel, HoldQueue, HoldStatus
+
+logger = logging.getLogger("app.holds")
+
+ACTIVE_HOLD_STATUSES = (HoldStatus.WAITING, HoldStatus.READY)
+
+
+class HoldError(Exception):
+    """예약 규칙 위반 (메시지는 사용자에게 그대로 표시)"""
+
+
+def lock_book(db: Session, book_id: int) -> Optional[BookModel]:
+    """도서 행 잠금 - 재고와 대기열 변경을 직렬화"""
+    # populate_existing: 같은 세션에서 이미 읽은 행이어도 잠금 후의 최신 값으로 갱신
+    return db.query(BookModel).filter(BookModel.book_id == book_id).with_for_update().populate_existing().first()
+
+
+def _get_queue(db: Session, book_id: int) -> HoldQueue:
+    # 도서 행을 잠근 상태에서 호출하므로 동시에 대기열 행을 만드는 경쟁이 없음
+    queue = db.query(HoldQueue).filter(HoldQueue.book_id == book_id).first()
+    if queue is None:
+        queue = HoldQueue(book_id=book_id, head_seq=0, tail_seq=0)
+        db.add(queue)
+        db.flush()
+    return queue
+
+
+def position(hold: HoldModel, queue: Optional[HoldQueue]) -> Optional[int]:
+    """대기 순번 (1부터). 대기 중이 아니면 None"""
+    if hold.status != HoldStatus.WAITING or queue is None:
+        return None
+    return hold.queue_seq - queue.head_seq + 1
+
+
+def positions_for(db: Session, holds: List[HoldModel]) -> Dict[int, Optional[int]]:
+    """예약 목록의 대기 순번 (도서별 대기열 포인터만 조회)"""
+    book_ids = {hold.book_id for hold in holds if hold.status == HoldStatus.WAITING}
+    queues = {}
+    if book_ids:
+        queues = {q.book_id: q for q in db.query(HoldQueue).filter(HoldQueue.book_id.in_(book_ids))}
+    return {hold.hold_id: position(hold, queues.get(hold.book_id)) for hold in holds}
+
+
+def place_hold(db: Session, user_id: int, book: BookModel) -> HoldModel:
+    """대기열 맨 뒤에 예약 추가 (book은 lock_book으로 잠근 행)"""
+    if book.stock_quantity > 0:
+        raise HoldError(f"'{book.title}'은(는) 대출 가능한 재고가 있어 바로 대출할 수 있습니다")
+
+    existing = db.query(HoldModel).filter(
+        HoldModel.user_id == user_id,
+        HoldModel.book_id == book.book_id,
+        HoldModel.status.in_(ACTIVE_HOLD_STATUSES)
+    ).first()
+    if existing:
+        raise HoldError(f"이미 '{book.title}'을(를) 예약했습니다")
+
+    max_holds = get_settings().hold_max_per_user
+    active = db.query(HoldModel).filter(
+        HoldModel.user_id == user_id,
+        HoldModel.status.in_(ACTIVE_HOLD_STATUSES)
+    ).count()
+    if active >= max_holds:
+        raise HoldError(f"예약 가능 권수({max_holds}권)를 초과했습니다")
+
+    queue = _get_queue(db, book.book_id)
+    hold = HoldModel(
+        user_id=user_id,
+        book_id=book.book_id,
+        queue_seq=queue.tail_seq,
+        status=HoldStatus.WAITING,
+        created_at=datetime.now()
+    )
+    queue.tail_seq += 1
+    db.add(hold)
+    db.flush()
+    return hold
+
+
+def release_copy(db: Session, book: BookModel) -> Optional[HoldModel]:
+    """
+    반납(또는 배정 취소)된 한 권을 다음 대기자에게 배정. 대기자가 없으면 재고로 돌린다.
+    book은 lock_book으로 잠근 행이어야 한다. 배정된 예약을 반환.
+    """
+    queue = db.query(HoldQueue).filter(HoldQueue.book_id == book.book_id).first()
+    if queue is None or queue.head_seq >= queue.tail_seq:
+        book.stock_quantity += 1
+        return None
+
+    hold = db.query(HoldModel).filter(
+        HoldModel.book_id == book.book_id,
+        HoldModel.status == HoldStatus.WAITING,
+        HoldModel.queue_seq == queue.head_seq
+    ).first()
+    queue.head_seq += 1
+    if hold is None:
+        # 순번이 어긋난 경우(수동 데이터 수정 등) 재고로 돌림
+        logger.warning("hold queue out of sync for book_id=%s", book.book_id)
+        book.stock_quantity += 1
+        return None
+
+    now = datetime.now()
+    hold.status = HoldStatus.READY
+    hold.ready_at = now
+    hold.expires_at = now + timedelta(days=get_settings().hold_pickup_days)
+    return hold
+
+
+def add_copies(db: Session, book: BookModel, count: int) -> List[HoldModel]:
+    """
+    새로 들어온 count권을 대기열 순서대로 배정하고 남은 권수만 재고로 (사서가 재고를 늘린 경우).
+    book은 lock_book으로 잠근 행이어야 한다. 배정된 예약 목록 반환
+    """
+    holds = []
+    for _ in range(count):
+        hold = release_copy(db, book)
+        if hold is not None:
+            holds.append(hold)
+    return holds
+
+
+def cancel_hold(db: Session, hold: HoldModel, status: HoldStatus = HoldStatus.CANCELLED) -> Optional[HoldModel]:
+    """
+    예약 취소/만료. 대기 중이면 뒤 순번을 당기고, 배정된 상태였으면 그 한 권을 다음 대기자에게 넘긴다.
+    새로 배정된 예약을 반환.
+    """
+    book = lock_book(db, hold.book_id)
+    previous = hold.status
+    hold.status = status
+    if previous == HoldStatus.WAITING:
+        queue = _get_queue(db, hold.book_id)
+        db.query(HoldModel).filter(
+            HoldModel.book_id == hold.book_id,
+            HoldModel.status == HoldStatus.WAITING,
+            HoldModel.queue_seq > hold.queue_seq
+        ).update({HoldModel.queue_seq: HoldModel.queue_seq - 1}, synchronize_session=False)
+        queue.tail_seq -= 1
+        return None
+    if previous == HoldStatus.READY and book is not None:
+        return release_copy(db, book)
+    return None
+
+
+def ready_hold_for(db: Session, user_id: int, book_id: int) -> Optional[HoldModel]:
+    """사용자에게 배정되어 수령 대기 중인 예약"""
+    return db.query(HoldModel).filter(
+        HoldModel.user_id == user_id,
+        HoldModel.book_id == book_id,
+        HoldModel.status == HoldStatus.READY
+    ).first()
+
+
+def fulfill_hold(hold: HoldModel):
+    """배정된 예약을 대출로 전환 (배정된 한 권은 재고에서 이미 빠져 있음)"""
+    hold.status = HoldStatus.FULFILLED
+
+
+# ========== 수령 기한 만료 처리 ==========
+
+def expire_ready_holds(db: Session, now: Optional[datetime] = None) -> int:
+    """수령 기한이 지난 예약을 만료시키고 다음 대기자에게 배정. 처리 건수 반환"""
+    now = now or datetime.now()
+    candidates = db.query(HoldModel.hold_id, HoldModel.book_id).filter(
+        HoldModel.status == HoldStatus.READY,
+        HoldModel.expires_at < now
+    ).all()
+    expired = 0
+    for hold_id, book_id in candidates:
+        # 예약 하나씩 별도 트랜잭션으로 처리 (반납 처리와 같은 순서로 도서 행부터 잠금)
+        book = lock_book(db, book_id)
+        hold = db.query(HoldModel).filter(HoldModel.hold_id == hold_id).with_for_update().first()
+        if book is None or hold is None or hold.status != HoldStatus.READY:
+            db.rollback()
+            continue
+        cancel_hold(db, hold, status=HoldStatus.EXPIRED)
+        db.commit()
+        expired += 1
+    if expired:
+        logger.info("expired %d ready holds", expired)
+    return expired
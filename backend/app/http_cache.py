@@ -0,0 +1,185 @@
+"""
+HTTP Cache - 공개 도서/리뷰 조회의 조건부 요청 처리 (ETag / Last-Modified / Cache-Control)
+
+버전은 outbox 이벤트 번호를 그대로 쓴다. 비 durable 소비자로 books / reviews 이벤트를 받아
+    - 도서 목록: books 테이블의 마지막 이벤트
+    - 도서 상세: 해당 도서의 마지막 이벤트
+    - 리뷰 목록/통계: 해당 도서에 달린 리뷰의 마지막 이벤트
+를 메모리에 유지하므로, If-None-Match / If-Modified-Since가 최신이면 DB를 조회하지 않고 304를 반환한다.
+이벤트 번호는 모든 프로세스에서 같으므로 워커가 여러 개여도 같은 ETag가 나온다.
+
+시작 이후 바뀐 적 없는 행은 소비 시작 위치를 버전으로 쓴다. 기억하는 행이 너무 많아지거나 대상 행을 알 수 없는
+이벤트(대량 등록 등)가 오면 해당 테이블의 모든 행 버전을 한꺼번에 올린다 (200 응답이 늘 뿐 잘못된 304는 없음).
+커밋 후 outbox 전달까지의 짧은 지연 동안은 이전 ETag가 유효할 수 있고, 리뷰 작성자 이름 변경은 이벤트가 없으므로
+그 도서의 다음 리뷰 변경 때 반영된다.
+"""
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import Request, Response
+
+from app.config import get_settings
+from app.outbox import OutboxEvent, outbox_dispatcher
+from app.read_cache import invalidate_catalog
+
+CONSUMER = "http_cache"
+
+# (event_id, 변경 시각)
+Version = Tuple[int, datetime]
+
+
+def _opaque_tags(header: str) -> Set[str]:
+    """If-None-Match 값 → 약한 비교용 태그 집합 (W/ 제거)"""
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+class CacheCheck:
+    """요청 하나의 조건부 처리 결과. 버전을 모르면(비활성) 헤더 없이 그대로 통과"""
+
+    def __init__(self, request: Request, tag: Optional[str] = None, version: Optional[Version] = None, cache_control: str = ""):
+        self.active = version is not None
+        self.fresh = False
+        if not self.active:
+            return
+        event_id, modified = version
+        self.etag = f'W/"{tag}.{event_id}"'
+        # 이벤트 시각은 서버 로컬 시각 (초 단위로 비교)
+        self.last_modified = modified.astimezone(timezone.utc).replace(microsecond=0)
+        self.cache_control = cache_control
+        self.fresh = self._matches(request)
+
+    def _matches(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match가 있으면 If-Modified-Since는 보지 않음 (RFC 9110)
+            return if_none_match.strip() == "*" or self.etag.removeprefix("W/") in _opaque_tags(if_none_match)
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified <= since
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": self.cache_control,
+        }
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self._headers())
+
+    def apply(self, response: Response) -> Response:
+        """정상 응답에 검증자와 캐시 헤더 추가"""
+        if self.active:
+            response.headers.update(self._headers())
+        return response
+
+
+class CatalogVersions:
+    """books / reviews 변경 이벤트로 유지하는 테이블/행 버전 (outbox 비 durable 소비자)"""
+
+    def __init__(self, enabled: bool = True, max_age: int = 5, stale_while_revalidate: int = 30, max_tracked_rows: int = 100000):
+        self.enabled = enabled
+        self.max_tracked_rows = max_tracked_rows
+        self.cache_control = f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+        self._lock = threading.Lock()
+        self._base: Optional[Version] = None
+        self._tables: Dict[str, Version] = {}
+        self._floors: Dict[str, Version] = {}  # 이 버전 이하의 행 버전은 기억하지 않음
+        self._rows: Dict[Tuple[str, int], Version] = {}
+        self.checks = 0
+        self.not_modified = 0
+        self.compactions = 0
+
+    @classmethod
+    def from_settings(cls) -> "CatalogVersions":
+        settings = get_settings()
+        return cls(
+            enabled=settings.http_cache_enabled,
+            max_age=settings.http_cache_max_age_seconds,
+            stale_while_revalidate=settings.http_cache_stale_while_revalidate_seconds,
+            max_tracked_rows=settings.http_cache_max_tracked_rows,
+        )
+
+    # ----- outbox 소비 (워커 스레드) -----
+
+    @staticmethod
+    def _row_key(event: OutboxEvent) -> Optional[int]:
+        if event.entity == "books":
+            return event.entity_id
+        # 리뷰 목록/통계는 도서 단위이므로 도서 ID로 묶음 (도서 삭제로 함께 지워진 리뷰는 payload에 book_id만 있음)
+        return event.payload.get("row", {}).get("book_id", event.payload.get("book_id"))
+
+    def handle(self, events: List[OutboxEvent]):
+        # 새 버전이 보이기 전에 이전 내용을 읽기 캐시에서 먼저 지움 (새 ETag + 이전 본문 조합 방지)
+        invalidate_catalog(events)
+        with self._lock:
+            for event in events:
+                version = (event.event_id, event.created_at)
+                self._tables[event.entity] = version
+                key = self._row_key(event)
+                if key is None:
+                    self._floors[event.entity] = version
+                else:
+                    self._rows[(event.entity, key)] = version
+            if len(self._rows) > self.max_tracked_rows:
+                self._floors.update(self._tables)
+                self._rows.clear()
+                self.compactions += 1
+
+    # ----- 조회 (이벤트 루프) -----
+
+    def _version(self, entity: str, key: Optional[int]) -> Optional[Version]:
+        with self._lock:
+            if self._base is None:
+                checkpoint = outbox_dispatcher.checkpoint(CONSUMER)
+                if checkpoint is None:
+                    # 아직 전달을 시작하지 않음 (이 시점 이전 변경을 반영했는지 알 수 없음)
+                    return None
+                self._base = (checkpoint, datetime.now())
+            if key is None:
+                candidates = [self._tables.get(entity)]
+            else:
+                candidates = [self._floors.get(entity), self._rows.get((entity, key))]
+            return max([self._base] + [version for version in candidates if version is not None])
+
+    def check(self, request: Request, entity: str, key: Optional[int] = None) -> CacheCheck:
+        """조건부 요청 확인 (DB 조회 전에 호출). key가 없으면 테이블 단위 버전"""
+        if not self.enabled:
+            return CacheCheck(request)
+        version = self._version(entity, key)
+        if version is None:
+            return CacheCheck(request)
+        tag = entity if key is None else f"{entity}-{key}"
+        check = CacheCheck(request, tag, version, self.cache_control)
+        self.checks += 1
+        if check.fresh:
+            self.not_modified += 1
+        return check
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ready": self._base is not None,
+            "cache_control": self.cache_control,
+            "checks": self.checks,
+            "not_modified": self.not_modified,
+            "not_modified_ratio": round(self.not_modified / self.checks, 4) if self.checks else 0.0,
+            "tracked_rows": len(self._rows),
+            "compactions": self.compactions,
+            "versions": {entity: version[0] for entity, version in self._tables.items()},
+        }
+
+
+catalog_versions = CatalogVersions.from_settings()
+
+# 버전은 프로세스가 떠 있는 동안의 변경만 추적하면 되므로 체크포인트를 저장하지 않음
+outbox_dispatcher.register(CONSUMER, catalog_versions.handle, entities=["books", "reviews"], durable=False)
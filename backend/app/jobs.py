@@ -0,0 +1,459 @@
+"""
+Jobs - DB 기반 백그라운드 작업 실행기
+집계 재계산, 예약 만료, 대량 등록/삭제, 스냅샷 생성처럼 오래 걸리는 작업을 요청 처리 밖에서 실행한다.
+작업은 jobs 테이블에 쌓이고, 앱 lifespan에서 시작한 워커들이 가져가 실행한다 (외부 브로커 없음).
+
+리스(lease): 워커는 조건부 UPDATE로 작업을 가져가며(locked_by, lease_expires_at) 실행 중에는 주기적으로 연장한다.
+uvicorn 워커가 여러 개여도 한 작업은 한 워커만 실행하고, 워커가 죽어 리스가 만료되면 다른 워커가 다시 가져간다.
+
+재시도: 핸들러가 예외를 던지면 retry_base_seconds * 2^(시도 횟수 - 1) 뒤에 다시 실행하고,
+max_attempts를 넘으면 FAILED로 남긴다. 리스 만료로 다시 실행될 수 있으므로 핸들러는 반복 실행해도 안전해야 한다.
+
+주기 작업: job_schedules의 next_run_at을 조건부 UPDATE로 넘긴 워커 하나만 작업을 등록한다.
+같은 종류의 작업이 아직 대기/실행 중이면 새로 등록하지 않는다.
+
+핸들러 등록:
+    @job_handler("rollups.reconcile")
+    def reconcile_rollups(db: Session, payload: dict) -> dict: ...
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db_models import Job as JobModel, JobSchedule, JobStatus
+
+logger = logging.getLogger("app.jobs")
+
+JobHandler = Callable[[Session, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+class JobError(Exception):
+    """작업 등록/변경 규칙 위반 (등록되지 않은 종류, 취소할 수 없는 상태 등)"""
+
+
+def job_handler(kind: str):
+    """작업 핸들러 등록 데코레이터. 핸들러는 (db, payload)를 받아 결과 dict를 반환 (워커 스레드에서 실행)"""
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def registered_kinds() -> List[str]:
+    return sorted(_handlers)
+
+
+# ========== 작업 등록 / 변경 (호출 측 트랜잭션에서, 커밋은 호출 측이) ==========
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    max_attempts: Optional[int] = None,
+    run_after: Optional[datetime] = None,
+) -> JobModel:
+    if kind not in _handlers:
+        raise JobError(f"등록되지 않은 작업 종류입니다: {kind}")
+    now = datetime.now()
+    job = JobModel(
+        kind=kind,
+        payload=json.dumps(payload or {}, ensure_ascii=False),
+        status=JobStatus.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or get_settings().job_max_attempts,
+        run_after=run_after or now,
+        created_at=now,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def cancel(db: Session, job: JobModel):
+    """대기/실행 중인 작업 취소. 실행 중인 핸들러를 중단하지는 않고 결과만 버린다"""
+    if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+        raise JobError("대기 중이거나 실행 중인 작업만 취소할 수 있습니다")
+    job.status = JobStatus.CANCELLED
+    job.locked_by = None
+    job.lease_expires_at = None
+    job.finished_at = datetime.now()
+
+
+def retry(db: Session, job: JobModel):
+    """실패/취소된 작업을 처음부터 다시 실행"""
+    if job.status not in (JobStatus.FAILED, JobStatus.CANCELLED):
+        raise JobError("실패했거나 취소된 작업만 다시 실행할 수 있습니다")
+    job.status = JobStatus.QUEUED
+    job.attempts = 0
+    job.run_after = datetime.now()
+    job.last_error = None
+    job.finished_at = None
+
+
+# ========== 실행기 ==========
+
+class JobRunner:
+    """jobs 테이블을 폴링해 작업을 실행하는 워커 풀 (프로세스당 하나)"""
+
+    def __init__(self, concurrency: int = 2, lease_seconds: float = 300.0, poll_interval: float = 2.0, retry_base_seconds: float = 30.0):
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retry_base_seconds = retry_base_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._schedules: Dict[str, tuple] = {}
+        self._running: Dict[int, str] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.completed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_settings(cls) -> "JobRunner":
+        settings = get_settings()
+        return cls(
+            concurrency=settings.job_workers,
+            lease_seconds=settings.job_lease_seconds,
+            poll_interval=settings.job_poll_interval_seconds,
+            retry_base_seconds=settings.job_retry_base_seconds,
+        )
+
+    def schedule(self, name: str, kind: str, interval_seconds: float):
+        """주기 작업 등록 (run 전에 호출). interval_seconds가 0 이하이면 등록하지 않음"""
+        if interval_seconds > 0:
+            self._schedules[name] = (kind, max(int(interval_seconds), 1))
+
+    def wake(self):
+        """새 작업이 등록되었음을 알림 (어느 스레드에서든 호출 가능)"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(wakeup.set)
+
+    # ----- 주기 작업 -----
+
+    def _sync_schedules(self, db: Session):
+        """설정의 스케줄을 job_schedules에 반영 (새 스케줄은 바로 실행, 설정에서 빠진 스케줄은 삭제)"""
+        now = datetime.now()
+        existing = {row.name: row for row in db.query(JobSchedule).all()}
+        for name, (kind, interval) in self._schedules.items():
+            row = existing.pop(name, None)
+            if row is None:
+                db.add(JobSchedule(name=name, kind=kind, interval_seconds=interval, next_run_at=now))
+            elif row.kind != kind or row.interval_seconds != interval:
+                row.kind = kind
+                row.interval_seconds = interval
+                row.next_run_at = min(row.next_run_at, now + timedelta(seconds=interval))
+        for row in existing.values():
+            db.delete(row)
+        db.commit()
+
+    def enqueue_due_schedules(self, db: Session) -> int:
+        now = datetime.now()
+        due = db.query(JobSchedule).filter(JobSchedule.next_run_at <= now).all()
+        enqueued = 0
+        for row in due:
+            # 다른 워커가 먼저 넘겼으면 rowcount가 0
+            claimed = db.execute(
+                update(JobSchedule)
+                .where(JobSchedule.name == row.name, JobSchedule.next_run_at == row.next_run_at)
+                .values(next_run_at=now + timedelta(seconds=row.interval_seconds))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not claimed:
+                db.rollback()
+                continue
+            pending = db.query(JobModel.job_id).filter(
+                JobModel.kind == row.kind,
+                JobModel.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])
+            ).first()
+            if pending is None and row.kind in _handlers:
+                job = enqueue(db, row.kind)
+                db.execute(
+                    update(JobSchedule).where(JobSchedule.name == row.name).values(last_job_id=job.job_id)
+                    .execution_options(synchronize_session=False)
+                )
+                enqueued += 1
+            db.commit()
+        return enqueued
+
+    # ----- 작업 가져오기 / 완료 처리 (워커 스레드에서 각자 세션으로) -----
+
+    def _claim(self, db: Session) -> Optional[JobModel]:
+        now = datetime.now()
+        claimable = or_(
+            and_(JobModel.status == JobStatus.QUEUED, JobModel.run_after <= now),
+            and_(JobModel.status == JobStatus.RUNNING, JobModel.lease_expires_at < now),
+        )
+        # 리스가 만료된 채 시도 횟수를 다 쓴 작업은 실패 처리 (워커가 반복해서 죽는 작업)
+        db.execute(
+            update(JobModel)
+            .where(JobModel.status == JobStatus.RUNNING, JobModel.lease_expires_at < now, JobModel.attempts >= JobModel.max_attempts)
+            .values(status=JobStatus.FAILED, last_error="실행 중 리스가 만료되었습니다", locked_by=None, lease_expires_at=None, finished_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        candidates = db.execute(
+            select(JobModel.job_id).where(claimable).order_by(JobModel.run_after, JobModel.job_id).limit(self.concurrency * 2)
+        ).scalars().all()
+        for job_id in candidates:
+            claimed = db.execute(
+                update(JobModel)
+                .where(JobModel.job_id == job_id, claimable)
+                .values(
+                    status=JobStatus.RUNNING,
+                    locked_by=self.worker_id,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                    attempts=JobModel.attempts + 1,
+                    started_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if claimed:
+                return db.get(JobModel, job_id)
+        return None
+
+    def _owned(self, job_id: int):
+        return and_(JobModel.job_id == job_id, JobModel.status == JobStatus.RUNNING, JobModel.locked_by == self.worker_id)
+
+    def _extend_lease(self, job_id: int) -> bool:
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            extended = db.execute(
+                update(JobModel.__table__).where(self._owned(job_id))
+                .values(lease_expires_at=datetime.now() + timedelta(seconds=self.lease_seconds))
+            ).rowcount
+            db.commit()
+            return bool(extended)
+        finally:
+            db.close()
+
+    def _execute(self, job_id: int, kind: str, payload: Dict[str, Any], attempts: int, max_attempts: int) -> bool:
+        """핸들러 실행 후 결과 기록. 성공하면 True"""
+        from app.database import SessionLocal
+
+        handler = _handlers.get(kind)
+        db = SessionLocal()
+        try:
+            if handler is None:
+                raise JobError(f"등록되지 않은 작업 종류입니다: {kind}")
+            result = handler(db, payload) or {}
+            db.commit()
+            values = dict(status=JobStatus.SUCCEEDED, result=json.dumps(result, ensure_ascii=False, default=str), last_error=None)
+            ok = True
+        except Exception as e:
+            db.rollback()
+            logger.exception("job %s (%s) failed on attempt %d", job_id, kind, attempts)
+            error = f"{type(e).__name__}: {e}"
+            if attempts >= max_attempts or isinstance(e, JobError):
+                values = dict(status=JobStatus.FAILED, last_error=error)
+            else:
+                delay = self.retry_base_seconds * (2 ** (attempts - 1))
+                values = dict(status=JobStatus.QUEUED, last_error=error, run_after=datetime.now() + timedelta(seconds=delay))
+            ok = False
+        finally:
+            db.close()
+
+        done = values["status"] != JobStatus.QUEUED
+        db = SessionLocal()
+        try:
+            # 취소되었거나 리스를 잃은 작업이면 결과를 기록하지 않음
+            db.execute(
+                update(JobModel.__table__).where(self._owned(job_id))
+                .values(locked_by=None, lease_expires_at=None, finished_at=datetime.now() if done else None, **values)
+            )
+            db.commit()
+        finally:
+            db.close()
+        return ok
+
+    def _claim_in_new_session(self) -> Optional[tuple]:
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            job = self._claim(db)
+            if job is None:
+                return None
+            return job.job_id, job.kind, json.loads(job.payload or "{}"), job.attempts, job.max_attempts
+        finally:
+            db.close()
+
+    def _enqueue_due_in_new_session(self) -> int:
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return self.enqueue_due_schedules(db)
+        finally:
+            db.close()
+
+    def _sync_schedules_in_new_session(self):
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            self._sync_schedules(db)
+        finally:
+            db.close()
+
+    # ----- 비동기 루프 -----
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self._extend_lease, job_id):
+                return
+
+    async def _worker(self):
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self._claim_in_new_session)
+            except Exception:
+                logger.exception("job claim failed")
+                claimed = None
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            job_id, kind = claimed[0], claimed[1]
+            self._running[job_id] = kind
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                ok = await asyncio.to_thread(self._execute, *claimed)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            finally:
+                heartbeat.cancel()
+                self._running.pop(job_id, None)
+
+    async def _scheduler(self):
+        while True:
+            try:
+                if await asyncio.to_thread(self._enqueue_due_in_new_session):
+                    self._wakeup.set()
+            except Exception:
+                logger.exception("job schedule check failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def run(self):
+        """스케줄 동기화 후 스케줄러 + 워커 concurrency개 실행 (앱 lifespan에서 태스크로 실행)"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self._sync_schedules_in_new_session)
+        tasks = [asyncio.create_task(self._scheduler())]
+        tasks += [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": [{"job_id": job_id, "kind": kind} for job_id, kind in self._running.items()],
+            "completed": self.completed,
+            "failed": self.failed,
+            "kinds": registered_kinds(),
+            "schedules": {name: {"kind": kind, "interval_seconds": interval} for name, (kind, interval) in self._schedules.items()},
+        }
+
+
+job_runner = JobRunner.from_settings()
+
+
+# ========== 기본 작업 ==========
+
+@job_handler("rollups.reconcile")
+def reconcile_rollups(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """대시보드 집계 테이블을 원본 테이블 기준으로 재계산"""
+    from app.rollups import reconcile
+    return reconcile(db, payload.get("days"))
+
+
+@job_handler("holds.expire")
+def expire_holds(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """수령 기한이 지난 예약 만료 → 다음 대기자 배정"""
+    from app.holds import expire_ready_holds
+    return {"expired": expire_ready_holds(db)}
+
+
+@job_handler("outbox.prune")
+def prune_outbox(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """모든 소비자가 처리한 오래된 outbox 이벤트 삭제"""
+    from app.outbox import outbox_dispatcher
+    days = payload.get("days", get_settings().outbox_retention_days)
+    return {"deleted": outbox_dispatcher.prune(db, days)}
+
+
+@job_handler("jobs.prune")
+def prune_jobs(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """보관 기간이 지난 완료/실패/취소 작업 기록 삭제"""
+    days = payload.get("days", get_settings().job_retention_days)
+    before = datetime.now() - timedelta(days=days)
+    deleted = db.query(JobModel).filter(
+        JobModel.status.in_([JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED]),
+        JobModel.finished_at < before
+    ).delete(synchronize_session=False)
+    return {"deleted": deleted}
+
+
+@job_handler("analytics.snapshot")
+def write_analytics_snapshot(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """분석용 컬럼형 스냅샷 생성"""
+    from app.analytics.snapshot import write_snapshot
+    return write_snapshot(db, keep=payload.get("keep", 3))
+
+
+@job_handler("catalog.import")
+def import_catalog(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """업로드된 도서 파일 대량 등록 (재시도하지 않도록 max_attempts=1로 등록, 끝나면 파일 삭제)"""
+    from app.catalog_import import import_file
+    path = Path(payload["path"])
+    try:
+        with path.open("rb") as stream:
+            report = import_file(
+                db, stream, filename=payload.get("filename"), fmt=payload.get("format"),
+                batch_size=payload["batch_size"], max_errors=payload["max_errors"], dry_run=payload.get("dry_run", False)
+            )
+        return report.to_dict()
+    finally:
+        path.unlink(missing_ok=True)
+
+
+@job_handler("users.purge")
+def purge_user(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """대출/리뷰/예약이 많은 회원 삭제 (배치마다 커밋, 마지막에 회원 행 삭제)"""
+    from app.purge import purge
+    return purge(db, "users", payload["user_id"], payload.get("batch_size", get_settings().purge_batch_size))
+
+
+@job_handler("books.purge")
+def purge_book(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """대출/리뷰/예약이 많은 도서 삭제 (배치마다 커밋, 마지막에 도서 행 삭제)"""
+    from app.purge import purge
+    return purge(db, "books", payload["book_id"], payload.get("batch_size", get_settings().purge_batch_size))
@@ -0,0 +1,175 @@
+"""
+LLM Metrics - AI 챗봇의 토큰 사용량, 지연 시간, 비용 계측
+요청 단위 추적(ChatTrace)과 프로세스 단위 누적 지표(LLMMetrics)를 제공
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger("app.ai")
+
+# 지연 시간 히스토그램 버킷 상한 (ms)
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 근사치 (UTF-8 4바이트당 1토큰).
+    영문은 단어 조각 단위, 한글은 글자당 1토큰 안팎이라 두 경우 모두 크게 벗어나지 않는다.
+    """
+    if not text:
+        return 0
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+class ChatTrace:
+    """한 번의 /chat 요청에 대한 계측 기록"""
+
+    def __init__(self, message: str, user_id: Optional[int] = None):
+        self.request_id = uuid.uuid4().hex[:12]
+        self.user_id = user_id
+        self.message_chars = len(message)
+        self.model: Optional[str] = None
+        self.estimated_prompt_tokens = 0
+        self.context_books = 0
+        self.context_trimmed = False
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.fallback_reason: Optional[str] = None
+        self.queue_wait_ms = 0.0
+        self.response_chars = 0
+        self._started = time.perf_counter()
+        self.total_ms = 0.0
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(call["prompt_tokens"] for call in self.llm_calls)
+
+    @property
+    def response_tokens(self) -> int:
+        return sum(call["response_tokens"] for call in self.llm_calls)
+
+    @property
+    def cost(self) -> float:
+        settings = get_settings()
+        return (
+            self.prompt_tokens / 1000 * settings.ai_cost_per_1k_prompt_tokens
+            + self.response_tokens / 1000 * settings.ai_cost_per_1k_response_tokens
+        )
+
+    def record_llm_call(self, latency_ms: float, prompt_tokens: int = 0, response_tokens: int = 0):
+        """LLM 호출 1회 기록 (토큰 수는 제공자가 보고한 사용량)"""
+        self.llm_calls.append({
+            "latency_ms": round(latency_ms, 1),
+            "prompt_tokens": prompt_tokens,
+            "response_tokens": response_tokens,
+        })
+
+    def record_tool_call(self, name: str, success: bool):
+        self.tool_calls.append({"name": name, "success": success})
+
+    def finish(self, response: str = "", fallback_reason: Optional[str] = None):
+        """요청 종료: 누적 지표에 반영하고 구조화 로그 한 줄을 남김"""
+        self.total_ms = (time.perf_counter() - self._started) * 1000
+        self.response_chars = len(response)
+        self.fallback_reason = fallback_reason
+        llm_metrics.observe(self)
+        logger.info(json.dumps(self.to_dict(), ensure_ascii=False))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event": "ai_chat",
+            "request_id": self.request_id,
+            "user_id": self.user_id,
+            "model": self.model,
+            "message_chars": self.message_chars,
+            "estimated_prompt_tokens": self.estimated_prompt_tokens,
+            "context_books": self.context_books,
+            "context_trimmed": self.context_trimmed,
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "cost": round(self.cost, 6),
+            "tool_calls": self.tool_calls,
+            "fallback": self.fallback_reason,
+            "queue_wait_ms": round(self.queue_wait_ms, 1),
+            "response_chars": self.response_chars,
+            "total_ms": round(self.total_ms, 1),
+        }
+
+
+class LLMMetrics:
+    """프로세스 단위 누적 지표 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.fallbacks: Dict[str, int] = {}
+            self.llm_calls = 0
+            self.tool_calls = 0
+            self.tool_failures = 0
+            self.prompt_tokens = 0
+            self.response_tokens = 0
+            self.cost = 0.0
+            self.trimmed_contexts = 0
+            self.llm_latency_ms_sum = 0.0
+            self.llm_latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            self.request_latency_ms_sum = 0.0
+
+    def observe(self, trace: ChatTrace):
+        with self._lock:
+            self.requests += 1
+            if trace.fallback_reason:
+                self.fallbacks[trace.fallback_reason] = self.fallbacks.get(trace.fallback_reason, 0) + 1
+            if trace.context_trimmed:
+                self.trimmed_contexts += 1
+            for call in trace.llm_calls:
+                self.llm_calls += 1
+                self.llm_latency_ms_sum += call["latency_ms"]
+                self.llm_latency_buckets[self._bucket(call["latency_ms"])] += 1
+            self.tool_calls += len(trace.tool_calls)
+            self.tool_failures += sum(1 for call in trace.tool_calls if not call["success"])
+            self.prompt_tokens += trace.prompt_tokens
+            self.response_tokens += trace.response_tokens
+            self.cost += trace.cost
+            self.request_latency_ms_sum += trace.total_ms
+
+    @staticmethod
+    def _bucket(latency_ms: float) -> int:
+        for i, upper in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= upper:
+                return i
+        return len(LATENCY_BUCKETS_MS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            fallback_total = sum(self.fallbacks.values())
+            buckets = {f"le_{upper}": count for upper, count in zip(LATENCY_BUCKETS_MS, self.llm_latency_buckets)}
+            buckets["inf"] = self.llm_latency_buckets[-1]
+            return {
+                "requests": self.requests,
+                "fallbacks": dict(self.fallbacks),
+                "fallback_rate": round(fallback_total / self.requests, 4) if self.requests else 0.0,
+                "llm_calls": self.llm_calls,
+                "llm_latency_ms_avg": round(self.llm_latency_ms_sum / self.llm_calls, 1) if self.llm_calls else 0.0,
+                "llm_latency_ms_buckets": buckets,
+                "request_latency_ms_avg": round(self.request_latency_ms_sum / self.requests, 1) if self.requests else 0.0,
+                "tool_calls": self.tool_calls,
+                "tool_failures": self.tool_failures,
+                "prompt_tokens": self.prompt_tokens,
+                "response_tokens": self.response_tokens,
+                "cost": round(self.cost, 6),
+                "trimmed_contexts": self.trimmed_contexts,
+            }
+
+
+llm_metrics = LLMMetrics()
@@ -0,0 +1,316 @@
+"""
+LLM Providers - AI 챗봇이 사용하는 언어 모델 추상화
+Gemini 구현과 오프라인 부하 테스트용 가짜(Fake) 구현을 제공
+
+대화 기록은 모델에 독립적인 dict 목록으로 주고받는다.
+- {"role": "user", "text": "..."}
+- {"role": "model", "text": "...", "tool_calls": [ToolCall, ...]}
+- {"role": "tool", "results": [(도구 이름, 결과 dict), ...]}
+"""
+import abc
+import asyncio
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.config import get_settings
+from app.llm_metrics import estimate_tokens
+
+
+class ToolCall:
+    """모델이 요청한 함수 호출 1건"""
+
+    def __init__(self, name: str, args: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.args = dict(args or {})
+
+    def __repr__(self):
+        return f"<ToolCall(name='{self.name}', args={self.args})>"
+
+
+class LLMResponse:
+    """모델 응답 (스트리밍 시에는 청크 1개)"""
+
+    def __init__(
+        self,
+        text: str = "",
+        tool_calls: Optional[List[ToolCall]] = None,
+        prompt_tokens: int = 0,
+        response_tokens: int = 0,
+        raw_content: Any = None,
+    ):
+        self.text = text
+        self.tool_calls = tool_calls or []
+        self.prompt_tokens = prompt_tokens
+        self.response_tokens = response_tokens
+        # 제공자 고유의 응답 객체 (다음 턴에 그대로 되돌려줄 때 사용)
+        self.raw_content = raw_content
+
+
+class LLMProvider(abc.ABC):
+    """언어 모델 제공자 인터페이스"""
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @abc.abstractmethod
+    async def generate(
+        self,
+        messages: List[Dict[str, Any]],
+        system_instruction: str,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> LLMResponse:
+        """전체 응답을 한 번에 반환"""
+
+    @abc.abstractmethod
+    def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        system_instruction: str,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> AsyncIterator[LLMResponse]:
+        """응답을 청크 단위로 전달 (async generator로 구현)"""
+
+
+# ========== Gemini ==========
+
+class GeminiProvider(LLMProvider):
+    """google-genai 기반 Gemini 제공자 (클라이언트를 재사용해 연결을 유지)"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str):
+        super().__init__(model)
+        from google import genai
+        from google.genai import types
+        self._types = types
+        self._client = genai.Client(api_key=api_key)
+
+    def _config(self, system_instruction: str, tools: Optional[List[Dict[str, Any]]]):
+        types = self._types
+        gemini_tools = None
+        if tools:
+            gemini_tools = [types.Tool(function_declarations=[
+                types.FunctionDeclaration(
+                    name=tool["name"],
+                    description=tool["description"],
+                    parameters=tool.get("parameters")
+                ) for tool in tools
+            ])]
+        return types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            tools=gemini_tools,
+            temperature=0.7
+        )
+
+    def _contents(self, messages: List[Dict[str, Any]]) -> list:
+        types = self._types
+        contents = []
+        for message in messages:
+            if message["role"] == "user":
+                contents.append(types.Content(role="user", parts=[types.Part(text=message["text"])]))
+            elif message["role"] == "model":
+                if message.get("raw_content") is not None:
+                    contents.append(message["raw_content"])
+                    continue
+                parts = []
+                if message.get("text"):
+                    parts.append(types.Part(text=message["text"]))
+                parts.extend(
+                    types.Part(function_call=types.FunctionCall(name=call.name, args=call.args))
+                    for call in message.get("tool_calls", [])
+                )
+                contents.append(types.Content(role="model", parts=parts))
+            elif message["role"] == "tool":
+                contents.append(types.Content(role="user", parts=[
+                    types.Part(function_response=types.FunctionResponse(name=name, response=result))
+                    for name, result in message["results"]
+                ]))
+        return contents
+
+    @staticmethod
+    def _parse(response) -> LLMResponse:
+        candidate = response.candidates[0] if response.candidates else None
+        content = candidate.content if candidate else None
+        parts = content.parts if content and content.parts else []
+        text = "".join(
+            part.text for part in parts
+            if getattr(part, "text", None) and not getattr(part, "thought", False)
+        )
+        tool_calls = [
+            ToolCall(part.function_call.name, part.function_call.args)
+            for part in parts if getattr(part, "function_call", None)
+        ]
+        usage = response.usage_metadata
+        return LLMResponse(
+            text=text,
+            tool_calls=tool_calls,
+            prompt_tokens=getattr(usage, "prompt_token_count", None) or 0,
+            response_tokens=getattr(usage, "candidates_token_count", None) or 0,
+            raw_content=content,
+        )
+
+    async def generate(self, messages, system_instruction, tools=None) -> LLMResponse:
+        response = await self._client.aio.models.generate_content(
+            model=self.model,
+            contents=self._contents(messages),
+            config=self._config(system_instruction, tools)
+        )
+        return self._parse(response)
+
+    async def stream(self, messages, system_instruction, tools=None) -> AsyncIterator[LLMResponse]:
+        chunks = await self._client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=self._contents(messages),
+            config=self._config(system_instruction, tools)
+        )
+        async for chunk in chunks:
+            parsed = self._parse(chunk)
+            # 스트리밍 청크는 부분 응답이라 다음 턴에는 재구성한 내용을 사용
+            parsed.raw_content = None
+            yield parsed
+
+
+# ========== Fake (부하 테스트용) ==========
+
+# 기본 시나리오: 메시지에 키워드가 있으면 해당 도구를 호출
+DEFAULT_FAKE_SCRIPT: List[Dict[str, Any]] = [
+    {"match": ["대출 현황", "내 대출", "빌린 책"], "tool_calls": [{"name": "get_user_loans", "args": {}}]},
+    {"match": ["반납"], "tool_calls": [{"name": "return_book", "args": {}}]},
+    {"match": ["연장"], "tool_calls": [{"name": "extend_loan", "args": {}}]},
+    {"match": ["빌려", "대출해"], "tool_calls": [{"name": "borrow_book", "args": {}}]},
+    {"match": ["검색", "찾아"], "tool_calls": [{"name": "search_books", "args": {}}]},
+]
+
+# 《제목》 또는 "제목" 형태로 적힌 도서 제목
+_TITLE_PATTERN = re.compile(r"《(.+?)》|\"(.+?)\"|'(.+?)'")
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    실제 API 없이 스크립트대로 텍스트와 함수 호출을 내보내는 가짜 제공자.
+    응답 지연과 스트리밍 청크 크기/간격을 설정할 수 있어 /api/ai/chat 전체 경로의
+    처리량을 오프라인에서 측정하는 데 사용한다.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        script: Optional[List[Dict[str, Any]]] = None,
+        latency_ms: float = 0.0,
+        stream_chunk_chars: int = 16,
+        stream_delay_ms: float = 0.0,
+        model: str = "fake-llm",
+    ):
+        super().__init__(model)
+        self.script = script if script is not None else DEFAULT_FAKE_SCRIPT
+        self.latency_ms = latency_ms
+        self.stream_chunk_chars = max(stream_chunk_chars, 1)
+        self.stream_delay_ms = stream_delay_ms
+
+    def _respond(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]]) -> LLMResponse:
+        last = messages[-1]
+        prompt_tokens = sum(estimate_tokens(m.get("text") or json.dumps(m.get("results", []), ensure_ascii=False, default=str)) for m in messages)
+
+        if last["role"] == "tool":
+            text = "\n".join(
+                str(result.get("message") or f"{name}: {result.get('count', result.get('total_count', ''))}건 조회")
+                for name, result in last["results"]
+            )
+        else:
+            text = "안녕하세요! IBD Library AI 사서입니다. 무엇을 도와드릴까요?"
+            rule = self._match(last.get("text", ""))
+            if rule:
+                if tools and rule.get("tool_calls"):
+                    calls = [
+                        ToolCall(call["name"], {**self._extract_args(last.get("text", "")), **call.get("args", {})})
+                        for call in rule["tool_calls"]
+                    ]
+                    return LLMResponse(tool_calls=calls, prompt_tokens=prompt_tokens, response_tokens=len(calls) * 10)
+                text = rule.get("text", text)
+
+        return LLMResponse(text=text, prompt_tokens=prompt_tokens, response_tokens=estimate_tokens(text))
+
+    def _match(self, text: str) -> Optional[Dict[str, Any]]:
+        for rule in self.script:
+            if any(keyword in text for keyword in rule.get("match", [])):
+                return rule
+        return None
+
+    @staticmethod
+    def _extract_args(text: str) -> Dict[str, Any]:
+        """메시지에서 따옴표로 감싼 도서 제목을 도구 인자로 추출"""
+        found = _TITLE_PATTERN.search(text)
+        if not found:
+            return {}
+        title = next(group for group in found.groups() if group)
+        return {"book_title": title, "keyword": title}
+
+    async def generate(self, messages, system_instruction, tools=None) -> LLMResponse:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        response = self._respond(messages, tools)
+        # 도구 스키마에 없는 인자는 제거 (실제 모델과 동일한 형태 유지)
+        for call in response.tool_calls:
+            allowed = _tool_parameters(tools, call.name)
+            call.args = {key: value for key, value in call.args.items() if key in allowed}
+        return response
+
+    async def stream(self, messages, system_instruction, tools=None) -> AsyncIterator[LLMResponse]:
+        response = await self.generate(messages, system_instruction, tools)
+        if response.tool_calls or not response.text:
+            yield response
+            return
+        text = response.text
+        size = self.stream_chunk_chars
+        for i in range(0, len(text), size):
+            if i and self.stream_delay_ms:
+                await asyncio.sleep(self.stream_delay_ms / 1000)
+            last_chunk = i + size >= len(text)
+            yield LLMResponse(
+                text=text[i:i + size],
+                prompt_tokens=response.prompt_tokens if last_chunk else 0,
+                response_tokens=response.response_tokens if last_chunk else 0,
+            )
+
+
+def _tool_parameters(tools: Optional[List[Dict[str, Any]]], name: str) -> set:
+    for tool in tools or []:
+        if tool["name"] == name:
+            return set(tool.get("parameters", {}).get("properties", {}))
+    return set()
+
+
+# ========== 제공자 선택 ==========
+
+@lru_cache()
+def get_llm_provider() -> Optional[LLMProvider]:
+    """
+    설정(LLM_PROVIDER)에 따른 제공자 반환.
+    Gemini API 키가 없으면 None (호출 측에서 규칙 기반 폴백 사용)
+    """
+    settings = get_settings()
+
+    if settings.llm_provider == "fake":
+        script = None
+        if settings.fake_llm_script:
+            script = json.loads(Path(settings.fake_llm_script).read_text(encoding="utf-8"))
+        return FakeLLMProvider(
+            script=script,
+            latency_ms=settings.fake_llm_latency_ms,
+            stream_chunk_chars=settings.fake_llm_stream_chunk_chars,
+            stream_delay_ms=settings.fake_llm_stream_delay_ms,
+        )
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key or api_key == "your_gemini_api_key_here":
+        return None
+    # 모델 설정 (환경변수에서 읽기)
+    model_name = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+    return GeminiProvider(api_key=api_key, model=model_name)
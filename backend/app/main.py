@@ -1,13 +1,29 @@
+import asyncio
+import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 
-from app.routers import books, users, loans, reviews, admin, ai
+from app.routers import books, users, loans, reviews, admin, ai, exports, stats, holds, availability, jobs
+from app.compression import CompressionMiddleware
+from app.config import get_settings
 from app.database import init_db, SessionLocal
 from app.db_models import Book, User, UserRole, SystemConfig
+from app.passwords import hash_password_sync, shutdown_password_executor
+from app.jobs import job_runner
+from app.outbox import outbox_dispatcher
+from app.static_assets import StaticAssets
+
+# 애플리케이션 로거 설정 (AI 챗봇 구조화 로그 등). 루트 로거는 건드리지 않으므로 httpx 같은 라이브러리 로그는
+# 기본 수준(WARNING) 그대로다. app.* 로거만 INFO로 내보내고, 루트로 전파하지 않아 중복 출력되지 않는다
+app_logger = logging.getLogger("app")
+if not app_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    app_logger.addHandler(_handler)
+    app_logger.setLevel(logging.INFO)
+    app_logger.propagate = False
 
 
 def seed_data():
@@ -28,16 +44,15 @@ def seed_data():
             
         # 관리자 사용자 생성
         if db.query(User).count() == 0:
-            import hashlib
             admin = User(
                 email="admin@library.com",
-                password=hashlib.sha256("admin123".encode()).hexdigest(),
+                password=hash_password_sync("admin123"),
                 name="관리자",
                 role=UserRole.LIBRARIAN
             )
             member = User(
                 email="user@example.com",
-                password=hashlib.sha256("user123".encode()).hexdigest(),
+                password=hash_password_sync("user123"),
                 name="홍길동",
                 phone="010-1234-5678",
                 address="서울시 강남구"
@@ -69,7 +84,23 @@ async def lifespan(app: FastAPI):
     init_db()
     seed_data()
     print("🚀 Database initialized")
+    
+    # 주기 작업: 대시보드 집계 재계산 (처음 등록될 때 바로 실행해 기존 이력도 반영), 예약 수령 기한 만료, 이벤트/작업 기록 정리
+    settings = get_settings()
+    job_runner.schedule("rollups.reconcile", "rollups.reconcile", settings.stats_reconcile_interval_minutes * 60)
+    job_runner.schedule("holds.expire", "holds.expire", settings.hold_expiry_interval_minutes * 60)
+    job_runner.schedule("outbox.prune", "outbox.prune", settings.outbox_prune_interval_minutes * 60)
+    job_runner.schedule("jobs.prune", "jobs.prune", 24 * 60 * 60)
+    job_runner.schedule("analytics.snapshot", "analytics.snapshot", settings.analytics_snapshot_interval_hours * 60 * 60)
+    
+    # 백그라운드 태스크: outbox 이벤트 전달, 작업 실행기
+    background_tasks = [asyncio.create_task(outbox_dispatcher.run())]
+    if settings.job_workers > 0:
+        background_tasks.append(asyncio.create_task(job_runner.run()))
     yield
+    for task in background_tasks:
+        task.cancel()
+    shutdown_password_executor()
     print("👋 Application shutdown")
 
 
@@ -80,6 +111,16 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# 응답 압축
+settings = get_settings()
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size_bytes,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -93,9 +134,14 @@ app.add_middleware(
 app.include_router(books.router, prefix="/api/books", tags=["도서"])
 app.include_router(users.router, prefix="/api/users", tags=["회원"])
 app.include_router(loans.router, prefix="/api/loans", tags=["대출"])
+app.include_router(holds.router, prefix="/api/holds", tags=["예약"])
+app.include_router(availability.router, prefix="/api/availability", tags=["재고 알림"])
 app.include_router(reviews.router, prefix="/api/reviews", tags=["리뷰"])
 app.include_router(admin.router, prefix="/api/admin", tags=["관리자"])
+app.include_router(stats.router, prefix="/api/admin/stats", tags=["관리자"])
+app.include_router(jobs.router, prefix="/api/admin/jobs", tags=["관리자"])
 app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
+app.include_router(exports.router, prefix="/api/export", tags=["내보내기"])
 
 # 정적 파일 경로
 STATIC_DIR = Path(__file__).parent.parent / "static"
@@ -107,29 +153,24 @@ async def health_check():
 
 
 # 정적 파일 서빙 - 별도 라우터로 등록
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request
 
 spa_router = APIRouter()
 
 if STATIC_DIR.exists():
-    # assets 마운트
-    app.mount("/assets", StaticFiles(directory=STATIC_DIR / "assets"), name="assets")
+    # 시작 시 한 번 색인 (요청마다 파일 시스템을 확인하지 않음)
+    static_assets = StaticAssets(STATIC_DIR)
     
     # 루트 경로
-    @spa_router.get("/", response_class=HTMLResponse)
-    async def serve_index():
-        return FileResponse(STATIC_DIR / "index.html")
+    @spa_router.get("/")
+    async def serve_index(request: Request):
+        return static_assets.response(request, "")
     
-    # SPA 폴백 - 가장 마지막에 처리
+    # 정적 파일 + SPA 폴백 - 가장 마지막에 처리
     @spa_router.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        """SPA 폴백 라우팅"""
-        # /api로 시작하는 경로는 이 라우터에서 처리하지 않음
-        file_path = STATIC_DIR / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(STATIC_DIR / "index.html")
+    async def serve_spa(full_path: str, request: Request):
+        """정적 파일 또는 SPA 폴백 (색인에 없는 경로는 index.html)"""
+        return static_assets.response(request, full_path)
 
     # SPA 라우터를 가장 마지막에 등록 (API 라우터 이후)
     app.include_router(spa_router, tags=["SPA"])
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-from datetime import datetime
+from typing import Any, Dict, Optional
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -16,6 +16,22 @@ class LoanStatus(str, Enum):
     OVERDUE = "OVERDUE"
 
 
+class HoldStatus(str, Enum):
+    WAITING = "WAITING"
+    READY = "READY"
+    FULFILLED = "FULFILLED"
+    CANCELLED = "CANCELLED"
+    EXPIRED = "EXPIRED"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
 # ==================== User Schemas ====================
 class UserBase(BaseModel):
     email: EmailStr
@@ -87,6 +103,41 @@ class Book(BookBase):
         from_attributes = True
 
 
+class BookCard(BaseModel):
+    """목록/그리드용 축약 도서 (fields=card)"""
+    book_id: int
+    title: str
+    author: str
+    category: Optional[str] = None
+    stock_quantity: int
+
+    class Config:
+        from_attributes = True
+
+
+class BookFields(BaseModel):
+    """fields=로 고른 필드만 담은 도서 (book_id 외에는 요청한 필드만 응답에 포함)"""
+    book_id: int
+    isbn: Optional[str] = None
+    title: Optional[str] = None
+    author: Optional[str] = None
+    publisher: Optional[str] = None
+    published_year: Optional[int] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    stock_quantity: Optional[int] = None
+    cover_image: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class BookChanges(BaseModel):
+    changes: list[Book] = Field(..., description="추가/수정된 도서 (변경 순서)")
+    deleted: list[int] = Field(..., description="삭제된 도서 ID")
+    next_token: str = Field(..., description="다음 요청의 since 값")
+    has_more: bool = Field(..., description="남은 변경이 있으면 next_token으로 이어서 요청")
+    reset: bool = Field(False, description="토큰이 유효하지 않아 처음부터 다시 동기화해야 함 (로컬 사본 폐기)")
+
+
 # ==================== Loan Schemas ====================
 class LoanBase(BaseModel):
     user_id: int
@@ -124,6 +175,33 @@ class LoanResponse(BaseModel):
     loan: Optional[Loan] = None
 
 
+# ==================== Hold Schemas ====================
+class HoldCreate(BaseModel):
+    user_id: int
+    book_id: int
+
+
+class Hold(BaseModel):
+    hold_id: int
+    user_id: int
+    book_id: int
+    status: HoldStatus
+    position: Optional[int] = Field(None, description="대기 순번 (대기 중일 때만)")
+    created_at: datetime
+    ready_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = Field(None, description="수령 기한 (배정된 경우)")
+    book_title: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class HoldResponse(BaseModel):
+    success: bool
+    message: str
+    hold: Optional[Hold] = None
+
+
 # ==================== Review Schemas ====================
 class ReviewBase(BaseModel):
     book_id: int
@@ -165,3 +243,72 @@ class SystemConfig(BaseModel):
 
 class SystemConfigUpdate(BaseModel):
     value: str
+
+
+# ==================== Dashboard Schemas ====================
+class DailyLoanCount(BaseModel):
+    day: date
+    loans: int
+    returns: int
+    active_users: int
+
+
+class TopBook(BaseModel):
+    book_id: int
+    title: str
+    total_loans: int
+    active_loans: int
+
+
+class CategoryUtilization(BaseModel):
+    category: str
+    total_loans: int
+    active_loans: int
+    total_copies: int
+    utilization: float = Field(..., description="대출 중 권수 / 소장 권수")
+
+
+class DashboardStats(BaseModel):
+    days: int
+    overdue_count: int
+    active_loans: int
+    active_users: int = Field(..., description="기간 내 대출/반납한 사용자 수")
+    daily: list[DailyLoanCount]
+    top_books: list[TopBook]
+    categories: list[CategoryUtilization]
+    reconciled_at: Optional[datetime] = None
+
+
+# ==================== Job Schemas ====================
+class JobCreate(BaseModel):
+    kind: str = Field(..., description="작업 종류 (GET /api/admin/jobs/kinds)")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="작업 인자")
+    max_attempts: Optional[int] = Field(None, ge=1, le=10)
+
+
+class Job(BaseModel):
+    job_id: int
+    kind: str
+    payload: Dict[str, Any]
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    locked_by: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobSchedule(BaseModel):
+    name: str
+    kind: str
+    interval_seconds: int
+    next_run_at: datetime
+    last_job_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,491 @@
+"""
+Outbox - 도서/대출/리뷰 변경 이벤트 기록과 전달 (transactional outbox)
+
+기록: ORM 세션이 flush할 때(after_flush) 변경된 Book / Loan / Review 행마다 outbox_events에 한 행을 남긴다.
+변경과 같은 트랜잭션이므로 커밋된 변경에는 반드시 이벤트가 있고, 롤백된 변경의 이벤트는 남지 않는다.
+Core INSERT(대량 등록)처럼 flush를 거치지 않는 쓰기는 record_event로 직접 기록한다.
+
+전달: OutboxDispatcher가 이벤트를 event_id 순서대로 읽어 등록된 소비자에게 넘기고, 소비자별로 처리한 위치를
+체크포인트로 저장한다. 소비자가 실패하면 체크포인트를 움직이지 않고 다음 주기에 같은 이벤트부터 다시 시도한다.
+    - durable 소비자: 체크포인트를 outbox_checkpoints에 저장 (재시작 후 이어서 처리)
+    - 비 durable 소비자: 프로세스 메모리에만 유지, 시작 시점 이후 이벤트만 받음 (캐시, 실시간 알림 등)
+
+순서 보장: event_id는 INSERT 시점에 정해지지만 커밋 순서는 다를 수 있다. 아직 커밋되지 않은 트랜잭션이 만든
+빈 번호(gap)가 있으면 그 뒤 이벤트는 전달하지 않고 기다린다. 같은 프로세스에서 롤백된 번호와, 번호를 받은
+트랜잭션이 끝났음을 DB로 확인한 번호(_gap_closed)는 바로 건너뛰고, 확인할 수 없는 빈 번호는 gap_timeout_seconds가
+지나면 건너뛴다. 건너뛴 번호는 gap_recheck_seconds 동안 매 주기 다시 조회해서, 그 사이 늦게 커밋된 이벤트는
+순서와 관계없이 소비자에게 따로 전달한다 (late). 그때까지도 나타나지 않은 번호는 영구 결번으로 세고 경고를 남긴다
+(stats의 late_events / lost_event_ids). 늦은 이벤트의 재시도 목록은 메모리에만 있으므로, 프로세스가 그 사이
+재시작되면 전달되지 않을 수 있다.
+"""
+import asyncio
+import enum
+import json
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect as sa_inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.db_models import Book as BookModel, Loan as LoanModel, OutboxCheckpoint, OutboxEvent as OutboxEventModel, Review as ReviewModel
+
+logger = logging.getLogger("app.outbox")
+
+# 이벤트를 남기는 모델 → entity 이름
+TRACKED_MODELS = {
+    BookModel: "books",
+    LoanModel: "loans",
+    ReviewModel: "reviews",
+}
+
+_events = OutboxEventModel.__table__
+_checkpoints = OutboxCheckpoint.__table__
+
+_SESSION_KEY = "outbox_event_ids"
+_FLUSHED_KEY = "outbox_flushed_events"
+
+
+def _json_value(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    return json.dumps(data, ensure_ascii=False, default=_json_value)
+
+
+class OutboxEvent:
+    """소비자에게 전달되는 변경 이벤트"""
+
+    __slots__ = ("event_id", "entity", "entity_id", "op", "payload", "created_at")
+
+    def __init__(self, event_id: int, entity: str, entity_id: Optional[int], op: str, payload: Dict[str, Any], created_at: datetime):
+        self.event_id = event_id
+        self.entity = entity
+        self.entity_id = entity_id
+        self.op = op
+        self.payload = payload
+        self.created_at = created_at
+
+    def changed(self, field: str) -> Optional[tuple]:
+        """update 이벤트에서 field가 바뀌었으면 (이전 값, 새 값)"""
+        values = self.payload.get("changed", {}).get(field)
+        return tuple(values) if values is not None else None
+
+    def __repr__(self):
+        return f"<OutboxEvent({self.event_id}, {self.entity}:{self.entity_id} {self.op})>"
+
+
+# ========== 기록 ==========
+
+def record_event(db: Session, entity: str, op: str, payload: Dict[str, Any], entity_id: Optional[int] = None) -> int:
+    """이벤트 한 건 기록 (호출 측 트랜잭션 안에서). event_id 반환"""
+    result = db.execute(
+        insert(_events).values(
+            entity=entity,
+            entity_id=entity_id,
+            op=op,
+            payload=_dumps(payload),
+            created_at=datetime.now(),
+        )
+    )
+    event_id = result.inserted_primary_key[0]
+    db.info.setdefault(_SESSION_KEY, []).append(event_id)
+    return event_id
+
+
+def _row_snapshot(state) -> Dict[str, Any]:
+    # 로드된 컬럼만 사용 (flush 중에 추가 SELECT를 일으키지 않음)
+    return {attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs if attr.key in state.dict}
+
+
+def _primary_key(state) -> Optional[int]:
+    column = state.mapper.primary_key[0]
+    return state.dict.get(state.mapper.get_property_by_column(column).key)
+
+
+def flushed_events(session: Session, model) -> List[Tuple[Any, str, int]]:
+    """
+    직전 flush에서 이벤트를 남긴 model 객체들의 (객체, op, event_id).
+    같은 flush의 after_flush_postexec에서 호출한다 (다음 flush가 시작되면 바뀜)
+    """
+    return [item for item in session.info.get(_FLUSHED_KEY, ()) if isinstance(item[0], model)]
+
+
+def _record_object_event(session: Session, obj, entity: str, op: str, payload: Dict[str, Any], state):
+    event_id = record_event(session, entity, op, payload, _primary_key(state))
+    session.info[_FLUSHED_KEY].append((obj, op, event_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush_events(session: Session, flush_context):
+    """flush된 변경마다 이벤트 기록 (flush 직후라 새 행의 ID와 변경 이력을 모두 볼 수 있음)"""
+    session.info[_FLUSHED_KEY] = []
+    for obj in list(session.new):
+        entity = TRACKED_MODELS.get(type(obj))
+        if entity:
+            state = sa_inspect(obj)
+            _record_object_event(session, obj, entity, "insert", {"row": _row_snapshot(state)}, state)
+
+    for obj in list(session.dirty):
+        entity = TRACKED_MODELS.get(type(obj))
+        if not entity:
+            continue
+        state = sa_inspect(obj)
+        changed = {}
+        for attr in state.mapper.column_attrs:
+            history = state.attrs[attr.key].history
+            if history.added:
+                old = history.deleted[0] if history.deleted else None
+                changed[attr.key] = [old, history.added[0]]
+        if changed:
+            _record_object_event(session, obj, entity, "update", {"changed": changed, "row": _row_snapshot(state)}, state)
+
+    for obj in list(session.deleted):
+        entity = TRACKED_MODELS.get(type(obj))
+        if entity:
+            state = sa_inspect(obj)
+            _record_object_event(session, obj, entity, "delete", {"row": _row_snapshot(state)}, state)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session):
+    session.info.pop(_FLUSHED_KEY, None)
+    if session.info.pop(_SESSION_KEY, None):
+        outbox_dispatcher.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session):
+    session.info.pop(_FLUSHED_KEY, None)
+    event_ids = session.info.pop(_SESSION_KEY, None)
+    if event_ids:
+        outbox_dispatcher.discard(event_ids)
+
+
+# ========== 전달 ==========
+
+Handler = Callable[[List[OutboxEvent]], None]
+
+
+class Consumer:
+    def __init__(self, name: str, handler: Handler, entities: Optional[Set[str]], durable: bool):
+        self.name = name
+        self.handler = handler
+        self.entities = entities
+        self.durable = durable
+        self.checkpoint: Optional[int] = None
+        self.delivered = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.retry_at: Optional[datetime] = None
+        self.late: List[OutboxEvent] = []  # 체크포인트보다 앞 번호로 늦게 커밋되어 따로 전달할 이벤트
+
+
+class OutboxDispatcher:
+    """이벤트를 순서대로 소비자에게 전달하고 체크포인트를 관리"""
+
+    def __init__(self, batch_size: int = 500, poll_interval: float = 2.0, gap_timeout: float = 2.0, gap_recheck: float = 300.0):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.gap_timeout = gap_timeout
+        self.gap_recheck = gap_recheck
+        self._consumers: Dict[str, Consumer] = {}
+        self._safe_id: Optional[int] = None  # 이 번호까지는 빈 번호 없이 확정됨
+        self._discarded: Set[int] = set()
+        self._skipped: Dict[int, datetime] = {}  # 시간 초과로 건너뛴 번호 → 건너뛴 시각 (다시 확인 중)
+        self._gap_noticed: Dict[int, datetime] = {}  # 기다리는 빈 번호 → 처음 본 시각 (DB 시계, MySQL)
+        self._inspect_transactions = True
+        self._late_events = 0
+        self._lost_event_ids = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_settings(cls) -> "OutboxDispatcher":
+        from app.config import get_settings
+        settings = get_settings()
+        return cls(
+            batch_size=settings.outbox_batch_size,
+            poll_interval=settings.outbox_poll_interval_seconds,
+            gap_timeout=settings.outbox_gap_timeout_seconds,
+            gap_recheck=settings.outbox_gap_recheck_seconds,
+        )
+
+    def register(self, name: str, handler: Handler, entities: Optional[Iterable[str]] = None, durable: bool = True):
+        """소비자 등록. handler는 이벤트 목록을 받는 동기 함수 (워커 스레드에서 호출)"""
+        self._consumers[name] = Consumer(name, handler, set(entities) if entities else None, durable)
+
+    def checkpoint(self, name: str) -> Optional[int]:
+        """소비자가 처리한 마지막 event_id (전달을 시작하기 전이면 None)"""
+        consumer = self._consumers.get(name)
+        return consumer.checkpoint if consumer else None
+
+    @property
+    def safe_event_id(self) -> Optional[int]:
+        """빈 번호 없이 확정된 최대 event_id (첫 전달 주기 전이면 None)"""
+        return self._safe_id
+
+    # ----- 깨우기 / 결번 (어느 스레드에서든 호출 가능) -----
+
+    def wake(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(wakeup.set)
+
+    def discard(self, event_ids: Iterable[int]):
+        with self._lock:
+            self._discarded.update(event_ids)
+
+    # ----- 처리 -----
+
+    def _load_checkpoints(self, db: Session):
+        if all(consumer.checkpoint is not None for consumer in self._consumers.values()):
+            return
+        top = db.execute(select(func.max(_events.c.event_id))).scalar() or 0
+        saved = dict(db.execute(select(_checkpoints.c.consumer, _checkpoints.c.last_event_id)).all())
+        for consumer in self._consumers.values():
+            if consumer.checkpoint is not None:
+                continue
+            if consumer.durable:
+                # 처음 등록된 durable 소비자는 현재 위치부터 시작 (과거 이벤트 재생이 필요하면 체크포인트를 0으로 설정)
+                consumer.checkpoint = saved.get(consumer.name, top)
+                if consumer.name not in saved:
+                    db.execute(insert(_checkpoints).values(consumer=consumer.name, last_event_id=top, updated_at=datetime.now()))
+            else:
+                consumer.checkpoint = top
+        if self._safe_id is None:
+            self._safe_id = min((c.checkpoint for c in self._consumers.values()), default=top)
+        db.commit()
+
+    def _advance_safe_id(self, db: Session):
+        """빈 번호 없이 확정된 최대 event_id 갱신"""
+        expired_before = datetime.now() - timedelta(seconds=self.gap_timeout)
+        rows = db.execute(
+            select(_events.c.event_id, _events.c.created_at)
+            .where(_events.c.event_id > self._safe_id)
+            .order_by(_events.c.event_id)
+            .limit(self.batch_size * 4)
+        ).all()
+        now = datetime.now()
+        with self._lock:
+            discarded = set(self._discarded)
+        safe_id = self._safe_id
+        skipped: Dict[int, datetime] = {}
+        for event_id, created_at in rows:
+            gap = [missing for missing in range(safe_id + 1, event_id) if missing not in discarded]
+            if gap and created_at > expired_before and not self._gap_closed(db, gap[0]):
+                # 앞 번호를 가진 트랜잭션이 아직 진행 중일 수 있음
+                break
+            for missing in gap:
+                skipped[missing] = now
+            safe_id = event_id
+        with self._lock:
+            self._safe_id = safe_id
+            self._skipped.update(skipped)
+            self._discarded = {event_id for event_id in self._discarded if event_id > self._safe_id}
+            self._gap_noticed = {event_id: at for event_id, at in self._gap_noticed.items() if event_id > self._safe_id}
+            self._recheck_skipped(db, now)
+
+    def _gap_closed(self, db: Session, missing: int) -> bool:
+        """
+        빈 번호를 받은 트랜잭션이 이미 끝났는지 (True면 gap_timeout을 기다리지 않고 건너뜀).
+        SQLite: 쓰기 트랜잭션은 번호를 받은 뒤 커밋/롤백할 때까지 쓰기 잠금을 잡으므로, 뒤 번호가 커밋되어 보이면
+        앞의 빈 번호는 이미 롤백된 것이다.
+        MySQL: 빈 번호를 처음 본 시각(DB 시계) 또는 그 전에 시작해 아직 열려 있는 트랜잭션이 없으면 끝난 것이다
+        (information_schema.innodb_trx 조회, PROCESS 권한 필요). 조회할 수 없으면 gap_timeout까지 기다린다.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            return True
+        if dialect != "mysql" or not self._inspect_transactions:
+            return False
+        try:
+            noticed = self._gap_noticed.get(missing)
+            if noticed is None:
+                noticed = self._gap_noticed[missing] = db.execute(select(func.now())).scalar()
+            oldest = db.execute(text(
+                "SELECT MIN(trx_started) FROM information_schema.innodb_trx WHERE trx_mysql_thread_id <> CONNECTION_ID()"
+            )).scalar()
+        except Exception:
+            self._inspect_transactions = False
+            logger.warning("cannot read information_schema.innodb_trx; outbox gaps wait for gap_timeout", exc_info=True)
+            return False
+        return oldest is None or oldest > noticed
+
+    def _recheck_skipped(self, db: Session, now: datetime):
+        """건너뛴 번호 중 늦게 커밋된 이벤트를 찾아 소비자별 late 목록에 추가하고, 기한이 지난 번호는 결번 처리"""
+        discarded = self._skipped.keys() & self._discarded
+        for event_id in discarded:
+            del self._skipped[event_id]
+        self._discarded -= discarded
+        if not self._skipped:
+            return
+
+        rows = db.execute(select(_events).where(_events.c.event_id.in_(list(self._skipped)))).all()
+        for row in rows:
+            del self._skipped[row.event_id]
+            late = OutboxEvent(row.event_id, row.entity, row.entity_id, row.op, json.loads(row.payload), row.created_at)
+            self._late_events += 1
+            logger.warning("outbox event %s committed after its gap was skipped; delivering out of order", row.event_id)
+            for consumer in self._consumers.values():
+                if consumer.checkpoint is not None and consumer.checkpoint >= row.event_id and \
+                        (not consumer.entities or row.entity in consumer.entities):
+                    consumer.late.append(late)
+
+        recheck_before = now - timedelta(seconds=self.gap_recheck)
+        lost = sorted(event_id for event_id, skipped_at in self._skipped.items() if skipped_at < recheck_before)
+        for event_id in lost:
+            del self._skipped[event_id]
+        if lost:
+            self._lost_event_ids += len(lost)
+            logger.warning("outbox event ids %s never committed; treating them as permanent gaps", lost)
+
+    def _deliver_late(self, consumer: Consumer) -> bool:
+        """늦게 커밋된 이벤트 전달 (실패하면 다음 주기에 다시 시도). 성공하면 True"""
+        if not consumer.late:
+            return True
+        if consumer.retry_at and datetime.now() < consumer.retry_at:
+            return False
+        try:
+            consumer.handler(list(consumer.late))
+        except Exception as e:
+            consumer.failures += 1
+            consumer.last_error = f"{type(e).__name__}: {e}"
+            consumer.retry_at = datetime.now() + timedelta(seconds=min(2 ** consumer.failures, 300))
+            logger.exception("outbox consumer %s failed on late events %s", consumer.name, [late.event_id for late in consumer.late])
+            return False
+        consumer.failures = 0
+        consumer.retry_at = None
+        consumer.delivered += len(consumer.late)
+        consumer.late = []
+        return True
+
+    def _deliver(self, db: Session, consumer: Consumer) -> bool:
+        """소비자에게 한 배치 전달. 더 보낼 이벤트가 남아 있으면 True"""
+        if consumer.checkpoint >= self._safe_id:
+            return False
+        if consumer.retry_at and datetime.now() < consumer.retry_at:
+            return False
+
+        query = (
+            select(_events)
+            .where(_events.c.event_id > consumer.checkpoint, _events.c.event_id <= self._safe_id)
+            .order_by(_events.c.event_id)
+            .limit(self.batch_size)
+        )
+        if consumer.entities:
+            query = query.where(_events.c.entity.in_(consumer.entities))
+        rows = db.execute(query).all()
+        events = [
+            OutboxEvent(row.event_id, row.entity, row.entity_id, row.op, json.loads(row.payload), row.created_at)
+            for row in rows
+        ]
+
+        if events:
+            try:
+                consumer.handler(events)
+            except Exception as e:
+                consumer.failures += 1
+                consumer.last_error = f"{type(e).__name__}: {e}"
+                # 실패가 이어지면 재시도 간격을 늘림 (최대 5분)
+                consumer.retry_at = datetime.now() + timedelta(seconds=min(2 ** consumer.failures, 300))
+                logger.exception("outbox consumer %s failed at event %s", consumer.name, events[0].event_id)
+                return False
+            consumer.failures = 0
+            consumer.retry_at = None
+            consumer.delivered += len(events)
+
+        # 필터로 걸러진 이벤트도 지나간 것으로 처리
+        full_batch = len(rows) == self.batch_size
+        consumer.checkpoint = events[-1].event_id if full_batch else self._safe_id
+        if consumer.durable:
+            db.execute(
+                _checkpoints.update()
+                .where(_checkpoints.c.consumer == consumer.name)
+                .values(last_event_id=consumer.checkpoint, updated_at=datetime.now())
+            )
+            db.commit()
+        return full_batch
+
+    def run_once(self, db: Session) -> int:
+        """확정된 이벤트를 모든 소비자에게 전달. 전달한 배치 수 반환"""
+        if not self._consumers:
+            return 0
+        self._load_checkpoints(db)
+        self._advance_safe_id(db)
+        batches = 0
+        for consumer in self._consumers.values():
+            if not self._deliver_late(consumer):
+                continue
+            while self._deliver(db, consumer):
+                batches += 1
+        db.commit()
+        return batches
+
+    def run_once_in_new_session(self) -> int:
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return self.run_once(db)
+        finally:
+            db.close()
+
+    async def run(self):
+        """커밋 알림 또는 poll_interval마다 전달 (앱 lifespan에서 태스크로 실행)"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.run_once_in_new_session)
+            except Exception:
+                logger.exception("outbox dispatch failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def prune(self, db: Session, older_than_days: int) -> int:
+        """모든 소비자가 처리했고 older_than_days보다 오래된 이벤트 삭제 (outbox.prune 작업으로 주기 실행)"""
+        checkpoints = [c.checkpoint for c in self._consumers.values() if c.checkpoint is not None]
+        saved = db.execute(select(func.min(_checkpoints.c.last_event_id))).scalar()
+        if saved is not None:
+            checkpoints.append(saved)
+        floor = min(checkpoints, default=self._safe_id or 0)
+        before = datetime.now() - timedelta(days=older_than_days)
+        result = db.execute(delete(_events).where(_events.c.event_id <= floor, _events.c.created_at < before))
+        db.commit()
+        return result.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "safe_event_id": self._safe_id,
+            "skipped_event_ids": len(self._skipped),
+            "late_events": self._late_events,
+            "lost_event_ids": self._lost_event_ids,
+            "consumers": {
+                c.name: {
+                    "durable": c.durable,
+                    "entities": sorted(c.entities) if c.entities else None,
+                    "checkpoint": c.checkpoint,
+                    "lag": (self._safe_id or 0) - (c.checkpoint or 0),
+                    "late_pending": len(c.late),
+                    "delivered": c.delivered,
+                    "failures": c.failures,
+                    "last_error": c.last_error,
+                }
+                for c in self._consumers.values()
+            },
+        }
+
+
+outbox_dispatcher = OutboxDispatcher.from_settings()
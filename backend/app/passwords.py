@@ -0,0 +1,112 @@
+"""
+Passwords - 비밀번호 해싱 서비스
+메모리 집약적인 scrypt(표준 라이브러리 hashlib)로 해싱하고, 해싱/검증은 전용 워커 풀에서 실행해
+로그인이 몰려도 이벤트 루프(다른 API 요청)가 멈추지 않도록 한다.
+
+저장 형식: scrypt$<n>$<r>$<p>$<salt(base64)>$<hash(base64)>
+이전 방식(솔트 없는 SHA-256 hex)도 검증하며, 로그인 성공 시 새 형식으로 재해싱한다.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from app.config import get_settings
+
+SCRYPT_PREFIX = "scrypt"
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+_executor: Optional[Executor] = None
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=256 * n * r + 1024 * 1024,
+        dklen=HASH_BYTES,
+    )
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def hash_password_sync(password: str) -> str:
+    """비밀번호 해싱 (동기 - 시드 데이터, 스크립트, 워커 풀 내부용)"""
+    settings = get_settings()
+    n, r, p = settings.password_hash_n, settings.password_hash_r, settings.password_hash_p
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, n, r, p)
+    return f"{SCRYPT_PREFIX}${n}${r}${p}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password_sync(password: str, stored: str) -> Tuple[bool, bool]:
+    """
+    비밀번호 검증 (동기).
+    (일치 여부, 재해싱 필요 여부)를 반환 - 이전 SHA-256 형식이거나 비용 설정이 바뀐 경우 재해싱 필요
+    """
+    if _LEGACY_SHA256.match(stored):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored), True
+
+    try:
+        prefix, n, r, p, salt, digest = stored.split("$")
+        n, r, p = int(n), int(r), int(p)
+        salt, digest = base64.b64decode(salt), base64.b64decode(digest)
+    except ValueError:
+        return False, False
+    if prefix != SCRYPT_PREFIX:
+        return False, False
+
+    ok = hmac.compare_digest(_scrypt(password, salt, n, r, p), digest)
+    settings = get_settings()
+    needs_rehash = (n, r, p) != (settings.password_hash_n, settings.password_hash_r, settings.password_hash_p)
+    return ok, needs_rehash
+
+
+# ========== 워커 풀 ==========
+
+def get_password_executor() -> Executor:
+    """해싱 전용 워커 풀 (최대 작업 수가 정해져 있어 CPU를 다른 요청과 나눠 씀)"""
+    global _executor
+    if _executor is None:
+        settings = get_settings()
+        workers = max(settings.password_hash_workers, 1)
+        if settings.password_hash_executor == "process":
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            # hashlib.scrypt는 계산 중 GIL을 놓으므로 스레드 풀로도 병렬 실행된다
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+    return _executor
+
+
+def shutdown_password_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def hash_password(password: str) -> str:
+    """비밀번호 해싱 (워커 풀에서 실행)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), hash_password_sync, password)
+
+
+async def verify_password(password: str, stored: str) -> Tuple[bool, bool]:
+    """비밀번호 검증 (워커 풀에서 실행). 이전 SHA-256 형식은 비용이 작아 바로 확인"""
+    if _LEGACY_SHA256.match(stored):
+        return verify_password_sync(password, stored)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), verify_password_sync, password, stored)
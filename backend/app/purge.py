@@ -0,0 +1,121 @@
+"""
+Purge - 회원/도서 삭제 시 딸린 대출, 리뷰, 예약 정리
+
+대출/리뷰/예약의 외래 키는 ON DELETE CASCADE이고 관계는 passive_deletes이므로, 부모 행 하나를 지우면
+DB가 딸린 행을 함께 지운다 (ORM이 자식 행을 메모리로 읽어 한 건씩 DELETE하지 않음).
+딸린 행이 purge_inline_max_rows보다 많으면 한 트랜잭션이 너무 커지므로 백그라운드 작업(users.purge / books.purge)으로
+purge_batch_size 건씩 나눠 지우고 배치마다 커밋한 뒤 마지막에 부모 행을 지운다. 작업이 끝나기 전까지 부모 행은 남아 있고,
+중간에 실패해도 이미 지운 배치는 그대로이며 다시 실행하면 남은 행부터 이어서 지운다.
+
+DB가 지운 행은 flush를 거치지 않으므로 outbox 이벤트를 직접 남긴다 (리뷰 목록 ETag 등이 바뀌도록).
+    도서 삭제: reviews bulk_delete {"book_id": ...}  → 그 도서의 리뷰 버전만 올림
+    회원 삭제: reviews bulk_delete {"user_id": ...}  → 여러 도서에 걸치므로 리뷰 전체 버전을 올림
+대시보드 집계는 다른 삭제와 마찬가지로 주기적인 재계산(rollups.reconcile)으로 맞춘다.
+
+예약: 회원의 대기/배정 중 예약은 DB cascade나 배치 DELETE로 바로 지우지 않고, 먼저 도서 행을 잠근 뒤
+cancel_hold로 취소한다 (뒤 대기자의 순번을 당기고, 배정된 한 권은 다음 대기자에게 넘김). 부모 행을 지우는
+트랜잭션에서 한 번 더 확인하므로, 백그라운드 삭제 중에 새로 생긴 예약도 대기열 규칙을 거친다.
+도서를 지우면 그 도서의 대기열(hold_queues)도 함께 지워지므로 도서 예약은 그대로 cascade로 지운다.
+"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.db_models import Book as BookModel, Hold as HoldModel, Loan as LoanModel, Review as ReviewModel, User as UserModel
+from app.holds import ACTIVE_HOLD_STATUSES, cancel_hold, lock_book
+from app.outbox import record_event
+
+# 부모 행을 지울 때 함께 지워지는 테이블 (outbox 엔티티 이름 → 모델, 기본 키)
+CHILD_TABLES = {
+    "loans": (LoanModel, LoanModel.loan_id),
+    "reviews": (ReviewModel, ReviewModel.review_id),
+    "holds": (HoldModel, HoldModel.hold_id),
+}
+
+# 부모 종류 → (모델, 자식 테이블의 외래 키 컬럼 이름)
+PARENTS = {
+    "users": (UserModel, "user_id"),
+    "books": (BookModel, "book_id"),
+}
+
+
+def related_rows(db: Session, parent: str, parent_id: int) -> Dict[str, int]:
+    """부모 행을 지우면 함께 지워질 행 수 (테이블별, 한 번의 조회)"""
+    _, column = PARENTS[parent]
+    counts = db.execute(select(*[
+        select(func.count()).select_from(model).where(getattr(model, column) == parent_id).scalar_subquery().label(entity)
+        for entity, (model, _) in CHILD_TABLES.items()
+    ])).one()
+    return dict(counts._mapping)
+
+
+def record_cascade_events(db: Session, parent: str, parent_id: int, counts: Dict[str, int]):
+    """DB cascade로 지워지는 행의 outbox 이벤트 (flush를 거치지 않으므로 직접 기록)"""
+    _, column = PARENTS[parent]
+    for entity in ("loans", "reviews"):
+        if counts.get(entity):
+            record_event(db, entity, "bulk_delete", {column: parent_id, "count": counts[entity]})
+
+
+def cancel_active_holds(db: Session, parent: str, parent_id: int) -> int:
+    """회원의 대기/배정 중 예약을 대기열 규칙대로 취소 (도서 행 잠금 → 예약 행 잠금 순서). 취소 건수 반환"""
+    if parent != "users":
+        return 0
+    cancelled = 0
+    while True:
+        # 취소하는 동안 새로 생긴 예약이 cascade로 지워지지 않도록 남은 예약이 없을 때까지 확인
+        holds = db.query(HoldModel.hold_id, HoldModel.book_id).filter(
+            HoldModel.user_id == parent_id,
+            HoldModel.status.in_(ACTIVE_HOLD_STATUSES)
+        ).order_by(HoldModel.book_id).all()
+        if not holds:
+            return cancelled
+        for hold_id, book_id in holds:
+            lock_book(db, book_id)
+            hold = db.query(HoldModel).filter(HoldModel.hold_id == hold_id).with_for_update().populate_existing().first()
+            if hold is not None and hold.status in ACTIVE_HOLD_STATUSES:
+                cancel_hold(db, hold)
+                cancelled += 1
+        db.flush()
+
+
+def delete_now(db: Session, parent: str, obj, counts: Dict[str, int]):
+    """부모 행 삭제 (예약은 먼저 취소하고, 딸린 행은 DB가 함께 삭제). 커밋은 호출 측이"""
+    _, column = PARENTS[parent]
+    parent_id = getattr(obj, column)
+    cancel_active_holds(db, parent, parent_id)
+    record_cascade_events(db, parent, parent_id, counts)
+    db.delete(obj)
+
+
+def purge(db: Session, parent: str, parent_id: int, batch_size: int) -> Dict[str, Any]:
+    """딸린 행을 batch_size 건씩 지우고(배치마다 커밋) 마지막에 부모 행 삭제. 반복 실행해도 안전"""
+    model, column = PARENTS[parent]
+    deleted: Dict[str, int] = {"cancelled_holds": cancel_active_holds(db, parent, parent_id)}
+    db.commit()
+    for entity, (child, primary_key) in CHILD_TABLES.items():
+        condition = getattr(child, column) == parent_id
+        if entity == "holds" and parent == "users":
+            # 대기/배정 중 예약은 배치로 지우지 않음 (마지막 트랜잭션에서 cancel_hold를 거쳐 정리)
+            condition = condition & HoldModel.status.not_in(ACTIVE_HOLD_STATUSES)
+        deleted[entity] = 0
+        while True:
+            # MySQL은 DELETE 대상 테이블을 같은 문장의 서브쿼리에서 읽을 수 없으므로 ID를 먼저 가져옴
+            ids = db.execute(select(primary_key).where(condition).order_by(primary_key).limit(batch_size)).scalars().all()
+            if not ids:
+                break
+            db.execute(delete(child).where(primary_key.in_(ids)))
+            if entity != "holds":
+                record_event(db, entity, "bulk_delete", {column: parent_id, "count": len(ids)})
+            db.commit()
+            deleted[entity] += len(ids)
+
+    obj: Optional[Any] = db.get(model, parent_id)
+    if obj is not None:
+        # 배치 삭제 중에 새로 생긴 예약/이력은 부모 행과 같은 트랜잭션에서 정리
+        deleted["cancelled_holds"] += cancel_active_holds(db, parent, parent_id)
+        record_cascade_events(db, parent, parent_id, related_rows(db, parent, parent_id))
+        db.delete(obj)
+        db.commit()
+    return {"parent": parent, "id": parent_id, "parent_deleted": obj is not None, **deleted}
@@ -0,0 +1,204 @@
+"""
+Read Cache - 인기 도서 조회용 프로세스 내 read-through 캐시 (TTL + 크기 제한 LRU + single-flight)
+
+같은 키의 조회가 동시에 여러 번 miss 나면 첫 요청만 DB를 조회하고 나머지는 그 결과를 기다린다.
+조회는 스레드풀에서 실행되므로 그동안 이벤트 루프는 다른 요청을 처리한다. 값은 인코딩된 JSON 바이트로 저장해
+hit이면 DB 조회와 직렬화를 모두 건너뛴다.
+
+무효화:
+    - 이 프로세스의 변경: 대출/반납(loans.py), 관리자 수정(books.py), AI 도구(ai_tools.py) 등 어느 경로든 ORM 세션이
+      도서 행을 flush하므로, 커밋 직후(after_commit) 그 트랜잭션에서 바뀐 도서의 항목을 바로 지운다.
+      (쓰기 요청 직후의 조회가 이전 값을 보지 않음)
+    - 다른 프로세스의 변경, Core INSERT(대량 등록): outbox 이벤트로 남으므로 http_cache의 outbox 소비자가
+      ETag 버전을 올리기 직전에 invalidate_catalog로 지운다 (새 ETag가 보이는 시점에는 이전 내용이 남아 있지 않음).
+      전달 지연 동안의 오래된 값은 TTL로도 제한된다.
+
+태그: 항목마다 무효화 단위를 붙인다.
+    books          모든 도서 항목 (대상 행을 알 수 없는 변경 - 대량 등록 등)
+    books:<id>     도서 상세
+    books:list     목록/검색 결과 (어느 도서가 바뀌어도 무효화)
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.db_models import Book as BookModel
+from app.outbox import OutboxEvent
+
+
+class _Flight:
+    """진행 중인 조회 하나 (같은 키의 동시 요청이 함께 기다림)"""
+
+    __slots__ = ("task", "tags", "stale")
+
+    def __init__(self, tags: frozenset):
+        self.task: Optional[asyncio.Future] = None
+        self.tags = tags
+        self.stale = False  # 조회 중에 무효화됨 → 결과를 캐시에 넣지 않음
+
+
+class ReadThroughCache:
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, frozenset]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        self._flights: Dict[Hashable, _Flight] = {}
+        # outbox 워커 스레드의 무효화와 이벤트 루프의 조회가 함께 접근
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_settings(cls) -> "ReadThroughCache":
+        settings = get_settings()
+        return cls(
+            max_entries=settings.read_cache_max_entries,
+            ttl=settings.read_cache_ttl_seconds,
+            enabled=settings.read_cache_enabled,
+        )
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Any], tags: Iterable[str] = ()) -> Any:
+        """캐시된 값 또는 loader 결과 (loader는 스레드풀에서 실행되는 동기 함수, None도 캐시)"""
+        if not self.enabled:
+            return await run_in_threadpool(loader)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            flight = self._flights.get(key)
+            if flight is None:
+                self.misses += 1
+                flight = _Flight(frozenset(tags))
+                self._flights[key] = flight
+                flight.task = asyncio.ensure_future(self._load(key, flight, loader))
+            else:
+                self.coalesced += 1
+        # 먼저 요청한 쪽이 연결을 끊어도 조회는 끝까지 진행 (기다리는 다른 요청이 있음)
+        return await asyncio.shield(flight.task)
+
+    async def _load(self, key: Hashable, flight: _Flight, loader: Callable[[], Any]) -> Any:
+        try:
+            value = await run_in_threadpool(loader)
+        except BaseException:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            raise
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if not flight.stale:
+                self._store(key, value, flight.tags)
+        return value
+
+    def _store(self, key: Hashable, value: Any, tags: frozenset):
+        self._drop(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl, tags)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def invalidate(self, tags: Iterable[str]):
+        """태그가 붙은 항목 삭제 (어느 스레드에서든 호출 가능). 진행 중인 조회는 결과를 캐시하지 않고 새 요청은 다시 조회"""
+        tags = set(tags)
+        with self._lock:
+            for tag in tags:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+            for key, flight in list(self._flights.items()):
+                if flight.tags & tags:
+                    flight.stale = True
+                    del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            # DB 조회 없이 응답한 비율 (hit + 동시 miss 합류)
+            "served_from_cache_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "in_flight": len(self._flights),
+        }
+
+
+catalog_cache = ReadThroughCache.from_settings()
+
+
+def invalidate_catalog(events: List[OutboxEvent]):
+    """도서 변경 이벤트 → 캐시 무효화 (http_cache 소비자가 ETag 버전을 올리기 전에 호출)"""
+    tags: Set[str] = set()
+    for change in events:
+        if change.entity != "books":
+            continue
+        if change.entity_id is None:
+            tags.add("books")
+        else:
+            tags.update((f"books:{change.entity_id}", "books:list"))
+    if tags:
+        catalog_cache.invalidate(tags)
+
+
+# ========== 같은 프로세스의 변경: 커밋 직후 무효화 ==========
+
+_SESSION_KEY = "read_cache_book_ids"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_books(session: Session, flush_context):
+    """이 트랜잭션에서 flush된 도서 ID 모으기 (커밋될 때 무효화)"""
+    book_ids = [
+        obj.book_id for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, BookModel) and obj.book_id is not None
+    ]
+    if book_ids:
+        session.info.setdefault(_SESSION_KEY, set()).update(book_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_books(session: Session):
+    book_ids = session.info.pop(_SESSION_KEY, None)
+    if book_ids:
+        catalog_cache.invalidate({f"books:{book_id}" for book_id in book_ids} | {"books:list"})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,312 @@
+"""
+Rollups - 관리자 대시보드용 집계 테이블 관리
+대출/반납/연장 시 같은 트랜잭션 안에서 집계 행을 증분 갱신(upsert)하므로
+대시보드 조회는 누적 이력의 크기와 관계없이 작은 집계 테이블만 읽는다.
+도서 카테고리 변경이나 삭제처럼 증분으로 추적하지 않는 변화는 주기적인 재계산(reconcile)으로 맞춘다.
+
+비용: 대출과 반납은 각각 집계 문장 5개(upsert 4 + 활동 사용자 INSERT IGNORE 1), 연장은 2개를 더 실행한다
+(대출 한 건 약 20문장, 반납 약 17문장 중 일부). 집계를 outbox 소비자로 옮기면 이 문장들이 요청 밖으로 빠지지만,
+소비자가 뒤처진 동안 재계산하면 아직 반영되지 않은 변경이 두 번 더해지므로 같은 트랜잭션에서 갱신한다.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import lock_for_write
+from app.db_models import (
+    Book as BookModel,
+    BookLoanStat,
+    CategoryLoanStat,
+    DailyActiveUser,
+    DailyLoanStat,
+    DueDateStat,
+    Hold as HoldModel,
+    HoldStatus,
+    Loan as LoanModel,
+    LoanStatus,
+)
+
+logger = logging.getLogger("app.rollups")
+
+# 마지막 재계산 시각 (대시보드 응답에 표시)
+_last_reconciled_at: Optional[datetime] = None
+
+
+# ========== upsert 헬퍼 ==========
+
+def _upsert(db: Session, model, keys: Dict[str, Any], increments: Dict[str, int]):
+    """키 행이 있으면 컬럼 값을 더하고, 없으면 증분 값으로 새 행 추가 (DB에서 원자적으로 처리)"""
+    table = model.__table__
+    values = {**keys, **increments}
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql_insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update({name: table.c[name] + amount for name, amount in increments.items()})
+        db.execute(stmt)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + amount for name, amount in increments.items()}
+        )
+        db.execute(stmt)
+    else:
+        conditions = [table.c[name] == value for name, value in keys.items()]
+        result = db.execute(
+            update(table).where(*conditions).values({name: table.c[name] + amount for name, amount in increments.items()})
+        )
+        if result.rowcount == 0:
+            db.execute(insert(table).values(**values))
+
+
+def _insert_ignore(db: Session, model, values: Dict[str, Any]):
+    """이미 있는 키면 무시하고 새 행만 추가"""
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        db.execute(mysql_insert(table).values(**values).prefix_with("IGNORE"))
+    elif dialect == "sqlite":
+        db.execute(sqlite_insert(table).values(**values).on_conflict_do_nothing())
+    else:
+        conditions = [table.c[name] == value for name, value in values.items()]
+        if db.execute(select(func.count()).select_from(table).where(*conditions)).scalar() == 0:
+            db.execute(insert(table).values(**values))
+
+
+def _day(value: Optional[datetime]) -> date:
+    return (value or datetime.now()).date()
+
+
+# ========== 증분 갱신 (대출 처리 트랜잭션 안에서 호출, 커밋은 호출 측) ==========
+
+def record_borrow(db: Session, loan: LoanModel, book: BookModel):
+    """대출 발생"""
+    day = _day(loan.loan_date)
+    _upsert(db, DailyLoanStat, {"stat_date": day}, {"loans": 1})
+    _insert_ignore(db, DailyActiveUser, {"stat_date": day, "user_id": loan.user_id})
+    _upsert(db, DueDateStat, {"due_date": loan.due_date.date()}, {"active_loans": 1})
+    _upsert(db, BookLoanStat, {"book_id": book.book_id}, {"total_loans": 1, "active_loans": 1})
+    _upsert(db, CategoryLoanStat, {"category": book.category or ""}, {"total_loans": 1, "active_loans": 1})
+
+
+def record_return(db: Session, loan: LoanModel, book: Optional[BookModel]):
+    """반납 발생"""
+    day = _day(loan.return_date)
+    _upsert(db, DailyLoanStat, {"stat_date": day}, {"returns": 1})
+    _insert_ignore(db, DailyActiveUser, {"stat_date": day, "user_id": loan.user_id})
+    _upsert(db, DueDateStat, {"due_date": loan.due_date.date()}, {"active_loans": -1})
+    if book is not None:
+        _upsert(db, BookLoanStat, {"book_id": book.book_id}, {"active_loans": -1})
+        _upsert(db, CategoryLoanStat, {"category": book.category or ""}, {"active_loans": -1})
+
+
+def record_extend(db: Session, loan: LoanModel, previous_due_date: datetime):
+    """연장으로 반납 예정일 변경"""
+    _upsert(db, DueDateStat, {"due_date": previous_due_date.date()}, {"active_loans": -1})
+    _upsert(db, DueDateStat, {"due_date": loan.due_date.date()}, {"active_loans": 1})
+
+
+# ========== 재계산 ==========
+
+def _as_date(value) -> date:
+    # SQLite의 DATE()는 문자열을 반환
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _apply_deltas(db: Session, model, key_names, values: Dict[tuple, Dict[str, int]], *conditions) -> int:
+    """
+    집계 테이블에서 conditions에 맞는 행을 values(키 → 컬럼 값)에 맞춘다. 현재 값과의 차이만 _upsert로 더하므로(col = col + 차이),
+    계산 이후 다른 트랜잭션이 더한 증분은 그대로 남는다 (행을 지우고 다시 넣으면 그 증분이 사라짐).
+    현재 값은 values와 같은 트랜잭션(같은 스냅샷)에서 읽어야 한다. 값이 모두 0이 된 행은 삭제. 바꾼 키 수 반환
+    """
+    table = model.__table__
+    keys = [table.c[name] for name in key_names]
+    columns = [column.name for column in table.c if column.name not in key_names]
+    current = {
+        tuple(row[:len(keys)]): dict(zip(columns, row[len(keys):]))
+        for row in db.execute(select(*keys, *[table.c[name] for name in columns]).where(*conditions))
+    }
+    changed = 0
+    for key in values.keys() | current.keys():
+        target, now = values.get(key, {}), current.get(key, {})
+        deltas = {name: target.get(name, 0) - (now.get(name) or 0) for name in columns}
+        if any(deltas.values()):
+            _upsert(db, model, dict(zip(key_names, key)), deltas)
+            changed += 1
+    db.execute(delete(table).where(*conditions, *[table.c[name] == 0 for name in columns]))
+    return changed
+
+
+def reconcile(db: Session, days: Optional[int] = None) -> Dict[str, Any]:
+    """
+    원본 테이블에서 집계를 다시 계산해 맞춘다 (한 트랜잭션).
+    일별 집계와 활동 사용자는 최근 days일만 다시 계산하고, 그 이전 활동 사용자 행은 삭제한다.
+
+    대출/반납 처리가 같은 집계 행을 동시에 증분 갱신하므로, 계산 결과로 행을 덮어쓰지 않고 현재 값과의 차이만
+    더한다 (_apply_deltas). SQLite에서는 쓰기 잠금을 먼저 잡아 대출/반납과 직렬화하고, MySQL에서는 계산과 현재 값이
+    같은 스냅샷에서 읽히므로 계산 이후 커밋된 증분은 차이에 섞이지 않고 그대로 더해진다.
+    """
+    global _last_reconciled_at
+    days = days or get_settings().stats_rollup_days
+    started = datetime.now()
+    since = started.date() - timedelta(days=days - 1)
+    since_dt = datetime.combine(since, datetime.min.time())
+    active = LoanModel.status == LoanStatus.BORROWED
+    lock_for_write(db)
+
+    # 일별 대출/반납 (보관 기간 이전 행은 그대로 둠)
+    daily: Dict[tuple, Dict[str, int]] = {}
+    for column, key in ((LoanModel.loan_date, "loans"), (LoanModel.return_date, "returns")):
+        rows = db.execute(
+            select(func.date(column), func.count()).where(column >= since_dt).group_by(func.date(column))
+        )
+        for day, count in rows:
+            daily.setdefault((_as_date(day),), {"loans": 0, "returns": 0})[key] = count
+    daily_changed = _apply_deltas(db, DailyLoanStat, ["stat_date"], daily, DailyLoanStat.stat_date >= since)
+
+    # 활동 사용자 (빠진 행은 추가하고, 남는 행은 지난 날짜만 삭제 - 오늘 행은 대출/반납이 계속 추가하므로)
+    active_users = set()
+    for column in (LoanModel.loan_date, LoanModel.return_date):
+        rows = db.execute(select(func.date(column), LoanModel.user_id).where(column >= since_dt).distinct())
+        active_users.update((_as_date(day), user_id) for day, user_id in rows)
+    existing = set(db.execute(select(DailyActiveUser.stat_date, DailyActiveUser.user_id)).all())
+    for day, user_id in active_users - existing:
+        _insert_ignore(db, DailyActiveUser, {"stat_date": day, "user_id": user_id})
+    stale = [(day, user_id) for day, user_id in existing - active_users if day < started.date()]
+    for day, user_id in stale:
+        db.execute(delete(DailyActiveUser).where(DailyActiveUser.stat_date == day, DailyActiveUser.user_id == user_id))
+
+    # 반납 예정일별 대출 중 건수 (0건인 날짜는 남기지 않음)
+    due_rows = db.execute(
+        select(func.date(LoanModel.due_date), func.count()).where(active).group_by(func.date(LoanModel.due_date))
+    ).all()
+    due_changed = _apply_deltas(db, DueDateStat, ["due_date"], {(_as_date(d),): {"active_loans": n} for d, n in due_rows})
+
+    # 도서별
+    active_count = func.sum(case((active, 1), else_=0))
+    books_changed = _apply_deltas(db, BookLoanStat, ["book_id"], {
+        (book_id,): {"total_loans": total, "active_loans": int(on_loan or 0)}
+        for book_id, total, on_loan in db.execute(
+            select(LoanModel.book_id, func.count(), active_count).group_by(LoanModel.book_id)
+        )
+    })
+
+    # 카테고리별 (소장 권수 = 대출 가능 재고 + 대출 중 + 예약자에게 배정되어 수령 대기 중)
+    category = func.coalesce(BookModel.category, "")
+    categories: Dict[str, Dict[str, int]] = {}
+    for name, total, on_loan in db.execute(
+        select(category, func.count(), active_count).select_from(LoanModel)
+        .join(BookModel, LoanModel.book_id == BookModel.book_id).group_by(category)
+    ):
+        categories[name] = {"total_loans": total, "active_loans": int(on_loan or 0), "total_copies": int(on_loan or 0)}
+    for name, stock in db.execute(select(category, func.sum(BookModel.stock_quantity)).group_by(category)):
+        entry = categories.setdefault(name, {"total_loans": 0, "active_loans": 0, "total_copies": 0})
+        entry["total_copies"] += int(stock or 0)
+    for name, reserved in db.execute(
+        select(category, func.count()).select_from(HoldModel).join(BookModel, HoldModel.book_id == BookModel.book_id)
+        .where(HoldModel.status == HoldStatus.READY).group_by(category)
+    ):
+        entry = categories.setdefault(name, {"total_loans": 0, "active_loans": 0, "total_copies": 0})
+        entry["total_copies"] += reserved
+    categories_changed = _apply_deltas(
+        db, CategoryLoanStat, ["category"], {(name,): values for name, values in categories.items()}
+    )
+
+    # 보관 기간이 지난 활동 사용자 행 삭제
+    db.execute(delete(DailyActiveUser).where(DailyActiveUser.stat_date < since))
+
+    db.commit()
+    _last_reconciled_at = datetime.now()
+    summary = {
+        "days": days,
+        "daily_rows": len(daily),
+        "active_user_rows": len(active_users),
+        "due_date_rows": len(due_rows),
+        "categories": len(categories),
+        "corrected": {
+            "daily": daily_changed,
+            "active_users": len(active_users - existing) + len(stale),
+            "due_dates": due_changed,
+            "books": books_changed,
+            "categories": categories_changed,
+        },
+        "elapsed_ms": round((_last_reconciled_at - started).total_seconds() * 1000, 1),
+    }
+    logger.info("rollups reconciled %s", summary)
+    return summary
+
+
+# ========== 대시보드 조회 ==========
+
+def dashboard(db: Session, days: int = 14, top: int = 10) -> Dict[str, Any]:
+    """집계 테이블만 읽어 대시보드 데이터 구성"""
+    today = date.today()
+    since = today - timedelta(days=days - 1)
+
+    loan_rows = {
+        row.stat_date: row
+        for row in db.execute(select(DailyLoanStat).where(DailyLoanStat.stat_date >= since)).scalars()
+    }
+    user_counts = dict(
+        db.execute(
+            select(DailyActiveUser.stat_date, func.count())
+            .where(DailyActiveUser.stat_date >= since)
+            .group_by(DailyActiveUser.stat_date)
+        ).all()
+    )
+    daily = []
+    for offset in range(days):
+        day = since + timedelta(days=offset)
+        row = loan_rows.get(day)
+        daily.append({
+            "day": day,
+            "loans": row.loans if row else 0,
+            "returns": row.returns if row else 0,
+            "active_users": user_counts.get(day, 0),
+        })
+
+    active_users = db.execute(
+        select(func.count(func.distinct(DailyActiveUser.user_id))).where(DailyActiveUser.stat_date >= since)
+    ).scalar() or 0
+    overdue = db.execute(
+        select(func.coalesce(func.sum(DueDateStat.active_loans), 0)).where(DueDateStat.due_date < today)
+    ).scalar()
+    active_loans = db.execute(select(func.coalesce(func.sum(DueDateStat.active_loans), 0))).scalar()
+
+    top_books = [
+        {"book_id": book_id, "title": title, "total_loans": total, "active_loans": on_loan}
+        for book_id, title, total, on_loan in db.execute(
+            select(BookLoanStat.book_id, BookModel.title, BookLoanStat.total_loans, BookLoanStat.active_loans)
+            .join(BookModel, BookModel.book_id == BookLoanStat.book_id)
+            .order_by(BookLoanStat.total_loans.desc())
+            .limit(top)
+        )
+    ]
+
+    categories = [
+        {
+            "category": row.category or "미분류",
+            "total_loans": row.total_loans,
+            "active_loans": row.active_loans,
+            "total_copies": row.total_copies,
+            "utilization": round(row.active_loans / row.total_copies, 3) if row.total_copies > 0 else 0.0,
+        }
+        for row in db.execute(select(CategoryLoanStat).order_by(CategoryLoanStat.active_loans.desc())).scalars()
+    ]
+
+    return {
+        "days": days,
+        "overdue_count": int(overdue),
+        "active_loans": int(active_loans),
+        "active_users": int(active_users),
+        "daily": daily,
+        "top_books": top_books,
+        "categories": categories,
+        "reconciled_at": _last_reconciled_at,
+    }
@@ -2,10 +2,11 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, get_write_db
 from app.db_models import SystemConfig as SystemConfigModel, UserRole
 from app.models import SystemConfig, SystemConfigUpdate
 from app.routers.users import get_current_user
+from app.security import CurrentUser
 
 router = APIRouter(
     tags=["admin"],
@@ -13,9 +14,9 @@ router = APIRouter(
 )
 
 
-# 관리자 권한 확인 의존성
-def get_admin_user(current_user: dict = Depends(get_current_user)):
-    if current_user.role != UserRole.LIBRARIAN:
+# 관리자 권한 확인 의존성 (토큰의 role로 판단 - 폐기 목록은 get_current_user에서 확인)
+def get_admin_user(current_user: CurrentUser = Depends(get_current_user)):
+    if current_user.role != UserRole.LIBRARIAN.value:
         raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다")
     return current_user
 
@@ -23,7 +24,7 @@ def get_admin_user(current_user: dict = Depends(get_current_user)):
 @router.get("/config", response_model=List[SystemConfig])
 async def get_system_config(
     db: Session = Depends(get_db),
-    current_user: dict = Depends(get_admin_user)
+    current_user: CurrentUser = Depends(get_admin_user)
 ):
     """시스템 설정 조회 (관리자 전용)"""
     configs = db.query(SystemConfigModel).all()
@@ -34,8 +35,8 @@ async def get_system_config(
 async def update_system_config(
     key: str,
     config_update: SystemConfigUpdate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_admin_user)
+    db: Session = Depends(get_write_db, scope="function"),
+    current_user: CurrentUser = Depends(get_admin_user)
 ):
     """시스템 설정 수정 (관리자 전용)"""
     config = db.query(SystemConfigModel).filter(SystemConfigModel.key == key).first()
@@ -1,57 +1,84 @@
 """
 AI Router - 도서 추천 및 AI 챗봇 API
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, AsyncIterator, Callable, Dict, Optional, List
 from pathlib import Path
 from dotenv import load_dotenv
-import os
+import asyncio
+import json
+import time
 
 # .env 파일 로드
 env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(env_path)
 
+from app.chat_admission import AdmissionRejected, chat_admission
+from app.config import get_settings
 from app.database import get_db
 from app.db_models import Book as BookModel, Loan as LoanModel, Review as ReviewModel, SystemConfig, User as UserModel, LoanStatus
+from app.llm_metrics import ChatTrace, estimate_tokens, llm_metrics, logger
+from app.llm_providers import LLMProvider, LLMResponse, get_llm_provider
+from app.routers.admin import get_admin_user
+from app.routers.users import get_optional_user
+from app.security import CurrentUser
 
 router = APIRouter()
 
 # ========== Pydantic Models ==========
 class RecommendRequest(BaseModel):
-    user_id: Optional[int] = None
+    user_id: Optional[int] = None  # 무시됨 - 토큰으로 확인한 사용자로 덮어씀
     category: Optional[str] = None
     limit: int = 5
 
 class ChatRequest(BaseModel):
     message: str
-    user_id: Optional[int] = None
+    user_id: Optional[int] = None  # 무시됨 - 토큰으로 확인한 사용자로 덮어씀 (없으면 미로그인)
 
 class ChatResponse(BaseModel):
     response: str
     sources: List[str] = []
 
 # ========== Helper Functions ==========
-def get_rag_context(db: Session) -> str:
-    """RAG: books 테이블과 system_config 테이블에서 컨텍스트 수집"""
+def get_rag_context(db: Session, token_budget: Optional[int] = None, trace: Optional[ChatTrace] = None) -> str:
+    """
+    RAG: books 테이블과 system_config 테이블에서 컨텍스트 수집.
+    token_budget을 넘으면 도서 목록을 절반씩 줄여 예산 안으로 맞춘다.
+    """
     # 시스템 설정 정보
     configs = db.query(SystemConfig).all()
     config_info = "\n".join([f"- {c.key}: {c.value} ({c.description or ''})" for c in configs])
     
     # 도서 정보 (상위 20권)
     books = db.query(BookModel).limit(20).all()
-    book_info = "\n".join([
-        f"- 《{b.title}》 저자: {b.author}, 카테고리: {b.category or '미분류'}, 재고: {b.stock_quantity}권"
-        for b in books
-    ])
     
     # 카테고리 목록
     categories = db.query(BookModel.category).distinct().all()
     category_list = ", ".join([c[0] for c in categories if c[0]])
     
-    context = f"""
+    context = _format_rag_context(config_info, books, category_list)
+    while token_budget is not None and books and estimate_tokens(context) > token_budget:
+        books = books[:len(books) // 2]
+        context = _format_rag_context(config_info, books, category_list)
+        if trace:
+            trace.context_trimmed = True
+    
+    if trace:
+        trace.context_books = len(books)
+    return context
+
+
+def _format_rag_context(config_info: str, books: list, category_list: str) -> str:
+    book_info = "\n".join([
+        f"- 《{b.title}》 저자: {b.author}, 카테고리: {b.category or '미분류'}, 재고: {b.stock_quantity}권"
+        for b in books
+    ])
+    
+    return f"""
 ### IBD Library 도서관 정보
 
 **시스템 설정:**
@@ -67,12 +94,43 @@ def get_rag_context(db: Session) -> str:
 - 휴관일: 매월 첫째, 셋째 월요일
 - 연락처: 02-1234-5678, contact@ibd-library.com
 """
-    return context
+
+
+def build_system_instruction(context: str, user_info: str) -> str:
+    """시스템 프롬프트 구성"""
+    return f"""당신은 IBD Library 도서관의 AI 사서입니다. 친절하고 도움이 되는 답변을 제공하세요.
+
+{context}
+
+**당신이 할 수 있는 작업:**
+- 도서 대출 (borrow_book): 사용자가 책을 빌리고 싶다고 하면 실행. user_id는 자동으로 제공됩니다.
+- 도서 반납 (return_book): 사용자가 책을 반납하고 싶다고 하면 실행. user_id는 자동으로 제공됩니다.
+- 대출 연장 (extend_loan): 사용자가 대출 기간을 연장하고 싶다고 하면 실행. user_id는 자동으로 제공됩니다.
+- 대출 조회 (get_user_loans): 사용자가 자신의 대출 현황을 보고 싶다고 하면 실행. user_id는 자동으로 제공됩니다.
+- 도서 검색 (search_books): 사용자가 책을 검색하고 싶다고 하면 실행
+
+**현재 사용자 상태:** {user_info}
+
+중요: 사용자가 로그인되어 있으면 (✅ 표시가 있으면) 별도로 ID를 물어보지 말고 바로 함수를 호출하세요!
+함수 호출 시 user_id 파라미터는 시스템이 자동으로 설정합니다.
+
+답변 규칙:
+1. 로그인된 사용자가 대출/반납/연장을 요청하면 즉시 해당 함수를 호출하세요.
+2. 서로 독립적인 작업(예: 검색과 대출 조회)은 한 번에 여러 함수를 함께 호출하세요.
+3. 함수 호출 결과를 바탕으로 사용자에게 친절하게 안내해주세요.
+4. 한국어로 답변하세요.
+"""
 
 # ========== Recommendation API ==========
 @router.post("/recommend")
-async def get_recommendations(req: RecommendRequest, db: Session = Depends(get_db)):
+async def get_recommendations(
+    req: RecommendRequest,
+    db: Session = Depends(get_db),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user)
+):
     """도서 추천 API - 협업 필터링 + 인기도 기반"""
+    # 대출 이력은 토큰으로 확인한 본인 것만 사용
+    req.user_id = current_user.user_id if current_user else None
     recommended_books = []
     
     # 1. 사용자 대출 이력 기반 추천 (로그인 시)
@@ -156,146 +214,344 @@ async def get_recommendations(req: RecommendRequest, db: Session = Depends(get_d
     return {"recommendations": result}
 
 # ========== Chatbot API ==========
-@router.post("/chat", response_model=ChatResponse)
-async def chat_with_ai(req: ChatRequest, db: Session = Depends(get_db)):
-    """AI 챗봇 API - Gemini + RAG + Function Calling"""
-    try:
-        from google import genai
-        from google.genai import types
-        from app.routers.ai_tools import TOOL_DECLARATIONS, execute_tool
-        
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key or api_key == "your_gemini_api_key_here":
-            print("⚠️  [AI Chat] GEMINI_API_KEY가 설정되지 않음 - 폴백 모드 사용")
-            return fallback_response(req.message, req.user_id, db)
-        
-        print(f"🤖 [AI Chat] Gemini API 연결 시도 (Function Calling 활성화)")
-        print(f"📝 [AI Chat] 사용자 질문: {req.message}")
-        if req.user_id:
-            print(f"👤 [AI Chat] 사용자 ID: {req.user_id}")
-        
-        client = genai.Client(api_key=api_key)
-        
-        # 모델 설정 (환경변수에서 읽기)
-        model_name = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
-        print(f"🤖 [AI Chat] 사용 모델: {model_name}")
-        
-        # RAG 컨텍스트 수집
-        context = get_rag_context(db)
-        
-        # 사용자 정보 조회
-        user_info = "미로그인 상태입니다. 대출/반납/연장 등의 작업을 요청할 경우 로그인이 필요하다고 안내해주세요."
-        if req.user_id:
-            user = db.query(UserModel).filter(UserModel.user_id == req.user_id).first()
-            if user:
-                user_info = f"✅ 로그인됨: {user.name}님 (ID: {user.user_id}, 이메일: {user.email})"
-                print(f"👤 [AI Chat] 로그인 사용자: {user.name} (ID: {user.user_id})")
-            else:
-                user_info = f"사용자 ID {req.user_id}로 로그인됨 (이름 조회 불가)"
-        
-        # 시스템 프롬프트 구성
-        system_instruction = f"""당신은 IBD Library 도서관의 AI 사서입니다. 친절하고 도움이 되는 답변을 제공하세요.
+def prepare_system_instruction(req: ChatRequest, db: Session, trace: ChatTrace) -> str:
+    """사용자 정보와 RAG 컨텍스트로 시스템 프롬프트 구성"""
+    # 사용자 정보 조회
+    user_info = "미로그인 상태입니다. 대출/반납/연장 등의 작업을 요청할 경우 로그인이 필요하다고 안내해주세요."
+    if req.user_id:
+        user = db.query(UserModel).filter(UserModel.user_id == req.user_id).first()
+        if user:
+            user_info = f"✅ 로그인됨: {user.name}님 (ID: {user.user_id}, 이메일: {user.email})"
+        else:
+            user_info = f"사용자 ID {req.user_id}로 로그인됨 (이름 조회 불가)"
+    
+    # RAG 컨텍스트 수집 - 프롬프트 토큰 예산에서 고정 부분을 뺀 만큼만 사용
+    settings = get_settings()
+    context_budget = None
+    if settings.ai_prompt_token_budget > 0:
+        fixed_tokens = estimate_tokens(build_system_instruction("", user_info)) + estimate_tokens(req.message)
+        context_budget = max(settings.ai_prompt_token_budget - fixed_tokens, 0)
+    context = get_rag_context(db, token_budget=context_budget, trace=trace)
+    
+    system_instruction = build_system_instruction(context, user_info)
+    trace.estimated_prompt_tokens = estimate_tokens(system_instruction) + estimate_tokens(req.message)
+    return system_instruction
 
-{context}
 
-**당신이 할 수 있는 작업:**
-- 도서 대출 (borrow_book): 사용자가 책을 빌리고 싶다고 하면 실행. user_id는 자동으로 제공됩니다.
-- 도서 반납 (return_book): 사용자가 책을 반납하고 싶다고 하면 실행. user_id는 자동으로 제공됩니다.
-- 대출 연장 (extend_loan): 사용자가 대출 기간을 연장하고 싶다고 하면 실행. user_id는 자동으로 제공됩니다.
-- 대출 조회 (get_user_loans): 사용자가 자신의 대출 현황을 보고 싶다고 하면 실행. user_id는 자동으로 제공됩니다.
-- 도서 검색 (search_books): 사용자가 책을 검색하고 싶다고 하면 실행
+def _authenticate(req: ChatRequest, current_user: Optional[CurrentUser]):
+    """
+    요청 본문의 user_id를 토큰으로 확인한 사용자 ID로 바꾼다 (토큰이 없으면 None = 미로그인).
+    이후 사용자 정보, 대출 도구, 폴백 응답은 모두 req.user_id만 보므로 위조한 ID로 남의 대출을 처리할 수 없다
+    """
+    req.user_id = current_user.user_id if current_user else None
 
-**현재 사용자 상태:** {user_info}
 
-중요: 사용자가 로그인되어 있으면 (✅ 표시가 있으면) 별도로 ID를 물어보지 말고 바로 함수를 호출하세요!
-함수 호출 시 user_id 파라미터는 시스템이 자동으로 설정합니다.
+def _admission_key(current_user: Optional[CurrentUser], request: Request) -> str:
+    """
+    공정 대기열에서 사용할 요청자 키 (토큰으로 확인한 사용자 ID, 없으면 클라이언트 IP).
+    요청 본문의 user_id는 클라이언트가 마음대로 바꿀 수 있으므로 쓰지 않는다 (사용자당 제한 우회 방지)
+    """
+    if current_user is not None:
+        return f"user:{current_user.user_id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
 
-답변 규칙:
-1. 로그인된 사용자가 대출/반납/연장을 요청하면 즉시 해당 함수를 호출하세요.
-2. 함수 호출 결과를 바탕으로 사용자에게 친절하게 안내해주세요.
-3. 한국어로 답변하세요.
-"""
-        
-        # Function Calling용 Tool 설정
-        tools = [types.Tool(function_declarations=[
-            types.FunctionDeclaration(
-                name=tool["name"],
-                description=tool["description"],
-                parameters=tool.get("parameters")
-            ) for tool in TOOL_DECLARATIONS
-        ])]
+
+async def _acquire_chat_slot(key: str) -> float:
+    """
+    동시 처리 슬롯 획득. 대기열이 가득 차면 429 + Retry-After.
+    사용자당 요청 수 상한은 로그인 사용자에게만 적용한다. 같은 NAT나 프록시 뒤의 비로그인 사용자는 IP 키 하나를
+    공유하므로, 상한을 두면 서로의 요청 때문에 429를 받는다 (전체 동시 처리 수와 대기열 길이 제한은 그대로 적용)
+    """
+    try:
+        return await chat_admission.acquire(key, limit_per_user=key.startswith("user:"))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=e.message, headers={"Retry-After": str(e.retry_after)})
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat_with_ai(
+    req: ChatRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user)
+):
+    """AI 챗봇 API - LLM 제공자 + RAG + Function Calling"""
+    _authenticate(req, current_user)
+    key = _admission_key(current_user, request)
+    trace = ChatTrace(req.message, req.user_id)
+    trace.queue_wait_ms = await _acquire_chat_slot(key)
+    started = time.perf_counter()
+    try:
+        return await _chat(req, db, trace)
+    finally:
+        chat_admission.release(key, (time.perf_counter() - started) * 1000)
+
+
+async def _chat(req: ChatRequest, db: Session, trace: ChatTrace) -> ChatResponse:
+    """슬롯을 얻은 뒤 실행되는 챗봇 처리 본체"""
+    try:
+        provider = get_llm_provider()
+        if provider is None:
+            logger.warning("GEMINI_API_KEY가 설정되지 않음 - 폴백 모드 사용")
+            response = fallback_response(req.message, req.user_id, db)
+            trace.finish(response.response, fallback_reason="no_api_key")
+            return response
         
-        # 첫 번째 요청
-        response = client.models.generate_content(
-            model=model_name,
-            contents=req.message,
-            config=types.GenerateContentConfig(
-                system_instruction=system_instruction,
-                tools=tools,
-                temperature=0.7
-            )
-        )
+        trace.model = provider.model
+        system_instruction = prepare_system_instruction(req, db, trace)
         
-        # Function Call 처리
-        final_response = ""
         sources = ["books 테이블", "system_config 테이블"]
-        
-        if response.candidates and response.candidates[0].content.parts:
-            for part in response.candidates[0].content.parts:
-                # 함수 호출인 경우
-                if hasattr(part, 'function_call') and part.function_call:
-                    function_call = part.function_call
-                    tool_name = function_call.name
-                    tool_args = dict(function_call.args) if function_call.args else {}
-                    
-                    # user_id가 없으면 요청에서 가져오기
-                    if 'user_id' not in tool_args and req.user_id:
-                        tool_args['user_id'] = req.user_id
-                    
-                    print(f"🔧 [AI Chat] 함수 호출 감지: {tool_name}")
-                    
-                    # 도구 실행
-                    tool_result = execute_tool(tool_name, tool_args, db)
-                    sources.append(f"function:{tool_name}")
-                    
-                    # 결과를 LLM에 전달하여 최종 응답 생성
-                    follow_up = client.models.generate_content(
-                        model=model_name,
-                        contents=[
-                            types.Content(role="user", parts=[types.Part(text=req.message)]),
-                            types.Content(role="model", parts=[part]),
-                            types.Content(role="user", parts=[types.Part(
-                                function_response=types.FunctionResponse(
-                                    name=tool_name,
-                                    response=tool_result
-                                )
-                            )])
-                        ],
-                        config=types.GenerateContentConfig(
-                            system_instruction="함수 호출 결과를 바탕으로 사용자에게 친절하게 결과를 안내해주세요. 한국어로 답변하세요.",
-                            temperature=0.7
-                        )
-                    )
-                    final_response = follow_up.text
-                
-                # 일반 텍스트 응답인 경우
-                elif hasattr(part, 'text') and part.text:
-                    final_response += part.text
+        final_response = await run_agent_loop(provider, req, system_instruction, sources, trace)
         
         if not final_response:
-            final_response = response.text if hasattr(response, 'text') else "응답을 생성할 수 없습니다."
-        
-        print(f"✅ [AI Chat] 응답 완료!")
-        print(f"📤 [AI Chat] 응답 길이: {len(final_response)} 글자")
+            final_response = "응답을 생성할 수 없습니다."
         
+        trace.finish(final_response)
         return ChatResponse(
             response=final_response,
             sources=sources
         )
         
     except Exception as e:
-        print(f"❌ [AI Chat] Gemini API 오류: {str(e)}")
-        return fallback_response(req.message, req.user_id, db)
+        logger.error(f"LLM 호출 오류 (request_id={trace.request_id}): {e}")
+        response = fallback_response(req.message, req.user_id, db)
+        reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+        trace.finish(response.response, fallback_reason=reason)
+        return response
+
+
+@router.post("/chat/stream")
+async def chat_with_ai_stream(
+    req: ChatRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user)
+):
+    """AI 챗봇 스트리밍 API (Server-Sent Events) - 답변을 생성되는 대로 전달"""
+    _authenticate(req, current_user)
+    key = _admission_key(current_user, request)
+    trace = ChatTrace(req.message, req.user_id)
+    trace.queue_wait_ms = await _acquire_chat_slot(key)
+    started = time.perf_counter()
+    try:
+        provider = get_llm_provider()
+        system_instruction = None
+        if provider is not None:
+            trace.model = provider.model
+            system_instruction = prepare_system_instruction(req, db, trace)
+    except Exception:
+        chat_admission.release(key)
+        raise
+    
+    def release_slot():
+        chat_admission.release(key, (time.perf_counter() - started) * 1000)
+    
+    return _SlotStreamingResponse(
+        _chat_events(req, db, trace, provider, system_instruction),
+        release_slot,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+class _SlotStreamingResponse(StreamingResponse):
+    """
+    응답이 어떻게 끝나든 챗봇 슬롯을 반환하는 스트리밍 응답.
+    스트림 생성기의 finally는 첫 조각을 보내기 전에 연결이 끊기거나 전송이 실패하면 실행되지 않으므로
+    응답 전송 자체를 감싸서 반환한다.
+    """
+
+    def __init__(self, content, release: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+async def _chat_events(
+    req: ChatRequest,
+    db: Session,
+    trace: ChatTrace,
+    provider: Optional[LLMProvider],
+    system_instruction: Optional[str],
+) -> AsyncIterator[str]:
+    """스트리밍 챗봇 처리 본체 - SSE 이벤트 문자열을 순서대로 생성"""
+    if provider is None:
+        response = fallback_response(req.message, req.user_id, db)
+        trace.finish(response.response, fallback_reason="no_api_key")
+        yield _sse_event({"type": "delta", "text": response.response})
+        yield _sse_event({"type": "done", "sources": response.sources})
+        return
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    sources = ["books 테이블", "system_config 테이블"]
+    
+    async def produce():
+        try:
+            text = await run_agent_loop(
+                provider, req, system_instruction, sources, trace, on_text=queue.put_nowait
+            )
+            trace.finish(text)
+        except Exception as e:
+            logger.error(f"LLM 스트리밍 오류 (request_id={trace.request_id}): {e}")
+            response = fallback_response(req.message, req.user_id, db)
+            trace.finish(response.response, fallback_reason="timeout" if isinstance(e, asyncio.TimeoutError) else "error")
+            queue.put_nowait(response.response)
+        finally:
+            queue.put_nowait(None)
+    
+    task = asyncio.create_task(produce())
+    try:
+        while (chunk := await queue.get()) is not None:
+            yield _sse_event({"type": "delta", "text": chunk})
+        yield _sse_event({"type": "done", "sources": sources})
+    finally:
+        task.cancel()
+
+
+def _sse_event(data: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/metrics")
+async def get_ai_metrics(current_user: CurrentUser = Depends(get_admin_user)):
+    """AI 챗봇 누적 지표 (토큰, 지연 시간, 도구 호출, 폴백 비율)"""
+    return llm_metrics.snapshot()
+
+
+@router.get("/admission")
+async def get_ai_admission_stats(current_user: CurrentUser = Depends(get_admin_user)):
+    """AI 챗봇 동시 처리/대기열 현황 (대기열 길이, 대기 시간, 거절 수)"""
+    return chat_admission.stats()
+
+
+async def run_agent_loop(
+    provider: LLMProvider,
+    req: ChatRequest,
+    system_instruction: str,
+    sources: List[str],
+    trace: ChatTrace,
+    on_text: Optional[Callable[[str], Any]] = None,
+) -> str:
+    """
+    Function Calling 에이전트 루프.
+    모델이 한 턴에 요청한 도구들을 함께 실행하고 모든 결과를 한 번의 후속 요청으로 전달한다.
+    도구 호출 라운드 수와 전체 처리 시간에 상한을 둔다.
+    on_text가 주어지면 스트리밍 모드로 호출하고 텍스트 청크를 도착 즉시 전달한다.
+    """
+    from app.routers.ai_tools import READ_ONLY_TOOLS, TOOL_DECLARATIONS, TOOL_PARAMETERS, execute_tool_calls
+    
+    settings = get_settings()
+    max_iterations = max(settings.ai_max_tool_iterations, 0)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.ai_chat_timeout_seconds
+    
+    messages: List[Dict[str, Any]] = [{"role": "user", "text": req.message}]
+    tool_results: List[Dict[str, Any]] = []
+    
+    try:
+        for iteration in range(max_iterations + 1):
+            # 마지막 라운드에서는 도구 없이 호출해 반드시 텍스트 답변을 받는다
+            tools = TOOL_DECLARATIONS if iteration < max_iterations else None
+            started = time.perf_counter()
+            if on_text is None:
+                # 남은 시간을 먼저 확인 (시간이 다 되었으면 코루틴을 만들지 않음)
+                timeout = _remaining(loop, deadline)
+                response = await asyncio.wait_for(
+                    provider.generate(messages, system_instruction, tools), timeout=timeout
+                )
+            else:
+                response = await _consume_stream(
+                    provider.stream(messages, system_instruction, tools), on_text, loop, deadline
+                )
+            trace.record_llm_call(
+                (time.perf_counter() - started) * 1000, response.prompt_tokens, response.response_tokens
+            )
+            
+            if not response.tool_calls:
+                return response.text
+            
+            calls = []
+            refused: Dict[int, Dict[str, Any]] = {}
+            for index, tool_call in enumerate(response.tool_calls):
+                tool_args = dict(tool_call.args)
+                # user_id를 받는 도구는 모델이 넘긴 값 대신 로그인한 사용자 ID만 사용, 미로그인이면 실행하지 않음
+                if 'user_id' in TOOL_PARAMETERS.get(tool_call.name, set()):
+                    if req.user_id is None:
+                        refused[index] = {"success": False, "message": "로그인이 필요한 기능입니다. 로그인 후 다시 요청해주세요"}
+                    tool_args['user_id'] = req.user_id
+                calls.append((tool_call.name, tool_args))
+            runnable = [call for index, call in enumerate(calls) if index not in refused]
+            
+            # 같은 턴의 도구들을 동시에 실행. 데이터를 변경하는 도구가 있으면 처리 시간 상한을 적용하지 않고
+            # 끝까지 기다린다 (시간 초과로 응답을 끊어도 스레드의 도구는 계속 실행되어 커밋될 수 있으므로,
+            # 결과를 tool_results에 남겨 사용자에게 알린다). 시간이 다 되었으면 다음 모델 호출에서 중단
+            if any(name not in READ_ONLY_TOOLS for name, _ in runnable):
+                executed = await execute_tool_calls(runnable)
+            else:
+                timeout = _remaining(loop, deadline)
+                executed = await asyncio.wait_for(execute_tool_calls(runnable), timeout=timeout)
+            executed_iter = iter(executed)
+            results = [refused[index] if index in refused else next(executed_iter) for index in range(len(calls))]
+            
+            messages.append({
+                "role": "model",
+                "text": response.text,
+                "tool_calls": response.tool_calls,
+                "raw_content": response.raw_content,
+            })
+            messages.append({"role": "tool", "results": [(name, result) for (name, _), result in zip(calls, results)]})
+            for (name, _), result in zip(calls, results):
+                sources.append(f"function:{name}")
+                trace.record_tool_call(name, bool(result.get("success")))
+                tool_results.append(result)
+    except asyncio.TimeoutError:
+        logger.warning(f"처리 시간 초과 ({settings.ai_chat_timeout_seconds}초, request_id={trace.request_id})")
+        # 이미 실행된 도구 결과가 있으면 그 결과만이라도 안내
+        if tool_results:
+            text = "\n".join(r.get("message", "") for r in tool_results if r.get("message"))
+            if on_text is not None:
+                on_text(text)
+            return text
+        raise
+    
+    return ""
+
+
+async def _consume_stream(
+    chunks: AsyncIterator[LLMResponse],
+    on_text: Callable[[str], Any],
+    loop: asyncio.AbstractEventLoop,
+    deadline: float,
+) -> LLMResponse:
+    """스트리밍 응답을 소비하며 텍스트는 즉시 전달하고, 전체를 하나의 응답으로 합쳐 반환"""
+    merged = LLMResponse()
+    iterator = chunks.__aiter__()
+    while True:
+        try:
+            timeout = _remaining(loop, deadline)
+            chunk = await asyncio.wait_for(iterator.__anext__(), timeout=timeout)
+        except StopAsyncIteration:
+            return merged
+        if chunk.text:
+            merged.text += chunk.text
+            on_text(chunk.text)
+        merged.tool_calls.extend(chunk.tool_calls)
+        merged.prompt_tokens = max(merged.prompt_tokens, chunk.prompt_tokens)
+        merged.response_tokens = max(merged.response_tokens, chunk.response_tokens)
+
+
+def _remaining(loop: asyncio.AbstractEventLoop, deadline: float) -> float:
+    """남은 처리 시간 (초). 시간이 다 되었으면 TimeoutError"""
+    remaining = deadline - loop.time()
+    if remaining <= 0:
+        raise asyncio.TimeoutError()
+    return remaining
+
 
 def fallback_response(message: str, user_id: Optional[int], db: Session) -> ChatResponse:
     """API 키 없거나 오류 시 규칙 기반 응답"""
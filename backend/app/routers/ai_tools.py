@@ -4,8 +4,12 @@ LLM이 사용할 수 있는 도구들의 JSON 스키마와 실행 함수를 정
 """
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
 
+from app.database import SessionLocal, lock_for_write
 from app.db_models import (
     Book as BookModel, 
     Loan as LoanModel, 
@@ -13,6 +17,9 @@ from app.db_models import (
     SystemConfig,
     LoanStatus
 )
+from app.llm_metrics import logger
+from app.holds import fulfill_hold, lock_book, ready_hold_for, release_copy
+from app.rollups import record_borrow, record_extend, record_return
 
 # ========== Function Calling JSON 스키마 ===========
 # google.genai function calling 형식
@@ -125,25 +132,31 @@ TOOL_DECLARATIONS = [
 
 def execute_borrow_book(db: Session, user_id: int, book_id: Optional[int] = None, book_title: Optional[str] = None) -> Dict[str, Any]:
     """도서 대출 실행"""
+    # 도서 찾기 (제목이면 ID만 먼저 조회)
+    if not book_id and book_title:
+        book_id = db.query(BookModel.book_id).filter(BookModel.title.ilike(f"%{book_title}%")).scalar()
+        if book_id is None:
+            return {"success": False, "message": "도서를 찾을 수 없습니다"}
+    elif not book_id:
+        return {"success": False, "message": "도서 ID 또는 도서 제목을 입력해주세요"}
+    
+    # 도서 행 → 회원 행 순서로 잠금 (loans.borrow_book과 같음). 아래 확인은 모두 잠근 뒤의 최신 값으로 한다
+    book = lock_book(db, book_id)
+    user = db.query(UserModel).filter(UserModel.user_id == user_id).with_for_update().populate_existing().first()
+    
     # 사용자 확인
-    user = db.query(UserModel).filter(UserModel.user_id == user_id).first()
     if not user:
         return {"success": False, "message": f"회원 ID {user_id}를 찾을 수 없습니다"}
     
-    # 도서 찾기
-    if book_id:
-        book = db.query(BookModel).filter(BookModel.book_id == book_id).first()
-    elif book_title:
-        book = db.query(BookModel).filter(BookModel.title.ilike(f"%{book_title}%")).first()
-    else:
-        return {"success": False, "message": "도서 ID 또는 도서 제목을 입력해주세요"}
-    
     if not book:
         return {"success": False, "message": "도서를 찾을 수 없습니다"}
     
+    # 예약 배정 확인 (반납 시 이 회원에게 배정된 도서는 재고와 무관하게 대출)
+    ready_hold = ready_hold_for(db, user_id, book.book_id)
+    
     # 재고 확인
-    if book.stock_quantity <= 0:
-        return {"success": False, "message": f"《{book.title}》은(는) 현재 재고가 없습니다"}
+    if not ready_hold and book.stock_quantity <= 0:
+        return {"success": False, "message": f"《{book.title}》은(는) 현재 재고가 없습니다. 예약하시면 반납되는 대로 순서대로 배정됩니다"}
     
     # 대출 권수 제한 확인
     limit_config = db.query(SystemConfig).filter(SystemConfig.key == "max_loan_limit").first()
@@ -171,8 +184,12 @@ def execute_borrow_book(db: Session, user_id: int, book_id: Optional[int] = None
         status=LoanStatus.BORROWED
     )
     
-    book.stock_quantity -= 1
+    if ready_hold:
+        fulfill_hold(ready_hold)
+    else:
+        book.stock_quantity -= 1
     db.add(new_loan)
+    record_borrow(db, new_loan, book)
     db.commit()
     db.refresh(new_loan)
     
@@ -189,7 +206,11 @@ def execute_return_book(db: Session, loan_id: Optional[int] = None, user_id: Opt
     """도서 반납 실행"""
     # 대출 정보 찾기
     if loan_id:
-        loan = db.query(LoanModel).filter(LoanModel.loan_id == loan_id).first()
+        query = db.query(LoanModel).filter(LoanModel.loan_id == loan_id)
+        if user_id:
+            # 챗봇에서는 로그인한 사용자 본인의 대출만
+            query = query.filter(LoanModel.user_id == user_id)
+        loan = query.first()
     elif user_id and book_title:
         # 사용자 ID와 도서 제목으로 대출 찾기
         loan = db.query(LoanModel).join(BookModel).filter(
@@ -203,6 +224,9 @@ def execute_return_book(db: Session, loan_id: Optional[int] = None, user_id: Opt
     if not loan:
         return {"success": False, "message": "해당 대출 정보를 찾을 수 없습니다"}
     
+    # 도서 행을 잠근 뒤 상태 재확인 (같은 대출의 동시 반납이 재고를 두 번 올리지 않도록)
+    book = lock_book(db, loan.book_id)
+    db.refresh(loan)
     if loan.status == LoanStatus.RETURNED:
         return {"success": False, "message": "이미 반납된 도서입니다"}
     
@@ -210,16 +234,18 @@ def execute_return_book(db: Session, loan_id: Optional[int] = None, user_id: Opt
     loan.return_date = datetime.now()
     loan.status = LoanStatus.RETURNED
     
-    # 재고 복구
-    book = db.query(BookModel).filter(BookModel.book_id == loan.book_id).first()
-    if book:
-        book.stock_quantity += 1
+    # 재고 복구 (예약 대기자가 있으면 재고 대신 다음 대기자에게 배정)
+    hold = release_copy(db, book) if book else None
     
+    record_return(db, loan, book)
     db.commit()
     
+    message = f"《{book.title}》이(가) 반납되었습니다"
+    if hold:
+        message += " (예약 대기자에게 배정되었습니다)"
     return {
         "success": True,
-        "message": f"《{book.title}》이(가) 반납되었습니다",
+        "message": message,
         "book_title": book.title
     }
 
@@ -228,7 +254,11 @@ def execute_extend_loan(db: Session, loan_id: Optional[int] = None, user_id: Opt
     """대출 연장 실행"""
     # 대출 정보 찾기
     if loan_id:
-        loan = db.query(LoanModel).filter(LoanModel.loan_id == loan_id).first()
+        query = db.query(LoanModel).filter(LoanModel.loan_id == loan_id)
+        if user_id:
+            # 챗봇에서는 로그인한 사용자 본인의 대출만
+            query = query.filter(LoanModel.user_id == user_id)
+        loan = query.first()
     elif user_id and book_title:
         loan = db.query(LoanModel).join(BookModel).filter(
             LoanModel.user_id == user_id,
@@ -255,8 +285,10 @@ def execute_extend_loan(db: Session, loan_id: Optional[int] = None, user_id: Opt
     ext_period_config = db.query(SystemConfig).filter(SystemConfig.key == "extension_period_days").first()
     extension_days = int(ext_period_config.value) if ext_period_config else 7
     
+    previous_due_date = loan.due_date
     loan.due_date = loan.due_date + timedelta(days=extension_days)
     loan.extension_count += 1
+    record_extend(db, loan, previous_due_date)
     db.commit()
     db.refresh(loan)
     
@@ -342,23 +374,124 @@ def execute_search_books(db: Session, keyword: Optional[str] = None, category: O
 
 # ========== 도구 실행 라우터 ==========
 
+# 도구 이름 → 실행 함수 레지스트리
+TOOL_REGISTRY: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "borrow_book": execute_borrow_book,
+    "return_book": execute_return_book,
+    "extend_loan": execute_extend_loan,
+    "get_user_loans": execute_get_user_loans,
+    "search_books": execute_search_books,
+}
+
+# 데이터를 변경하지 않아 서로 동시에 실행해도 안전한 도구
+READ_ONLY_TOOLS = {"get_user_loans", "search_books"}
+
+# 도구별 인자 스키마 (JSON 스키마의 parameters)
+TOOL_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    tool["name"]: tool.get("parameters", {})
+    for tool in TOOL_DECLARATIONS
+}
+
+# 도구별 허용 인자 이름
+TOOL_PARAMETERS: Dict[str, set] = {
+    name: set(schema.get("properties", {}))
+    for name, schema in TOOL_SCHEMAS.items()
+}
+
+
+def validate_tool_args(tool_name: str, args: Dict[str, Any]) -> Optional[str]:
+    """
+    LLM이 넘긴 인자를 도구 스키마로 확인하고 오류 메시지 반환 (문제가 없으면 None).
+    정수 인자로 온 정수 값의 실수(3.0)는 int로 바꿔 둔다
+    """
+    schema = TOOL_SCHEMAS.get(tool_name, {})
+    properties = schema.get("properties", {})
+    
+    unknown = set(args) - set(properties)
+    if unknown:
+        return f"알 수 없는 인자: {', '.join(sorted(unknown))}"
+    missing = [name for name in schema.get("required", []) if args.get(name) is None]
+    if missing:
+        return f"필수 인자 누락: {', '.join(missing)}"
+    
+    for name, value in args.items():
+        if value is None:
+            continue
+        spec = properties[name]
+        if spec.get("type") == "integer":
+            if isinstance(value, float) and value.is_integer():
+                value = args[name] = int(value)
+            if isinstance(value, bool) or not isinstance(value, int):
+                return f"{name}은(는) 정수여야 합니다"
+        elif spec.get("type") == "string" and not isinstance(value, str):
+            return f"{name}은(는) 문자열이어야 합니다"
+        if "enum" in spec and value not in spec["enum"]:
+            return f"{name}은(는) {', '.join(spec['enum'])} 중 하나여야 합니다"
+    return None
+
+
 def execute_tool(tool_name: str, args: Dict[str, Any], db: Session) -> Dict[str, Any]:
     """도구 이름과 인자를 받아 해당 함수를 실행"""
-    print(f"🔧 [AI Tool] 도구 실행: {tool_name}")
-    print(f"📋 [AI Tool] 인자: {args}")
-    
-    if tool_name == "borrow_book":
-        result = execute_borrow_book(db, **args)
-    elif tool_name == "return_book":
-        result = execute_return_book(db, **args)
-    elif tool_name == "extend_loan":
-        result = execute_extend_loan(db, **args)
-    elif tool_name == "get_user_loans":
-        result = execute_get_user_loans(db, **args)
-    elif tool_name == "search_books":
-        result = execute_search_books(db, **args)
-    else:
+    started = time.perf_counter()
+    handler = TOOL_REGISTRY.get(tool_name)
+    error = validate_tool_args(tool_name, args) if handler is not None else None
+    if handler is None:
         result = {"success": False, "message": f"알 수 없는 도구: {tool_name}"}
-    
-    print(f"✅ [AI Tool] 결과: {result.get('success', False)}")
+    elif error:
+        # LLM이 스키마에 맞지 않는 인자를 넘긴 경우 (도구를 실행하지 않음)
+        result = {"success": False, "message": f"잘못된 도구 인자: {error}"}
+    else:
+        try:
+            result = handler(db, **args)
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"도구 실행 오류 ({tool_name})")
+            result = {"success": False, "message": f"도구 실행 중 오류가 발생했습니다: {e}"}
+    
+    logger.debug(json.dumps({
+        "event": "ai_tool",
+        "tool": tool_name,
+        "args": args,
+        "success": bool(result.get("success")),
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    }, ensure_ascii=False))
     return result
+
+
+def _execute_tool_in_session(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """도구마다 독립된 세션을 열어 실행 (스레드 간 세션 공유 방지). 변경 도구는 쓰기 세션으로"""
+    db = SessionLocal() if tool_name in READ_ONLY_TOOLS else lock_for_write(SessionLocal())
+    try:
+        return execute_tool(tool_name, args, db)
+    finally:
+        db.close()
+
+
+def _execute_sequentially(calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    return [_execute_tool_in_session(name, args) for name, args in calls]
+
+
+async def execute_tool_calls(calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    한 번의 모델 응답에 포함된 여러 도구 호출을 실행하고 호출 순서대로 결과를 반환.
+    조회 전용 도구는 각각 별도 스레드에서 동시에 실행하고,
+    데이터를 변경하는 도구는 순서가 보장되도록 하나의 스레드에서 차례로 실행한다.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+    
+    read_only = [i for i, (name, _) in enumerate(calls) if name in READ_ONLY_TOOLS]
+    mutating = [i for i, (name, _) in enumerate(calls) if name not in READ_ONLY_TOOLS]
+    
+    tasks = [asyncio.to_thread(_execute_tool_in_session, *calls[i]) for i in read_only]
+    if mutating:
+        tasks.append(asyncio.to_thread(_execute_sequentially, [calls[i] for i in mutating]))
+    
+    outputs = await asyncio.gather(*tasks)
+    
+    for i, output in zip(read_only, outputs):
+        results[i] = output
+    if mutating:
+        for i, output in zip(mutating, outputs[-1]):
+            results[i] = output
+    
+    return results
@@ -0,0 +1,118 @@
+"""
+Availability Router - 도서 재고 실시간 구독 (SSE / WebSocket)
+연결 시 구독한 도서의 현재 재고를 한 번 보내고, 이후에는 변경이 있을 때만 이벤트를 보낸다.
+연결이 열려 있는 동안 DB 세션을 잡고 있지 않도록 초기 조회에만 세션을 잠깐 연다.
+"""
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+
+from app.availability import availability_broker
+from app.config import get_settings
+from app.database import SessionLocal
+from app.db_models import Book as BookModel
+
+router = APIRouter()
+
+
+def _parse_ids(raw: str) -> List[int]:
+    try:
+        return sorted({int(value) for value in raw.split(",") if value.strip()})
+    except ValueError:
+        raise ValueError("도서 ID는 쉼표로 구분한 숫자여야 합니다")
+
+
+def _current_stock(book_ids: List[int]) -> List[Dict[str, Any]]:
+    if not book_ids:
+        return []
+    db = SessionLocal()
+    try:
+        rows = db.query(BookModel.book_id, BookModel.stock_quantity).filter(BookModel.book_id.in_(book_ids)).all()
+    finally:
+        db.close()
+    return [{"book_id": book_id, "stock_quantity": stock, "delta": 0} for book_id, stock in rows]
+
+
+@router.get("/stream")
+async def stream_availability(
+    request: Request,
+    ids: str = Query(..., description="구독할 도서 ID (쉼표 구분)")
+):
+    """재고 변경 SSE 스트림 - 'snapshot' 이벤트 후 변경 시 'stock' 이벤트"""
+    try:
+        book_ids = _parse_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    heartbeat = get_settings().availability_heartbeat_seconds
+
+    async def events():
+        subscription = availability_broker.open()
+        try:
+            # 초기 재고 조회 전에 구독해 두어 그 사이의 변경을 놓치지 않음
+            subscribed = availability_broker.subscribe(subscription, book_ids)
+            snapshot = await asyncio.to_thread(_current_stock, subscribed)
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(timeout=heartbeat)
+                if not batch:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: stock\ndata: {json.dumps(batch)}\n\n"
+        finally:
+            availability_broker.close(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def availability_websocket(websocket: WebSocket):
+    """
+    재고 변경 WebSocket.
+    클라이언트 → {"subscribe": [1, 2]} / {"unsubscribe": [1]}
+    서버 → {"type": "snapshot", "books": [...]} / {"type": "stock", "books": [...]}
+    """
+    await websocket.accept()
+    subscription = availability_broker.open()
+
+    async def receive_commands():
+        while True:
+            message = await websocket.receive_json()
+            try:
+                unsubscribe = [int(i) for i in message.get("unsubscribe") or []]
+                subscribe = [int(i) for i in message.get("subscribe") or []]
+            except (AttributeError, TypeError, ValueError):
+                await websocket.send_json({"type": "error", "message": "subscribe/unsubscribe는 도서 ID 목록이어야 합니다"})
+                continue
+            availability_broker.unsubscribe(subscription, unsubscribe)
+            if subscribe:
+                added = availability_broker.subscribe(subscription, subscribe)
+                snapshot = await asyncio.to_thread(_current_stock, added)
+                await websocket.send_json({"type": "snapshot", "books": snapshot})
+
+    async def send_events():
+        while True:
+            batch = await subscription.next_batch()
+            await websocket.send_json({"type": "stock", "books": batch})
+
+    # 둘 중 하나가 끝나면(연결 종료) 나머지도 정리
+    tasks = [asyncio.create_task(receive_commands()), asyncio.create_task(send_events())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        availability_broker.close(subscription)
+
+
+@router.get("/stats")
+async def get_availability_stats():
+    """구독 연결/이벤트 전달 현황"""
+    return availability_broker.stats()
@@ -1,51 +1,138 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlalchemy.orm import Session
-from typing import Optional
+import shutil
+import uuid
+from pathlib import Path
 
-from app.models import Book as BookSchema, BookCreate, BookUpdate
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, UploadFile, File
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.orm import Session, load_only
+from typing import Optional, Union
+
+from app.models import Book as BookSchema, BookCard, BookChanges, BookCreate, BookFields, BookUpdate
 from app.db_models import Book as BookModel
-from app.database import get_db
+from app.database import SessionLocal, get_db, get_write_db
+from app.holds import add_copies, lock_book
+from app.catalog_import import DEFAULT_BATCH_SIZE, DEFAULT_MAX_ERRORS, import_file
+from app.catalog_sync import START, changes_since, format_token, latest_seq, parse_token
+from app.config import get_settings
+from app.http_cache import catalog_versions
+from app.jobs import enqueue, job_runner
+from app.purge import delete_now, related_rows
+from app.read_cache import catalog_cache
+from app.routers.admin import get_admin_user
+from app.security import CurrentUser
+from app.serialization import FastJSONResponse, dump_row, dump_rows, dumps
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# fields= 에 이름으로 지정할 수 있는 미리 정의된 필드 묶음
+BOOK_FIELD_SETS = {
+    "card": tuple(BookCard.model_fields),
+}
 
-router = APIRouter()
 
+def _parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    """fields 파라미터 → 응답 필드 이름 목록 (None이면 전체). book_id는 항상 포함"""
+    if not fields:
+        return None
+    if fields in BOOK_FIELD_SETS:
+        return BOOK_FIELD_SETS[fields]
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(BookSchema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+    return tuple(name for name in BookSchema.model_fields if name in names or name == "book_id")
 
-@router.get("/", response_model=list[BookSchema])
+
+@router.get(
+    "/",
+    response_model=list[Union[BookSchema, BookCard, BookFields]],
+    responses={200: {"description": "도서 목록. fields 생략 시 Book, fields=card이면 BookCard, 필드 목록을 주면 그 필드만 담은 BookFields"}}
+)
 async def get_books(
+    request: Request,
     search: Optional[str] = Query(None, description="제목 또는 저자로 검색"),
     category: Optional[str] = Query(None, description="카테고리 필터"),
     skip: int = Query(0, ge=0, description="건너뛸 항목 수"),
     limit: int = Query(20, ge=1, le=100, description="반환할 최대 항목 수"),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="반환할 필드 (쉼표 구분, 예: title,author) 또는 card")
 ):
     """도서 목록 조회"""
-    query = db.query(BookModel)
+    cache = catalog_versions.check(request, "books")
+    if cache.fresh:
+        return cache.not_modified()
     
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            (BookModel.title.ilike(search_pattern)) | 
-            (BookModel.author.ilike(search_pattern)) |
-            (BookModel.isbn.ilike(search_pattern))
-        )
+    selected = _parse_fields(fields)
     
-    if category:
-        query = query.filter(BookModel.category == category)
+    def load() -> bytes:
+        # 같은 조건의 동시 요청이 결과를 함께 쓰므로 요청 세션이 아닌 별도 세션으로 조회
+        with SessionLocal() as db:
+            query = db.query(BookModel)
+            if selected is not None:
+                # 필요한 컬럼만 SELECT (description 같은 TEXT 컬럼을 읽지 않음)
+                query = query.options(load_only(*(getattr(BookModel, name) for name in selected)))
+            
+            if search:
+                search_pattern = f"%{search}%"
+                query = query.filter(
+                    (BookModel.title.ilike(search_pattern)) | 
+                    (BookModel.author.ilike(search_pattern)) |
+                    (BookModel.isbn.ilike(search_pattern))
+                )
+            
+            if category:
+                query = query.filter(BookModel.category == category)
+            
+            books = query.offset(skip).limit(limit).all()
+            return dumps(dump_rows(BookSchema, books, selected))
     
-    books = query.offset(skip).limit(limit).all()
-    return books
+    # 같은 조건의 동시 요청은 한 번만 조회
+    key = ("books", search, category, skip, limit, selected)
+    body = await catalog_cache.get_or_load(key, load, tags=("books", "books:list"))
+    return cache.apply(Response(body, media_type="application/json"))
+
+
+@router.get("/changes", response_model=BookChanges)
+async def get_book_changes(
+    since: Optional[str] = Query(None, description="이전 응답의 next_token (생략 시 전체 동기화)"),
+    limit: int = Query(500, ge=1, le=5000, description="한 번에 받을 최대 변경 수"),
+    db: Session = Depends(get_db)
+):
+    """증분 동기화 - since 이후 추가/수정/삭제된 도서만 반환 (클라이언트 캐시 갱신용)"""
+    reset = False
+    position = parse_token(since) if since else START
+    if position is None or position[0] > latest_seq(db):
+        position, reset = START, True
+    
+    changed, deleted, next_position, has_more = changes_since(db, position, limit)
+    return BookChanges(
+        changes=changed,
+        deleted=deleted,
+        next_token=format_token(next_position),
+        has_more=has_more,
+        reset=reset
+    )
 
 
 @router.get("/{book_id}", response_model=BookSchema)
-async def get_book(book_id: int, db: Session = Depends(get_db)):
+async def get_book(book_id: int, request: Request):
     """특정 도서 조회"""
-    book = db.query(BookModel).filter(BookModel.book_id == book_id).first()
-    if not book:
+    cache = catalog_versions.check(request, "books", book_id)
+    if cache.fresh:
+        return cache.not_modified()
+    
+    def load() -> Optional[bytes]:
+        with SessionLocal() as db:
+            book = db.query(BookModel).filter(BookModel.book_id == book_id).first()
+            return dumps(dump_row(BookSchema, book)) if book else None
+    
+    body = await catalog_cache.get_or_load(("book", book_id), load, tags=("books", f"books:{book_id}"))
+    if body is None:
         raise HTTPException(status_code=404, detail="도서를 찾을 수 없습니다")
-    return book
+    return cache.apply(Response(body, media_type="application/json"))
 
 
 @router.post("/", response_model=BookSchema, status_code=201)
-async def create_book(book_data: BookCreate, db: Session = Depends(get_db)):
+async def create_book(book_data: BookCreate, db: Session = Depends(get_write_db, scope="function")):
     """새 도서 등록"""
     # ISBN 중복 체크
     if book_data.isbn:
@@ -60,28 +147,83 @@ async def create_book(book_data: BookCreate, db: Session = Depends(get_db)):
     return new_book
 
 
+@router.post("/import")
+def import_books(
+    file: UploadFile = File(..., description="CSV / JSONL / MARC-lite 파일"),
+    format: Optional[str] = Query(None, description="파일 형식 (csv, jsonl, marc). 생략 시 확장자로 판단"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000, description="한 번에 INSERT 할 행 수"),
+    max_errors: int = Query(DEFAULT_MAX_ERRORS, ge=0, le=10000, description="보고서에 남길 최대 오류 수"),
+    dry_run: bool = Query(False, description="검증만 하고 저장하지 않음"),
+    background: bool = Query(False, description="백그라운드 작업으로 실행하고 작업 ID만 반환 (202)"),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """도서 대량 등록 (관리자 전용) - 파일을 스트리밍으로 읽어 배치 INSERT, 행별 오류 보고"""
+    if background:
+        # 업로드 파일을 작업 실행기가 읽을 수 있는 경로에 저장 (작업이 끝나면 삭제)
+        upload_dir = Path(get_settings().job_upload_dir)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        path = upload_dir / f"{uuid.uuid4().hex}{Path(file.filename or '').suffix}"
+        with path.open("wb") as target:
+            shutil.copyfileobj(file.file, target)
+        job = enqueue(db, "catalog.import", {
+            "path": str(path.resolve()), "filename": file.filename, "format": format,
+            "batch_size": batch_size, "max_errors": max_errors, "dry_run": dry_run
+        }, max_attempts=1)
+        db.commit()
+        job_runner.wake()
+        return JSONResponse(status_code=202, content={"job_id": job.job_id, "status": job.status.value})
+
+    try:
+        report = import_file(
+            db, file.file, filename=file.filename, fmt=format,
+            batch_size=batch_size, max_errors=max_errors, dry_run=dry_run
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return report.to_dict()
+
+
 @router.put("/{book_id}", response_model=BookSchema)
-async def update_book(book_id: int, book_data: BookUpdate, db: Session = Depends(get_db)):
+async def update_book(book_id: int, book_data: BookUpdate, db: Session = Depends(get_write_db, scope="function")):
     """도서 정보 수정"""
-    book = db.query(BookModel).filter(BookModel.book_id == book_id).first()
+    # 재고 변경이 예약 배정과 겹치지 않도록 도서 행 잠금
+    book = lock_book(db, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="도서를 찾을 수 없습니다")
     
     update_data = book_data.model_dump(exclude_unset=True)
+    new_stock = update_data.pop("stock_quantity", None)
     for field, value in update_data.items():
         setattr(book, field, value)
     
+    if new_stock is not None:
+        added = new_stock - book.stock_quantity
+        if added > 0:
+            # 늘어난 권수는 예약 대기자에게 먼저 배정하고 남은 만큼만 재고로
+            add_copies(db, book, added)
+        else:
+            book.stock_quantity = new_stock
+    
     db.commit()
     db.refresh(book)
     return book
 
 
 @router.delete("/{book_id}", status_code=204)
-async def delete_book(book_id: int, db: Session = Depends(get_db)):
-    """도서 삭제"""
+async def delete_book(book_id: int, db: Session = Depends(get_write_db, scope="function")):
+    """도서 삭제 (딸린 행이 많으면 백그라운드 작업으로 삭제하고 202 반환)"""
     book = db.query(BookModel).filter(BookModel.book_id == book_id).first()
     if not book:
         raise HTTPException(status_code=404, detail="도서를 찾을 수 없습니다")
     
-    db.delete(book)
+    counts = related_rows(db, "books", book_id)
+    if sum(counts.values()) > get_settings().purge_inline_max_rows:
+        # 대출/리뷰가 많은 도서는 백그라운드로 나눠 삭제
+        job = enqueue(db, "books.purge", {"book_id": book_id})
+        db.commit()
+        job_runner.wake()
+        return JSONResponse(status_code=202, content={"job_id": job.job_id, "status": job.status.value})
+    
+    delete_now(db, "books", book, counts)
     db.commit()
@@ -0,0 +1,151 @@
+"""
+Export Router - 전체 테이블 스트리밍 내보내기 (NDJSON / CSV, 선택적 gzip)
+서버 측 커서(yield_per)로 행을 나눠 읽고 생성기로 바로 응답에 흘려보내므로
+테이블 크기와 관계없이 메모리 사용량이 일정하다.
+"""
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Iterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Table, select
+
+from app.database import SessionLocal
+from app.db_models import Book as BookModel, Loan as LoanModel, Review as ReviewModel
+from app.routers.admin import get_admin_user
+from app.security import CurrentUser
+
+router = APIRouter()
+
+# 서버 측 커서에서 한 번에 가져오는 행 수
+YIELD_PER = 1000
+# 응답으로 내보내기 전에 모아 두는 바이트 수
+CHUNK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"직렬화할 수 없는 값: {type(value).__name__}")
+
+
+def _csv_value(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def iter_table_rows(table: Table) -> Iterator[tuple]:
+    """기본 키 순서로 전체 행을 서버 측 커서로 읽기 (요청 세션과 별도의 세션 사용)"""
+    db = SessionLocal()
+    try:
+        primary_key = list(table.primary_key.columns)
+        result = db.execute(
+            select(table).order_by(*primary_key).execution_options(yield_per=YIELD_PER)
+        )
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        db.close()
+
+
+def iter_ndjson(table: Table) -> Iterator[bytes]:
+    keys = [column.name for column in table.columns]
+    buffer = []
+    size = 0
+    for row in iter_table_rows(table):
+        line = json.dumps(dict(zip(keys, row)), ensure_ascii=False, default=_json_default) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def iter_csv(table: Table) -> Iterator[bytes]:
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow([column.name for column in table.columns])
+    for row in iter_table_rows(table):
+        writer.writerow([_csv_value(value) for value in row])
+        if text.tell() >= CHUNK_BYTES:
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+
+def gzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """청크를 받는 대로 gzip 압축해 전달"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(name: str, table: Table, format: str, gzip: bool) -> StreamingResponse:
+    chunks = iter_csv(table) if format == "csv" else iter_ndjson(table)
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d')}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        chunks = gzip_stream(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+FORMAT_QUERY = Query("ndjson", pattern="^(ndjson|csv)$", description="내보내기 형식 (ndjson, csv)")
+GZIP_QUERY = Query(False, description="gzip 압축 파일로 내보내기")
+
+
+@router.get("/books")
+def export_books(
+    format: str = FORMAT_QUERY,
+    gzip: bool = GZIP_QUERY,
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """도서 전체 내보내기 (관리자 전용)"""
+    return export_response("books", BookModel.__table__, format, gzip)
+
+
+@router.get("/loans")
+def export_loans(
+    format: str = FORMAT_QUERY,
+    gzip: bool = GZIP_QUERY,
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """대출 전체 내보내기 (관리자 전용)"""
+    return export_response("loans", LoanModel.__table__, format, gzip)
+
+
+@router.get("/reviews")
+def export_reviews(
+    format: str = FORMAT_QUERY,
+    gzip: bool = GZIP_QUERY,
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """리뷰 전체 내보내기 (관리자 전용)"""
+    return export_response("reviews", ReviewModel.__table__, format, gzip)
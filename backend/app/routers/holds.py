@@ -0,0 +1,89 @@
+from fastapi import APIRouter, HTTPException, Query, Depends
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.models import Hold as HoldSchema, HoldCreate, HoldResponse, HoldStatus
+from app.db_models import Hold as HoldModel, Book as BookModel, User as UserModel
+from app.database import get_db, get_write_db
+from app.holds import HoldError, cancel_hold, lock_book, place_hold, positions_for
+
+router = APIRouter()
+
+
+def _to_schema(hold: HoldModel, position: Optional[int], book_title: Optional[str] = None) -> HoldSchema:
+    schema = HoldSchema.model_validate(hold)
+    schema.position = position
+    schema.book_title = book_title
+    return schema
+
+
+@router.get("/", response_model=list[HoldSchema])
+async def get_holds(
+    user_id: Optional[int] = Query(None, description="사용자 ID로 필터"),
+    book_id: Optional[int] = Query(None, description="도서 ID로 필터"),
+    status: Optional[HoldStatus] = Query(None, description="예약 상태 필터"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """예약 목록 조회 (대기 순번 포함)"""
+    query = db.query(HoldModel, BookModel.title).join(BookModel, BookModel.book_id == HoldModel.book_id)
+
+    if user_id:
+        query = query.filter(HoldModel.user_id == user_id)
+    if book_id:
+        query = query.filter(HoldModel.book_id == book_id)
+    if status:
+        query = query.filter(HoldModel.status == status)
+
+    rows = query.order_by(HoldModel.hold_id.desc()).offset(skip).limit(limit).all()
+    positions = positions_for(db, [hold for hold, _ in rows])
+    return [_to_schema(hold, positions[hold.hold_id], title) for hold, title in rows]
+
+
+@router.post("/", response_model=HoldResponse)
+async def create_hold(hold_data: HoldCreate, db: Session = Depends(get_write_db, scope="function")):
+    """도서 예약 (재고가 없을 때 대기열에 추가 - 반납되면 순서대로 배정)"""
+    user = db.query(UserModel).filter(UserModel.user_id == hold_data.user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="회원을 찾을 수 없습니다")
+
+    book = lock_book(db, hold_data.book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="도서를 찾을 수 없습니다")
+
+    try:
+        hold = place_hold(db, user.user_id, book)
+    except HoldError as e:
+        db.rollback()
+        return HoldResponse(success=False, message=str(e))
+
+    db.commit()
+    db.refresh(hold)
+    position = positions_for(db, [hold])[hold.hold_id]
+
+    return HoldResponse(
+        success=True,
+        message=f"'{book.title}'을(를) 예약했습니다. 대기 순번: {position}번",
+        hold=_to_schema(hold, position, book.title)
+    )
+
+
+@router.delete("/{hold_id}", response_model=HoldResponse)
+async def delete_hold(hold_id: int, db: Session = Depends(get_write_db, scope="function")):
+    """예약 취소 (배정된 도서는 다음 대기자에게 넘어감)"""
+    hold = db.query(HoldModel).filter(HoldModel.hold_id == hold_id).first()
+    if not hold:
+        raise HTTPException(status_code=404, detail="예약 정보를 찾을 수 없습니다")
+
+    # 반납/만료 처리와 겹치지 않도록 도서 행을 잠근 뒤 상태 재확인
+    lock_book(db, hold.book_id)
+    db.refresh(hold)
+    if hold.status not in (HoldStatus.WAITING, HoldStatus.READY):
+        return HoldResponse(success=False, message="대기 중이거나 배정된 예약만 취소할 수 있습니다")
+
+    cancel_hold(db, hold)
+    db.commit()
+    db.refresh(hold)
+
+    return HoldResponse(success=True, message="예약이 취소되었습니다", hold=_to_schema(hold, None))
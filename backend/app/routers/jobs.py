@@ -0,0 +1,119 @@
+"""
+Jobs Router - 백그라운드 작업 등록/상태 조회 (관리자 전용)
+"""
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import jobs
+from app.database import get_db, get_write_db
+from app.db_models import Job as JobModel, JobSchedule as JobScheduleModel
+from app.models import Job as JobSchema, JobCreate, JobSchedule as JobScheduleSchema, JobStatus
+from app.routers.admin import get_admin_user
+from app.security import CurrentUser
+
+router = APIRouter()
+
+
+def to_schema(job: JobModel) -> JobSchema:
+    return JobSchema(
+        job_id=job.job_id,
+        kind=job.kind,
+        payload=json.loads(job.payload or "{}"),
+        status=job.status,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        run_after=job.run_after,
+        locked_by=job.locked_by,
+        lease_expires_at=job.lease_expires_at,
+        result=json.loads(job.result) if job.result else None,
+        last_error=job.last_error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+def _get_job(db: Session, job_id: int) -> JobModel:
+    job = db.query(JobModel).filter(JobModel.job_id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job
+
+
+@router.get("/", response_model=list[JobSchema])
+async def get_jobs(
+    status: Optional[JobStatus] = Query(None, description="작업 상태 필터"),
+    kind: Optional[str] = Query(None, description="작업 종류 필터"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """작업 목록 (최근 등록 순)"""
+    query = db.query(JobModel)
+    if status:
+        query = query.filter(JobModel.status == status)
+    if kind:
+        query = query.filter(JobModel.kind == kind)
+    return [to_schema(job) for job in query.order_by(JobModel.job_id.desc()).offset(skip).limit(limit).all()]
+
+
+@router.get("/kinds")
+async def get_job_kinds(current_user: CurrentUser = Depends(get_admin_user)):
+    """등록 가능한 작업 종류와 이 프로세스의 실행기 현황"""
+    return jobs.job_runner.stats()
+
+
+@router.get("/schedules", response_model=list[JobScheduleSchema])
+async def get_job_schedules(db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_admin_user)):
+    """주기 작업 목록과 다음 실행 시각"""
+    return db.query(JobScheduleModel).order_by(JobScheduleModel.name).all()
+
+
+@router.get("/{job_id}", response_model=JobSchema)
+async def get_job(job_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_admin_user)):
+    """작업 상태/결과 조회"""
+    return to_schema(_get_job(db, job_id))
+
+
+@router.post("/", response_model=JobSchema, status_code=202)
+async def create_job(job_data: JobCreate, db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_admin_user)):
+    """작업 등록 - 바로 반환하고 백그라운드에서 실행 (진행 상태는 GET /{job_id})"""
+    try:
+        job = jobs.enqueue(db, job_data.kind, job_data.payload, max_attempts=job_data.max_attempts)
+    except jobs.JobError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    db.refresh(job)
+    jobs.job_runner.wake()
+    return to_schema(job)
+
+
+@router.post("/{job_id}/cancel", response_model=JobSchema)
+async def cancel_job(job_id: int, db: Session = Depends(get_write_db, scope="function"), current_user: CurrentUser = Depends(get_admin_user)):
+    """대기/실행 중인 작업 취소 (실행 중이면 결과를 기록하지 않음)"""
+    job = _get_job(db, job_id)
+    try:
+        jobs.cancel(db, job)
+    except jobs.JobError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    db.refresh(job)
+    return to_schema(job)
+
+
+@router.post("/{job_id}/retry", response_model=JobSchema)
+async def retry_job(job_id: int, db: Session = Depends(get_write_db, scope="function"), current_user: CurrentUser = Depends(get_admin_user)):
+    """실패/취소된 작업 다시 실행"""
+    job = _get_job(db, job_id)
+    try:
+        jobs.retry(db, job)
+    except jobs.JobError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    db.refresh(job)
+    jobs.job_runner.wake()
+    return to_schema(job)
@@ -5,7 +5,9 @@ from typing import Optional
 
 from app.models import Loan as LoanSchema, LoanCreate, LoanResponse, LoanStatus
 from app.db_models import Loan as LoanModel, Book as BookModel, User as UserModel, SystemConfig
-from app.database import get_db
+from app.database import get_db, get_write_db
+from app.holds import fulfill_hold, lock_book, ready_hold_for, release_copy
+from app.rollups import record_borrow, record_extend, record_return
 
 router = APIRouter()
 
@@ -40,23 +42,29 @@ async def get_loan(loan_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/borrow", response_model=LoanResponse)
-async def borrow_book(loan_data: LoanCreate, db: Session = Depends(get_db)):
+async def borrow_book(loan_data: LoanCreate, db: Session = Depends(get_write_db, scope="function")):
     """도서 대출"""
+    # 도서 행 잠금 (반납/예약 배정과 같은 순서로 재고·대기열 변경을 직렬화) 후 회원 행 잠금
+    # (같은 회원의 동시 대출이 권수 제한을 함께 통과하지 않도록). 아래 확인은 모두 잠근 뒤의 최신 값으로 한다
+    book = lock_book(db, loan_data.book_id)
+    user = db.query(UserModel).filter(UserModel.user_id == loan_data.user_id).with_for_update().populate_existing().first()
+    
     # 사용자 확인
-    user = db.query(UserModel).filter(UserModel.user_id == loan_data.user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="회원을 찾을 수 없습니다")
     
     # 도서 확인
-    book = db.query(BookModel).filter(BookModel.book_id == loan_data.book_id).first()
     if not book:
         raise HTTPException(status_code=404, detail="도서를 찾을 수 없습니다")
     
+    # 예약 배정 확인 (반납 시 이 회원에게 배정된 도서는 재고와 무관하게 대출)
+    ready_hold = ready_hold_for(db, loan_data.user_id, book.book_id)
+    
     # 재고 확인
-    if book.stock_quantity <= 0:
+    if not ready_hold and book.stock_quantity <= 0:
         return LoanResponse(
             success=False,
-            message=f"'{book.title}'은(는) 현재 재고가 없습니다"
+            message=f"'{book.title}'은(는) 현재 재고가 없습니다. 예약하시면 반납되는 대로 순서대로 배정됩니다"
         )
     
     # 대출 권수 제한 확인
@@ -88,9 +96,13 @@ async def borrow_book(loan_data: LoanCreate, db: Session = Depends(get_db)):
         status=LoanStatus.BORROWED
     )
     
-    book.stock_quantity -= 1
+    if ready_hold:
+        fulfill_hold(ready_hold)
+    else:
+        book.stock_quantity -= 1
     
     db.add(new_loan)
+    record_borrow(db, new_loan, book)
     db.commit()
     db.refresh(new_loan)
     
@@ -102,12 +114,15 @@ async def borrow_book(loan_data: LoanCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/{loan_id}/return", response_model=LoanResponse)
-async def return_book(loan_id: int, db: Session = Depends(get_db)):
+async def return_book(loan_id: int, db: Session = Depends(get_write_db, scope="function")):
     """도서 반납"""
     loan = db.query(LoanModel).filter(LoanModel.loan_id == loan_id).first()
     if not loan:
         raise HTTPException(status_code=404, detail="대출 정보를 찾을 수 없습니다")
     
+    # 도서 행을 잠근 뒤 상태 재확인 (같은 대출의 동시 반납이 재고를 두 번 올리지 않도록)
+    book = lock_book(db, loan.book_id)
+    db.refresh(loan)
     if loan.status == LoanStatus.RETURNED:
         return LoanResponse(
             success=False,
@@ -118,23 +133,25 @@ async def return_book(loan_id: int, db: Session = Depends(get_db)):
     loan.return_date = datetime.now()
     loan.status = LoanStatus.RETURNED
     
-    # 재고 복구
-    book = db.query(BookModel).filter(BookModel.book_id == loan.book_id).first()
-    if book:
-        book.stock_quantity += 1
+    # 재고 복구 (예약 대기자가 있으면 재고 대신 다음 대기자에게 배정)
+    hold = release_copy(db, book) if book else None
     
+    record_return(db, loan, book)
     db.commit()
     db.refresh(loan)
     
+    message = f"'{book.title}'이(가) 반납되었습니다"
+    if hold:
+        message += " (예약 대기자에게 배정되었습니다)"
     return LoanResponse(
         success=True,
-        message=f"'{book.title}'이(가) 반납되었습니다",
+        message=message,
         loan=loan
     )
 
 
 @router.post("/{loan_id}/extend", response_model=LoanResponse)
-async def extend_loan(loan_id: int, db: Session = Depends(get_db)):
+async def extend_loan(loan_id: int, db: Session = Depends(get_write_db, scope="function")):
     """대출 연장 (1회 제한)"""
     loan = db.query(LoanModel).filter(LoanModel.loan_id == loan_id).first()
     if not loan:
@@ -160,8 +177,10 @@ async def extend_loan(loan_id: int, db: Session = Depends(get_db)):
     ext_period_config = db.query(SystemConfig).filter(SystemConfig.key == "extension_period_days").first()
     extension_days = int(ext_period_config.value) if ext_period_config else 7
     
+    previous_due_date = loan.due_date
     loan.due_date = loan.due_date + timedelta(days=extension_days)
     loan.extension_count += 1
+    record_extend(db, loan, previous_due_date)
     
     db.commit()
     db.refresh(loan)
@@ -1,59 +1,65 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional
 
 from app.models import Review as ReviewSchema, ReviewCreate, ReviewUpdate, ReviewWithUser
 from app.db_models import Review as ReviewModel, Book as BookModel, User as UserModel
-from app.database import get_db
+from app.database import get_db, get_write_db
+from app.http_cache import catalog_versions
+from app.serialization import FastJSONResponse, dump_row
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 
 @router.get("/book/{book_id}", response_model=list[ReviewWithUser])
 async def get_book_reviews(
     book_id: int,
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """특정 도서의 리뷰 목록 조회"""
-    reviews = db.query(ReviewModel).filter(ReviewModel.book_id == book_id).offset(skip).limit(limit).all()
+    cache = catalog_versions.check(request, "reviews", book_id)
+    if cache.fresh:
+        return cache.not_modified()
+    
+    # 작성자 이름은 조인으로 함께 조회 (리뷰마다 회원을 따로 조회하지 않음)
+    rows = db.query(ReviewModel, UserModel.name).outerjoin(
+        UserModel, UserModel.user_id == ReviewModel.user_id
+    ).filter(ReviewModel.book_id == book_id).offset(skip).limit(limit).all()
     
     result = []
-    for review in reviews:
-        user = db.query(UserModel).filter(UserModel.user_id == review.user_id).first()
-        review_data = ReviewWithUser(
-            review_id=review.review_id,
-            user_id=review.user_id,
-            book_id=review.book_id,
-            rating=review.rating,
-            content=review.content,
-            created_at=review.created_at,
-            user_name=user.name if user else None
-        )
+    for review, user_name in rows:
+        review_data = dump_row(ReviewSchema, review)
+        review_data["user_name"] = user_name
         result.append(review_data)
     
-    return result
+    return cache.apply(FastJSONResponse(result))
 
 
 @router.get("/book/{book_id}/stats")
-async def get_book_review_stats(book_id: int, db: Session = Depends(get_db)):
+async def get_book_review_stats(book_id: int, request: Request, db: Session = Depends(get_db)):
     """도서 리뷰 통계 (평균 평점, 리뷰 수)"""
+    cache = catalog_versions.check(request, "reviews", book_id)
+    if cache.fresh:
+        return cache.not_modified()
+    
     stats = db.query(
         func.avg(ReviewModel.rating).label("average_rating"),
         func.count(ReviewModel.review_id).label("review_count")
     ).filter(ReviewModel.book_id == book_id).first()
     
-    return {
+    return cache.apply(FastJSONResponse({
         "book_id": book_id,
         "average_rating": round(float(stats.average_rating), 1) if stats.average_rating else 0,
         "review_count": stats.review_count or 0
-    }
+    }))
 
 
 @router.post("/", response_model=ReviewSchema, status_code=201)
-async def create_review(review_data: ReviewCreate, db: Session = Depends(get_db)):
+async def create_review(review_data: ReviewCreate, db: Session = Depends(get_write_db, scope="function")):
     """리뷰 작성"""
     # 사용자 확인
     user = db.query(UserModel).filter(UserModel.user_id == review_data.user_id).first()
@@ -86,7 +92,7 @@ async def create_review(review_data: ReviewCreate, db: Session = Depends(get_db)
 
 
 @router.put("/{review_id}", response_model=ReviewSchema)
-async def update_review(review_id: int, review_data: ReviewUpdate, db: Session = Depends(get_db)):
+async def update_review(review_id: int, review_data: ReviewUpdate, db: Session = Depends(get_write_db, scope="function")):
     """리뷰 수정"""
     review = db.query(ReviewModel).filter(ReviewModel.review_id == review_id).first()
     if not review:
@@ -102,7 +108,7 @@ async def update_review(review_id: int, review_data: ReviewUpdate, db: Session =
 
 
 @router.delete("/{review_id}", status_code=204)
-async def delete_review(review_id: int, db: Session = Depends(get_db)):
+async def delete_review(review_id: int, db: Session = Depends(get_write_db, scope="function")):
     """리뷰 삭제"""
     review = db.query(ReviewModel).filter(ReviewModel.review_id == review_id).first()
     if not review:
@@ -0,0 +1,57 @@
+"""
+Stats Router - 관리자 대시보드 통계
+원본 테이블 대신 대출/반납 시 갱신되는 집계 테이블(app/rollups.py)을 읽는다.
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app import jobs, rollups
+from app.database import get_db
+from app.models import DashboardStats, Job as JobSchema
+from app.http_cache import catalog_versions
+from app.outbox import outbox_dispatcher
+from app.read_cache import catalog_cache
+from app.routers.admin import get_admin_user
+from app.routers.jobs import to_schema
+from app.security import CurrentUser
+
+router = APIRouter()
+
+
+@router.get("/", response_model=DashboardStats)
+def get_dashboard_stats(
+    days: int = Query(14, ge=1, le=90, description="일별 추이 기간 (일)"),
+    top: int = Query(10, ge=1, le=50, description="인기 도서 수"),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """대시보드 통계 - 일별 대출/반납, 연체 건수, 인기 도서, 카테고리별 이용률, 활동 사용자 (관리자 전용)"""
+    return rollups.dashboard(db, days=days, top=top)
+
+
+@router.post("/reconcile", response_model=JobSchema, status_code=202)
+async def reconcile_stats(db: Session = Depends(get_db), current_user: CurrentUser = Depends(get_admin_user)):
+    """집계 테이블 재계산 작업 등록 (관리자 전용) - 결과는 GET /api/admin/jobs/{job_id}"""
+    job = jobs.enqueue(db, "rollups.reconcile")
+    db.commit()
+    db.refresh(job)
+    jobs.job_runner.wake()
+    return to_schema(job)
+
+
+@router.get("/outbox")
+async def get_outbox_stats(current_user: CurrentUser = Depends(get_admin_user)):
+    """outbox 소비자별 체크포인트와 지연(lag), 실패 현황 (관리자 전용)"""
+    return outbox_dispatcher.stats()
+
+
+@router.get("/http-cache")
+async def get_http_cache_stats(current_user: CurrentUser = Depends(get_admin_user)):
+    """조건부 요청(ETag) 처리 현황 - 304 비율, 추적 중인 행 버전 수 (관리자 전용)"""
+    return catalog_versions.stats()
+
+
+@router.get("/read-cache")
+async def get_read_cache_stats(current_user: CurrentUser = Depends(get_admin_user)):
+    """도서 조회 캐시 hit 비율, 동시 요청 합류 수, 항목 수 (관리자 전용)"""
+    return catalog_cache.stats()
@@ -1,30 +1,42 @@
 from fastapi import APIRouter, HTTPException, Query, Depends, Header
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import Optional
-import hashlib
 
 from app.models import User as UserSchema, UserCreate, UserUpdate, UserLogin
 from app.db_models import User as UserModel
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_db, get_write_db
+from app.jobs import enqueue, job_runner
+from app.passwords import hash_password, verify_password
+from app.purge import delete_now, related_rows
+from app.security import CurrentUser, InvalidToken, create_access_token, decode_access_token, parse_bearer, revocation_list
 
 router = APIRouter()
 
 
-def hash_password(password: str) -> str:
-    """간단한 비밀번호 해싱 (실제로는 bcrypt 사용 권장)"""
-    return hashlib.sha256(password.encode()).hexdigest()
+async def get_current_user(authorization: Optional[str] = Header(None)) -> CurrentUser:
+    """현재 로그인한 사용자 가져오기 (Bearer 토큰 서명 검증, DB 조회 없음)"""
+    token = parse_bearer(authorization)
+    if not token:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다", headers={"WWW-Authenticate": "Bearer"})
+    
+    try:
+        return decode_access_token(token)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
 
 
-async def get_current_user(x_user_id: Optional[str] = Header(None), db: Session = Depends(get_db)):
-    """현재 로그인한 사용자 가져오기 (헤더 기반 임시 인증)"""
-    if not x_user_id:
-        raise HTTPException(status_code=401, detail="로그인이 필요합니다")
-    
-    user = db.query(UserModel).filter(UserModel.user_id == int(x_user_id)).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="유효하지 않은 사용자입니다")
-    
-    return user
+async def get_optional_user(authorization: Optional[str] = Header(None)) -> Optional[CurrentUser]:
+    """로그인한 경우 현재 사용자, 토큰이 없거나 유효하지 않으면 None (로그인 없이도 쓰는 API용)"""
+    token = parse_bearer(authorization)
+    if not token:
+        return None
+    try:
+        return decode_access_token(token)
+    except InvalidToken:
+        return None
 
 
 @router.get("/", response_model=list[UserSchema])
@@ -57,14 +69,19 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
     
     new_user = UserModel(
         email=user_data.email,
-        password=hash_password(user_data.password),
+        password=await hash_password(user_data.password),
         name=user_data.name,
         phone=user_data.phone,
         address=user_data.address,
         role=user_data.role
     )
     db.add(new_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 해싱을 기다리는 사이 같은 이메일로 가입한 경우 (쓰기 잠금을 해싱 동안 잡지 않도록 UNIQUE 제약으로 확인)
+        db.rollback()
+        raise HTTPException(status_code=400, detail="이미 사용 중인 이메일입니다")
     db.refresh(new_user)
     return new_user
 
@@ -73,12 +90,22 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
 async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     """로그인"""
     user = db.query(UserModel).filter(UserModel.email == login_data.email).first()
-    if not user or user.password != hash_password(login_data.password):
+    if not user:
         raise HTTPException(status_code=401, detail="이메일 또는 비밀번호가 올바르지 않습니다")
     
+    ok, needs_rehash = await verify_password(login_data.password, user.password)
+    if not ok:
+        raise HTTPException(status_code=401, detail="이메일 또는 비밀번호가 올바르지 않습니다")
+    
+    # 이전 SHA-256 해시 또는 비용 설정이 바뀐 해시는 로그인 성공 시 새 형식으로 교체
+    if needs_rehash:
+        user.password = await hash_password(login_data.password)
+        db.commit()
+    
     return {
         "success": True,
         "message": "로그인 성공",
+        **create_access_token(user.user_id, user.role.value),
         "user": {
             "user_id": user.user_id,
             "email": user.email,
@@ -88,33 +115,56 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     }
 
 
+@router.post("/logout")
+async def logout(current_user: CurrentUser = Depends(get_current_user)):
+    """로그아웃 (현재 토큰 폐기)"""
+    revocation_list.revoke_token(current_user.jti, current_user.expires_at)
+    return {"success": True, "message": "로그아웃되었습니다"}
+
+
 @router.put("/{user_id}", response_model=UserSchema)
-async def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_write_db, scope="function")):
     """회원 정보 수정"""
+    update_data = user_data.model_dump(exclude_unset=True)
+    
+    # 비밀번호 변경 시 해싱 처리 (쓰기 잠금을 잡기 전에)
+    if "password" in update_data:
+        update_data["password"] = await hash_password(update_data["password"])
+    
     user = db.query(UserModel).filter(UserModel.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="회원을 찾을 수 없습니다")
     
-    update_data = user_data.model_dump(exclude_unset=True)
-    
-    # 비밀번호 변경 시 해싱 처리
-    if "password" in update_data:
-        update_data["password"] = hash_password(update_data["password"])
+    role_changed = "role" in update_data and update_data["role"] != user.role
         
     for field, value in update_data.items():
         setattr(user, field, value)
     
     db.commit()
     db.refresh(user)
+    
+    # 권한이 바뀌면 기존 토큰에 담긴 role이 달라지므로 폐기
+    if role_changed:
+        revocation_list.revoke_user(user_id)
     return user
 
 
 @router.delete("/{user_id}", status_code=204)
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
-    """회원 삭제"""
+async def delete_user(user_id: int, db: Session = Depends(get_write_db, scope="function")):
+    """회원 삭제 (딸린 행이 많으면 백그라운드 작업으로 삭제하고 202 반환)"""
     user = db.query(UserModel).filter(UserModel.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="회원을 찾을 수 없습니다")
     
-    db.delete(user)
+    counts = related_rows(db, "users", user_id)
+    if sum(counts.values()) > get_settings().purge_inline_max_rows:
+        # 이력이 많은 회원은 백그라운드로 나눠 삭제 (토큰은 바로 폐기)
+        job = enqueue(db, "users.purge", {"user_id": user_id})
+        db.commit()
+        job_runner.wake()
+        revocation_list.revoke_user(user_id)
+        return JSONResponse(status_code=202, content={"job_id": job.job_id, "status": job.status.value})
+    
+    delete_now(db, "users", user, counts)
     db.commit()
+    revocation_list.revoke_user(user_id)
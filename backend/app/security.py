@@ -0,0 +1,171 @@
+"""
+Security - 서명된 세션 토큰 (JWT HS256)
+로그인 시 user_id와 role을 담은 토큰을 발급하고, 요청마다 DB 조회 없이 서명만으로 검증
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger("app.security")
+
+
+class InvalidToken(Exception):
+    """서명 불일치, 만료, 폐기 등으로 사용할 수 없는 토큰"""
+
+
+class CurrentUser:
+    """토큰에서 복원한 로그인 사용자 정보"""
+
+    def __init__(self, user_id: int, role: str, jti: str, issued_at: int, expires_at: int):
+        self.user_id = user_id
+        self.role = role
+        self.jti = jti
+        self.issued_at = issued_at
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"<CurrentUser(user_id={self.user_id}, role='{self.role}')>"
+
+
+# ========== 서명 ==========
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+@lru_cache()
+def _secret_key() -> bytes:
+    secret = get_settings().auth_secret_key
+    if not secret:
+        # 설정이 없으면 프로세스마다 임의 키 사용 (재시작/멀티 워커 시 토큰 무효화)
+        logger.warning("AUTH_SECRET_KEY가 설정되지 않음 - 임시 서명 키 사용")
+        secret = secrets.token_urlsafe(32)
+    return secret.encode("utf-8")
+
+
+_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def _sign(signing_input: str) -> str:
+    return _b64encode(hmac.new(_secret_key(), signing_input.encode("ascii"), hashlib.sha256).digest())
+
+
+def create_access_token(user_id: int, role: str) -> Dict[str, Any]:
+    """토큰 발급. 토큰 문자열과 만료 정보를 반환"""
+    now = int(time.time())
+    ttl = get_settings().auth_token_ttl_minutes * 60
+    claims = {
+        "sub": str(user_id),
+        "role": role,
+        "iat": now,
+        "exp": now + ttl,
+        "jti": secrets.token_hex(8),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = f"{_HEADER}.{payload}"
+    return {
+        "access_token": f"{signing_input}.{_sign(signing_input)}",
+        "token_type": "bearer",
+        "expires_in": ttl,
+    }
+
+
+def decode_access_token(token: str) -> CurrentUser:
+    """서명, 만료, 폐기 여부를 확인하고 사용자 정보 반환 (DB 조회 없음)"""
+    try:
+        header, payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("잘못된 토큰 형식")
+
+    if header != _HEADER or not hmac.compare_digest(signature, _sign(f"{header}.{payload}")):
+        raise InvalidToken("토큰 서명이 올바르지 않습니다")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+        user = CurrentUser(
+            user_id=int(claims["sub"]),
+            role=claims["role"],
+            jti=claims["jti"],
+            issued_at=int(claims["iat"]),
+            expires_at=int(claims["exp"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        raise InvalidToken("토큰 내용이 올바르지 않습니다")
+
+    if user.expires_at <= time.time():
+        raise InvalidToken("토큰이 만료되었습니다")
+    if revocation_list.is_revoked(user):
+        raise InvalidToken("폐기된 토큰입니다")
+    return user
+
+
+# ========== 폐기 목록 ==========
+
+class TokenRevocationList:
+    """
+    로그아웃한 토큰(jti)과 권한이 바뀐 사용자의 기존 토큰을 거부하기 위한 메모리 캐시.
+    항목은 해당 토큰의 만료 시각까지만 유지되므로 크기가 발급량에 비례해 커지지 않는다.
+    프로세스마다 따로 유지된다: uvicorn 워커가 여러 개면 로그아웃/폐기는 그 요청을 처리한 워커에만 반영되고,
+    다른 워커에서는 토큰이 만료될 때까지 유효하다 (워커 간 공유가 필요하면 짧은 AUTH_TOKEN_TTL_MINUTES로 제한).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # jti → 토큰 만료 시각
+        self._revoked_tokens: Dict[str, int] = {}
+        # user_id → 이 시각(초, 토큰 iat와 같은 단위) 이전에 발급된 토큰은 모두 무효
+        self._revoked_before: Dict[int, int] = {}
+
+    def revoke_token(self, jti: str, expires_at: int):
+        with self._lock:
+            self._revoked_tokens[jti] = expires_at
+            self._purge()
+
+    def revoke_user(self, user_id: int):
+        """사용자의 기존 토큰 전부 무효화 (권한 변경, 탈퇴 시)"""
+        with self._lock:
+            # iat가 초 단위 정수이므로 같은 단위로 저장 (폐기 직후 같은 초에 다시 로그인한 토큰은 유효).
+            # 폐기 직전 같은 초에 발급된 토큰은 구분할 수 없어 유효하게 남는다
+            self._revoked_before[user_id] = int(time.time())
+            self._purge()
+
+    def is_revoked(self, user: CurrentUser) -> bool:
+        if user.jti in self._revoked_tokens:
+            return True
+        revoked_before = self._revoked_before.get(user.user_id)
+        return revoked_before is not None and user.issued_at < revoked_before
+
+    def _purge(self):
+        now = time.time()
+        self._revoked_tokens = {jti: exp for jti, exp in self._revoked_tokens.items() if exp > now}
+        ttl = get_settings().auth_token_ttl_minutes * 60
+        self._revoked_before = {uid: ts for uid, ts in self._revoked_before.items() if ts + ttl > now}
+
+    def __len__(self):
+        return len(self._revoked_tokens) + len(self._revoked_before)
+
+
+revocation_list = TokenRevocationList()
+
+
+def parse_bearer(authorization: Optional[str]) -> Optional[str]:
+    """'Bearer <token>' 헤더에서 토큰 추출"""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
@@ -0,0 +1,264 @@
+"""
+Seed - 대규모 합성 데이터 생성 (성능 측정 / 벤치마크용)
+시드를 고정한 난수로 도서(한글/영문 제목), 회원, 대출 이력, 리뷰를 만든다. 같은 인자면 항상 같은 데이터가 생성된다.
+대출과 리뷰는 멱법칙(Zipf) 분포를 따라 소수의 인기 도서와 활동적인 회원에게 몰린다.
+
+행은 생성기로 만들어 batch_size 단위로 Core INSERT (executemany) 하므로 메모리 사용은 배치 크기로 제한된다.
+(pymysql은 executemany를 다중 행 INSERT 하나로 묶어 보냄) ID를 직접 지정하므로 빈 테이블에서만 실행한다.
+
+사용법:
+    python -m app.seed --scale medium
+    python -m app.seed --books 2000000 --users 300000 --loans 5000000 --reviews 1000000 --reset
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db_models import Book as BookModel, Loan as LoanModel, LoanStatus, Review as ReviewModel, User as UserModel, UserRole
+from app.outbox import record_event
+
+# 규모 프리셋 (books, users, loans, reviews)
+SCALES = {
+    "small": (2_000, 500, 4_000, 3_000),
+    "medium": (200_000, 20_000, 500_000, 200_000),
+    "large": (2_000_000, 300_000, 5_000_000, 1_000_000),
+}
+
+SEED_PASSWORD = "seed1234"  # 생성된 모든 회원의 비밀번호 (1번 회원은 사서)
+DEFAULT_BATCH_SIZE = 5000
+
+CATEGORIES = ["프로그래밍", "아키텍처", "데이터", "커리어", "소설", "역사", "과학", "경제", "에세이", "어린이"]
+KOREAN_WORDS = ["클린", "코드", "설계", "패턴", "데이터", "시스템", "분산", "실용", "알고리즘", "네트워크",
+                "도시", "바다", "기억", "시간", "여행", "역사", "우주", "마음", "경제", "철학"]
+ENGLISH_WORDS = ["Clean", "Code", "Design", "Patterns", "Data", "Systems", "Distributed", "Practical", "Algorithms", "Networks",
+                 "City", "Ocean", "Memory", "Time", "Journey", "History", "Universe", "Mind", "Economy", "Philosophy"]
+WORDS = KOREAN_WORDS + ENGLISH_WORDS
+KOREAN_SURNAMES = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임"]
+KOREAN_GIVEN = ["민준", "서연", "도윤", "지우", "하준", "서윤", "은우", "지유", "시우", "하은"]
+ENGLISH_NAMES = ["Smith", "Martin", "Evans", "Fowler", "Knuth", "Beck", "Hunt", "Thomas", "Kleppmann", "Gamma"]
+PUBLISHERS = ["인사이트", "한빛미디어", "위키북스", "길벗", "민음사", "창비", "O'Reilly", "Manning", "Addison-Wesley", "Pragmatic"]
+
+BASE_DATE = datetime(2025, 1, 1)  # 날짜 기준점 (실행 시각과 무관하게 같은 데이터)
+
+
+def zipf_weights(n: int, exponent: float = 1.0) -> List[float]:
+    """1..n 순위의 누적 가중치 (rank^-exponent). random.choices의 cum_weights로 사용"""
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def _book_title(rng: random.Random) -> str:
+    words = KOREAN_WORDS if rng.random() < 0.6 else ENGLISH_WORDS
+    return " ".join(rng.sample(words, rng.randint(1, 4)))
+
+
+def _person(rng: random.Random) -> str:
+    if rng.random() < 0.7:
+        return rng.choice(KOREAN_SURNAMES) + rng.choice(KOREAN_GIVEN)
+    return f"{rng.choice('ABCDEFGHJKLMNPRSTW')}. {rng.choice(ENGLISH_NAMES)}"
+
+
+def iter_books(rng: random.Random, count: int) -> Iterator[Dict[str, Any]]:
+    for i in range(count):
+        yield {
+            "book_id": i + 1,
+            "isbn": f"979-11-{i // 100000:02d}-{i % 100000:05d}-{i % 10}",
+            "title": f"{_book_title(rng)} {i + 1}",
+            "author": _person(rng),
+            "publisher": rng.choice(PUBLISHERS),
+            "published_year": rng.randint(1970, 2024),
+            "category": rng.choice(CATEGORIES),
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(20, 120))),
+            "stock_quantity": rng.randint(0, 5),
+            "change_seq": 0,  # 초기 데이터 (증분 동기화의 전체 동기화에 포함)
+            "created_at": BASE_DATE - timedelta(days=rng.randint(0, 3650)),
+        }
+
+
+def iter_users(rng: random.Random, count: int, password_hash: str) -> Iterator[Dict[str, Any]]:
+    for i in range(count):
+        yield {
+            "user_id": i + 1,
+            "email": "librarian@example.com" if i == 0 else f"member{i:07d}@example.com",
+            "password": password_hash,
+            "name": _person(rng),
+            "phone": f"010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            "role": UserRole.LIBRARIAN if i == 0 else UserRole.MEMBER,
+            "created_at": BASE_DATE - timedelta(days=rng.randint(0, 1800)),
+        }
+
+
+def iter_loans(rng: random.Random, count: int, books: int, users: int, active_ratio: float = 0.03) -> Iterator[Dict[str, Any]]:
+    """최근 2년 대출 이력. active_ratio만큼은 대출 중(일부 연체)"""
+    book_weights = zipf_weights(books)
+    user_weights = zipf_weights(users, 0.8)
+    book_ids, user_ids = range(1, books + 1), range(1, users + 1)
+    chunk = 10000
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        for book_id, user_id in zip(
+            rng.choices(book_ids, cum_weights=book_weights, k=size),
+            rng.choices(user_ids, cum_weights=user_weights, k=size),
+        ):
+            if rng.random() < active_ratio:
+                loan_date = BASE_DATE - timedelta(days=rng.randint(0, 30), minutes=rng.randint(0, 1439))
+                return_date, status = None, LoanStatus.BORROWED
+            else:
+                loan_date = BASE_DATE - timedelta(days=rng.randint(15, 730), minutes=rng.randint(0, 1439))
+                return_date, status = loan_date + timedelta(days=rng.randint(1, 21)), LoanStatus.RETURNED
+            yield {
+                "user_id": user_id,
+                "book_id": book_id,
+                "loan_date": loan_date,
+                "due_date": loan_date + timedelta(days=14),
+                "return_date": return_date,
+                "extension_count": 0,
+                "status": status,
+            }
+
+
+def iter_reviews(rng: random.Random, count: int, books: int, users: int) -> Iterator[Dict[str, Any]]:
+    """(회원, 도서) 조합은 중복 없음. 인기 도서일수록 리뷰가 많음"""
+    count = min(count, books * users)
+    book_weights = zipf_weights(books)
+    book_ids = range(1, books + 1)
+    seen = set()
+    while len(seen) < count:
+        for book_id in rng.choices(book_ids, cum_weights=book_weights, k=min(10000, count - len(seen))):
+            user_id = rng.randint(1, users)
+            key = (user_id - 1) * books + book_id
+            if key in seen:
+                continue
+            seen.add(key)
+            yield {
+                "user_id": user_id,
+                "book_id": book_id,
+                "rating": min(5, max(1, round(rng.gauss(3.8, 1.0)))),
+                "content": " ".join(rng.choices(WORDS, k=rng.randint(5, 40))),
+                "created_at": BASE_DATE - timedelta(days=rng.randint(0, 730)),
+            }
+
+
+def _insert_batches(
+    db: Session,
+    model,
+    rows: Iterator[Dict[str, Any]],
+    batch_size: int,
+    on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> int:
+    total = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return total
+        db.execute(insert(model), batch)
+        if on_batch:
+            on_batch(batch)
+        db.commit()
+        total += len(batch)
+        if progress:
+            progress(model.__tablename__, total)
+
+
+def generate(
+    db: Session,
+    books: int,
+    users: int,
+    loans: int,
+    reviews: int,
+    seed: int = 42,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, Any]:
+    """빈 DB에 합성 데이터 생성. 테이블별 생성 건수와 소요 시간 반환"""
+    from app.passwords import hash_password_sync
+
+    for model in (BookModel, UserModel, LoanModel, ReviewModel):
+        if db.execute(select(func.count()).select_from(model)).scalar():
+            raise ValueError(f"{model.__tablename__} 테이블이 비어 있지 않습니다 (--reset으로 초기화 후 실행)")
+
+    # 테이블마다 독립된 난수열 → 한 테이블의 크기를 바꿔도 다른 테이블 데이터는 그대로
+    def rng_for(name: str) -> random.Random:
+        return random.Random(f"{seed}:{name}")
+
+    summary: Dict[str, Any] = {"seed": seed}
+    started = time.perf_counter()
+
+    def record_books(batch: List[Dict[str, Any]]):
+        # Core INSERT라 flush 이벤트를 거치지 않으므로 outbox 이벤트를 직접 기록
+        record_event(db, "books", "bulk_insert", {
+            "first_book_id": batch[0]["book_id"], "last_book_id": batch[-1]["book_id"], "count": len(batch)
+        })
+
+    summary["books"] = _insert_batches(db, BookModel, iter_books(rng_for("books"), books), batch_size, record_books, progress)
+    # 해싱은 한 번만 (모든 회원이 같은 비밀번호)
+    summary["users"] = _insert_batches(db, UserModel, iter_users(rng_for("users"), users, hash_password_sync(SEED_PASSWORD)), batch_size, progress=progress)
+    if books and users:
+        summary["loans"] = _insert_batches(db, LoanModel, iter_loans(rng_for("loans"), loans, books, users), batch_size, progress=progress)
+        summary["reviews"] = _insert_batches(db, ReviewModel, iter_reviews(rng_for("reviews"), reviews, books, users), batch_size, progress=progress)
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 1)
+    return summary
+
+
+# ========== CLI ==========
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="대규모 합성 데이터 생성 (도서/회원/대출/리뷰)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="규모 프리셋 (개별 옵션이 우선)")
+    parser.add_argument("--books", type=int)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--loans", type=int)
+    parser.add_argument("--reviews", type=int)
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (같은 시드 = 같은 데이터)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="INSERT 한 번에 보낼 행 수")
+    parser.add_argument("--reset", action="store_true", help="모든 테이블을 지우고 다시 만든 뒤 생성")
+    parser.add_argument("--skip-rollups", action="store_true", help="대시보드 집계 재계산 생략")
+    args = parser.parse_args(argv)
+
+    books, users, loans, reviews = SCALES[args.scale]
+    books = args.books if args.books is not None else books
+    users = args.users if args.users is not None else users
+    loans = args.loans if args.loans is not None else loans
+    reviews = args.reviews if args.reviews is not None else reviews
+
+    from app.database import Base, SessionLocal, engine, init_db
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    init_db()
+
+    current = {"table": None}
+
+    def progress(table: str, done: int):
+        if current["table"] not in (None, table):
+            print(file=sys.stderr)
+        current["table"] = table
+        print(f"\r{table}: {done:,}", end="", file=sys.stderr, flush=True)
+
+    db = SessionLocal()
+    try:
+        summary = generate(db, books, users, loans, reviews, seed=args.seed, batch_size=args.batch_size, progress=progress)
+        print(file=sys.stderr)
+        if not args.skip_rollups:
+            from app.rollups import reconcile
+            summary["rollups"] = reconcile(db)
+    except ValueError as e:
+        print(f"\n{e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+빠른 JSON 응답 경로 - 큰 목록 응답의 직렬화 비용 절감
+
+기본 경로는 ORM 행마다 response_model 검증(from_attributes) → dict 변환 → 표준 json 인코딩을 거친다.
+이미 DB 제약을 통과한 ORM 행은 다시 검증할 필요가 없으므로, 스키마 필드 이름대로 속성만 꺼내 dict를 만들고
+orjson으로 바로 인코딩한다. orjson이 없으면 표준 json으로 같은 형식을 출력한다.
+
+사용법 (라우터 단위로 선택):
+    router = APIRouter(default_response_class=FastJSONResponse)
+
+    @router.get("/", response_model=list[BookSchema])   # OpenAPI 문서용으로 유지
+    async def get_books(...):
+        return FastJSONResponse(dump_rows(BookSchema, books))   # Response를 반환하면 검증을 건너뜀
+"""
+import enum
+import json
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 선택 의존성
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """표준 json 대체 경로 - pydantic JSON 출력과 같은 형식"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset() == timezone.utc.utcoffset(None):
+            return value.replace(tzinfo=None).isoformat() + "Z"
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        # OPT_UTC_Z: UTC 시각을 pydantic과 같이 ...Z로 출력
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 기반 JSON 응답 (datetime / Enum을 그대로 인코딩)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _row_getter(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]]) -> Callable[[Any], Dict[str, Any]]:
+    # 스키마 필드 순서를 유지하며 fields에 있는 것만 (None이면 전체)
+    names = tuple(name for name in schema.model_fields if fields is None or name in fields)
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        return lambda row: {names[0]: getter(row)}
+    return lambda row: dict(zip(names, getter(row)))
+
+
+def dump_row(schema: Type[BaseModel], row: Any, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """ORM 행 → schema 필드 이름의 dict (검증 없음 - 신뢰하는 DB 출력 전용). fields로 일부 필드만 선택"""
+    return _row_getter(schema, tuple(fields) if fields is not None else None)(row)
+
+
+def dump_rows(schema: Type[BaseModel], rows: Iterable[Any], fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    getter = _row_getter(schema, tuple(fields) if fields is not None else None)
+    return [getter(row) for row in rows]
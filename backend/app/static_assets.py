@@ -0,0 +1,183 @@
+"""
+Static Assets - 빌드된 프론트엔드(static/) 서빙
+
+시작 시 디렉터리를 한 번 색인해 두고, 요청 처리 중에는 파일 존재 확인(stat)을 하지 않는다.
+    - index.html: 본문과 압축본을 메모리에 보관, ETag + no-cache (배포하면 바로 반영)
+    - /assets/*: Vite 빌드 파일명에 내용 해시가 들어 있으므로 1년 immutable 캐시
+    - 그 밖의 파일: ETag로 재검증
+    - 같은 경로에 미리 압축한 .br / .gz 파일이 있으면 Accept-Encoding에 맞춰 그 파일을 보냄
+색인에 없는 경로는 SPA 라우팅으로 보고 index.html을 반환한다 (/assets, /api 아래는 404).
+빌드 후 파일을 바꾸면 서버를 다시 시작해야 한다.
+
+미리 압축 파일 만들기 (빌드 후 한 번):
+    python -m app.static_assets
+    python -m app.static_assets path/to/static
+"""
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 선택 의존성
+    brotli = None
+
+INDEX_FILE = "index.html"
+# 선호 순서 (앞쪽일수록 먼저 선택)
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# 미리 압축할 가치가 있는 파일 (이미 압축된 이미지/폰트 제외)
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest"}
+MIN_COMPRESS_BYTES = 512
+
+
+def _accepted_encodings(header: Optional[str]) -> List[str]:
+    """Accept-Encoding → 서버 선호 순서의 사용 가능 인코딩 (q=0 제외)"""
+    if not header:
+        return []
+    accepted = set()
+    for part in header.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    return [encoding for encoding, _ in ENCODINGS if encoding in accepted or "*" in accepted]
+
+
+class Asset:
+    """색인된 파일 하나 (인코딩별 변형 포함)"""
+
+    __slots__ = ("media_type", "cache_control", "files", "bodies")
+
+    def __init__(self, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        # 인코딩("identity", "br", "gzip") → (경로, stat, ETag)
+        self.files: Dict[str, Tuple[Path, os.stat_result, str]] = {}
+        # 메모리에 보관하는 경우 인코딩 → (본문, ETag)
+        self.bodies: Optional[Dict[str, Tuple[bytes, str]]] = None
+
+    @property
+    def encodings(self) -> List[str]:
+        return list(self.bodies if self.bodies is not None else self.files)
+
+
+class StaticAssets:
+    def __init__(self, root: Path):
+        self.root = root
+        self.assets: Dict[str, Asset] = {}
+        self.index: Optional[Asset] = None
+        self.scan()
+
+    def scan(self):
+        assets: Dict[str, Asset] = {}
+        variant_suffixes = {suffix for _, suffix in ENCODINGS}
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file() or path.suffix in variant_suffixes:
+                continue
+            relative = path.relative_to(self.root).as_posix()
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            cache_control = IMMUTABLE if relative.startswith("assets/") else REVALIDATE
+            asset = Asset(media_type, cache_control)
+            for encoding, candidate in [("identity", path)] + [(e, path.with_name(path.name + s)) for e, s in ENCODINGS]:
+                if candidate.is_file():
+                    stat = candidate.stat()
+                    asset.files[encoding] = (candidate, stat, f'"{stat.st_size:x}-{stat.st_mtime_ns:x}-{encoding}"')
+            assets[relative] = asset
+
+        index = assets.get(INDEX_FILE)
+        if index is not None:
+            index.bodies = self._load_in_memory(index)
+        self.assets = assets
+        self.index = index
+
+    @staticmethod
+    def _load_in_memory(asset: Asset) -> Dict[str, Tuple[bytes, str]]:
+        """파일 변형을 메모리로 읽고, 없는 압축본은 만들어 둠"""
+        contents = {encoding: path.read_bytes() for encoding, (path, _, _) in asset.files.items()}
+        identity = contents["identity"]
+        if "gzip" not in contents:
+            contents["gzip"] = gzip.compress(identity, 9, mtime=0)
+        if "br" not in contents and brotli is not None:
+            contents["br"] = brotli.compress(identity)
+        digest = hashlib.md5(identity, usedforsecurity=False).hexdigest()[:16]
+        return {encoding: (body, f'"{digest}-{encoding}"') for encoding, body in contents.items()}
+
+    def response(self, request: Request, path: str) -> Response:
+        asset = self.assets.get(path.lstrip("/")) if path else self.index
+        if asset is None:
+            # 해시 파일명이 없으면 이전 배포를 참조하는 것이므로 index.html 대신 404
+            if path.startswith(("assets/", "api/")) or self.index is None:
+                return Response(status_code=404)
+            asset = self.index
+
+        available = asset.encodings
+        accepted = _accepted_encodings(request.headers.get("accept-encoding"))
+        encoding = next((e for e in accepted if e in available), "identity")
+        headers = {"Cache-Control": asset.cache_control}
+        if len(available) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        if asset.bodies is not None:
+            body, etag = asset.bodies[encoding]
+        else:
+            file_path, stat, etag = asset.files[encoding]
+        headers["ETag"] = etag
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+        if asset.bodies is not None:
+            return Response(body, media_type=asset.media_type, headers=headers)
+        # stat_result를 넘기면 FileResponse가 파일을 다시 stat하지 않음
+        return FileResponse(file_path, stat_result=stat, media_type=asset.media_type, headers=headers)
+
+
+def precompress(root: Path) -> int:
+    """압축할 만한 파일마다 .gz (brotli가 설치되어 있으면 .br도) 생성. 만든 파일 수 반환"""
+    created = 0
+    variant_suffixes = {suffix for _, suffix in ENCODINGS}
+    for path in sorted(root.rglob("*")):
+        if not path.is_file() or path.suffix in variant_suffixes or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_BYTES:
+            continue
+        variants = [(".gz", gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(data, quality=11)))
+        for suffix, compressed in variants:
+            # 압축해도 작아지지 않으면 만들지 않음
+            if len(compressed) < len(data):
+                path.with_name(path.name + suffix).write_bytes(compressed)
+                created += 1
+    return created
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.static_assets", description="정적 파일 미리 압축 (.gz / .br)")
+    parser.add_argument("root", nargs="?", default=str(Path(__file__).parent.parent / "static"), help="빌드 결과 디렉터리")
+    args = parser.parse_args(argv)
+    root = Path(args.root)
+    if not root.is_dir():
+        parser.error(f"디렉터리가 없습니다: {root}")
+    created = precompress(root)
+    print(f"{created} compressed files written{'' if brotli is not None else ' (brotli 미설치: .gz만 생성)'}")
+
+
+if __name__ == "__main__":
+    main()
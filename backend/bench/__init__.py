@@ -0,0 +1,15 @@
+"""
+Bench - 재현 가능한 부하 테스트 / 벤치마크
+
+앱을 같은 프로세스에서 띄우고(별도 서버 없음) 로컬 SQLite DB와 fake LLM 제공자를 사용한다.
+시드를 고정한 합성 데이터셋(app/seed.py) 위에서 시나리오 혼합(목록/검색/상세/대출·반납 경합/리뷰/AI 챗)을
+지정한 동시성으로 실행하고, 작업별 p50/p95/p99 지연, 처리량, 요청당 쿼리 수를 JSON으로 남긴다.
+
+사용법 (backend 디렉터리에서):
+    python -m bench --mix mixed --concurrency 16 --requests 2000
+    python -m bench --mix browse --duration 30 --out results/browse.json
+    python -m bench --compare results/before.json results/after.json
+    python -m bench.serialization   # 목록 응답 직렬화 경로만 비교 (DB 없음)
+
+httpx가 필요하다 (pip install httpx).
+"""
@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _configure(args):
+    """앱 설정은 import 시점에 읽히므로 app 모듈을 불러오기 전에 환경 변수로 지정"""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["DEBUG"] = "false"
+    if not args.jobs:
+        # 주기 작업(집계 재계산 등)이 측정 중에 끼어들지 않도록 작업 실행기를 끔
+        os.environ["JOB_WORKERS"] = "0"
+
+
+async def _run(args) -> dict:
+    from app.database import SessionLocal, engine, init_db
+    from app.db_models import Book, User
+    from app.main import app
+    from app.seed import generate
+    from bench import runner
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if db.query(Book).count() == 0:
+            created = generate(db, books=args.books, users=args.users, loans=args.loans, reviews=args.reviews, seed=args.seed)
+            print(f"seeded {created}", file=sys.stderr)
+        data = {"books": db.query(Book).count(), "users": db.query(User).count()}
+    finally:
+        db.close()
+
+    runner.install_query_counter(engine)
+    async with app.router.lifespan_context(app):
+        result = await runner.run(
+            app, args.mix, args.concurrency, data,
+            requests=args.requests, duration=args.duration, warmup=args.warmup, seed=args.seed
+        )
+    return {
+        "meta": {
+            "label": args.label,
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "dataset": {"books": args.books, "users": args.users, "loans": args.loans, "reviews": args.reviews},
+            "database": engine.dialect.name,
+            "llm_latency_ms": args.llm_latency_ms,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "result": result,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="앱 내장 부하 테스트 (SQLite + fake LLM)")
+    parser.add_argument("--mix", default="mixed", help="시나리오 혼합 (browse, mixed, contention, chat)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 가상 사용자 수")
+    parser.add_argument("--requests", type=int, default=2000, help="실행할 시나리오 수 (--duration과 함께 쓰면 먼저 도달하는 쪽)")
+    parser.add_argument("--duration", type=float, default=None, help="측정 시간 (초)")
+    parser.add_argument("--warmup", type=int, default=100, help="측정 전 워밍업 시나리오 수")
+    parser.add_argument("--seed", type=int, default=42, help="데이터셋/요청 순서 시드")
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--loans", type=int, default=4000, help="과거 대출 이력 수")
+    parser.add_argument("--reviews", type=int, default=3000)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="fake LLM 응답 지연")
+    parser.add_argument("--database-url", default=None, help="기본: 임시 디렉터리의 새 SQLite 파일")
+    parser.add_argument("--jobs", action="store_true", help="백그라운드 작업 실행기도 함께 실행")
+    parser.add_argument("--label", default="", help="결과에 남길 이름")
+    parser.add_argument("--out", help="결과 JSON 저장 경로 (생략 시 표준 출력)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="두 결과 JSON 비교")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="--compare: 허용하는 p95 증가율 (넘으면 종료 코드 1)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        from bench.runner import compare
+        before, after = (json.loads(Path(path).read_text(encoding="utf-8")) for path in args.compare)
+        regressions = compare(before, after, args.max_regression)
+        if regressions:
+            print(f"p95 regression > {args.max_regression:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.database_url is None:
+        args.database_url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='ibd-bench-')) / 'bench.db'}"
+    _configure(args)
+
+    from bench.scenarios import MIXES
+    if args.mix not in MIXES:
+        parser.error(f"--mix: {', '.join(sorted(MIXES))} 중 하나")
+
+    report = asyncio.run(_run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(text, encoding="utf-8")
+        print(f"saved {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
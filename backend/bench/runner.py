@@ -0,0 +1,166 @@
+"""
+부하 실행기 - 앱을 ASGI로 직접 호출하며 요청별 지연과 쿼리 수를 기록
+"""
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from bench.scenarios import MIXES, SCENARIOS
+
+# 현재 요청이 실행한 쿼리 수 (요청 처리 스레드에도 컨텍스트가 복사되므로 리스트 하나를 공유)
+_query_counter: ContextVar[Optional[List[int]]] = ContextVar("bench_query_counter", default=None)
+
+
+def install_query_counter(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.exceptions: Counter = Counter()
+
+    def add(self, name: str, status: int, latency_ms: float, queries: int):
+        self.latencies[name].append(latency_ms)
+        self.queries[name].append(queries)
+        self.statuses[name][status] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        operations = {}
+        for name in sorted(self.latencies):
+            latencies = sorted(self.latencies[name])
+            queries = self.queries[name]
+            statuses = self.statuses[name]
+            operations[name] = {
+                "count": len(latencies),
+                "errors": sum(n for code, n in statuses.items() if code >= 500),
+                "status": {str(code): n for code, n in sorted(statuses.items())},
+                "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0,
+                "latency_ms": {
+                    "p50": round(percentile(latencies, 50), 3),
+                    "p95": round(percentile(latencies, 95), 3),
+                    "p99": round(percentile(latencies, 99), 3),
+                    "mean": round(sum(latencies) / len(latencies), 3),
+                    "max": round(latencies[-1], 3),
+                },
+                "queries_per_request": {
+                    "mean": round(sum(queries) / len(queries), 2),
+                    "max": max(queries),
+                },
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        return {
+            "requests": total,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+            "exceptions": dict(self.exceptions),
+            "operations": operations,
+        }
+
+
+async def run(
+    app,
+    mix: str,
+    concurrency: int,
+    data: Dict[str, int],
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+    warmup: int = 0,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """
+    concurrency개의 가상 사용자가 mix 가중치대로 시나리오를 실행.
+    requests(시나리오 실행 수) 또는 duration(초) 중 먼저 도달하는 쪽에서 멈춘다.
+    """
+    weights = MIXES[mix]
+    names = list(weights)
+    recorder = Recorder()
+    recording = False
+    remaining = {"warmup": warmup, "scenarios": requests if requests is not None else float("inf")}
+    deadline: Optional[float] = None
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+
+        async def call(name: str, method: str, url: str, **kwargs) -> httpx.Response:
+            counter = [0]
+            token = _query_counter.set(counter)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            finally:
+                _query_counter.reset(token)
+            if recording:
+                recorder.add(name, response.status_code, (time.perf_counter() - started) * 1000, counter[0])
+            return response
+
+        def take(key: str) -> bool:
+            if remaining[key] <= 0:
+                return False
+            remaining[key] -= 1
+            return True
+
+        async def user(index: int, key: str):
+            # 가상 사용자마다 고정 시드 → 같은 설정이면 같은 요청 순서
+            rng = random.Random(seed * 1000 + index)
+            while take(key):
+                if deadline is not None and time.perf_counter() > deadline:
+                    return
+                scenario = SCENARIOS[rng.choices(names, weights=[weights[n] for n in names])[0]]
+                try:
+                    await scenario(call, rng, data)
+                except Exception as e:
+                    recorder.exceptions[type(e).__name__] += 1
+
+        if warmup:
+            await asyncio.gather(*(user(i, "warmup") for i in range(concurrency)))
+
+        recording = True
+        started = time.perf_counter()
+        if duration:
+            deadline = started + duration
+        await asyncio.gather(*(user(i, "scenarios") for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return recorder.summary(elapsed)
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any], max_regression: float) -> List[str]:
+    """두 결과의 작업별 p95/처리량 비교. max_regression(비율)보다 느려진 작업 목록 반환"""
+    regressions = []
+    print(f"{'operation':<20}{'p95 before':>12}{'p95 after':>12}{'change':>9}{'qpr before':>12}{'qpr after':>11}")
+    for name, result in after["result"]["operations"].items():
+        previous = before["result"]["operations"].get(name)
+        if previous is None:
+            continue
+        p95_before, p95_after = previous["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (p95_after - p95_before) / p95_before if p95_before else 0.0
+        print(
+            f"{name:<20}{p95_before:>12.2f}{p95_after:>12.2f}{change:>+9.1%}"
+            f"{previous['queries_per_request']['mean']:>12.2f}{result['queries_per_request']['mean']:>11.2f}"
+        )
+        if change > max_regression:
+            regressions.append(name)
+    print(f"throughput: {before['result']['throughput_rps']} → {after['result']['throughput_rps']} rps")
+    return regressions
@@ -0,0 +1,89 @@
+"""
+벤치마크 시나리오 - 사용자 행동 하나 = HTTP 요청 한 개 이상
+각 시나리오는 runner가 넘겨주는 call(작업 이름, 메서드, 경로, ...)로 요청을 보내고, 지연/쿼리 수는 runner가 요청 단위로 기록한다.
+"""
+import random
+from typing import Awaitable, Callable, Dict
+
+from app.seed import CATEGORIES, WORDS
+from app.security import create_access_token
+
+Call = Callable[..., Awaitable]
+Scenario = Callable[[Call, random.Random, Dict[str, int]], Awaitable[None]]
+
+# 경합 시나리오에서 모두가 노리는 인기 도서 수
+HOT_BOOKS = 5
+
+CHAT_MESSAGES = [
+    "프로그래밍 책 추천해줘",
+    "클린 코드 재고 있어?",
+    "내 대출 목록 보여줘",
+    "요즘 인기 있는 데이터 책은?",
+]
+
+
+def _popular_book(rng: random.Random, data: Dict[str, int]) -> int:
+    # 앞쪽 ID일수록 자주 조회 (데이터셋의 대출 분포와 같은 방향)
+    return min(int(rng.paretovariate(1.2)), data["books"])
+
+
+async def browse(call: Call, rng: random.Random, data: Dict[str, int]):
+    params = {"skip": rng.randint(0, 20) * 20, "limit": 20}
+    if rng.random() < 0.3:
+        params["category"] = rng.choice(CATEGORIES)
+    await call("browse", "GET", "/api/books/", params=params)
+
+
+async def search(call: Call, rng: random.Random, data: Dict[str, int]):
+    await call("search", "GET", "/api/books/", params={"search": rng.choice(WORDS), "limit": 20})
+
+
+async def detail(call: Call, rng: random.Random, data: Dict[str, int]):
+    book_id = _popular_book(rng, data)
+    await call("book_detail", "GET", f"/api/books/{book_id}")
+    await call("book_reviews", "GET", f"/api/reviews/book/{book_id}")
+    await call("book_review_stats", "GET", f"/api/reviews/book/{book_id}/stats")
+
+
+async def borrow_return(call: Call, rng: random.Random, data: Dict[str, int]):
+    """소수의 인기 도서를 두고 대출 후 바로 반납 (재고 행 잠금 경합)"""
+    user_id = rng.randint(1, data["users"])
+    response = await call("borrow", "POST", "/api/loans/borrow", json={"user_id": user_id, "book_id": rng.randint(1, HOT_BOOKS)})
+    body = response.json() if response.status_code == 200 else {}
+    if body.get("success"):
+        await call("return", "POST", f"/api/loans/{body['loan']['loan_id']}/return")
+
+
+async def review(call: Call, rng: random.Random, data: Dict[str, int]):
+    # 이미 리뷰한 조합이면 400 (정상 업무 오류로 집계)
+    await call("review", "POST", "/api/reviews/", json={
+        "user_id": rng.randint(1, data["users"]),
+        "book_id": _popular_book(rng, data),
+        "rating": rng.randint(1, 5),
+        "content": " ".join(rng.choices(WORDS, k=10)),
+    })
+
+
+async def chat(call: Call, rng: random.Random, data: Dict[str, int]):
+    # 챗봇은 토큰의 사용자로 대출 도구를 실행하므로 회원 토큰을 발급해 보냄
+    token = create_access_token(rng.randint(1, data["users"]), "MEMBER")["access_token"]
+    await call("chat", "POST", "/api/ai/chat", json={"message": rng.choice(CHAT_MESSAGES)},
+               headers={"Authorization": f"Bearer {token}"})
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "browse": browse,
+    "search": search,
+    "detail": detail,
+    "borrow_return": borrow_return,
+    "review": review,
+    "chat": chat,
+}
+
+# 시나리오 혼합 (가중치)
+MIXES: Dict[str, Dict[str, float]] = {
+    "browse": {"browse": 5, "search": 3, "detail": 4},
+    "mixed": {"browse": 4, "search": 3, "detail": 3, "borrow_return": 2, "review": 1, "chat": 1},
+    "contention": {"borrow_return": 8, "detail": 2},
+    "chat": {"chat": 1},
+}
@@ -0,0 +1,122 @@
+"""
+직렬화 경로 비교 - response_model 검증 + 표준 json vs 직접 dict 변환 + orjson
+DB 없이 메모리의 ORM 객체로 같은 목록을 두 라우트에서 반환해 요청당 지연만 비교한다.
+
+사용법:
+    python -m bench.serialization
+    python -m bench.serialization --rows 100 --description-chars 2000 --iterations 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+def _make_books(rows: int, description_chars: int, seed: int):
+    from app.db_models import Book as BookModel
+    from app.seed import CATEGORIES, WORDS
+
+    rng = random.Random(seed)
+    books = []
+    for book_id in range(1, rows + 1):
+        description = ""
+        while len(description) < description_chars:
+            description += rng.choice(WORDS) + " "
+        books.append(BookModel(
+            book_id=book_id,
+            isbn=f"979{book_id:010d}",
+            title=" ".join(rng.choices(WORDS, k=4)),
+            author=" ".join(rng.choices(WORDS, k=2)),
+            publisher="출판사",
+            published_year=rng.randint(1980, 2025),
+            category=rng.choice(CATEGORIES),
+            description=description[:description_chars],
+            stock_quantity=rng.randint(0, 5),
+            cover_image=None,
+            created_at=datetime(2025, 1, 1) + timedelta(minutes=book_id),
+        ))
+    return books
+
+
+def _build_app(books):
+    from fastapi import FastAPI
+
+    from app.models import Book as BookSchema
+    from app.serialization import FastJSONResponse, dump_rows
+
+    app = FastAPI()
+
+    @app.get("/current", response_model=list[BookSchema])
+    async def current():
+        return books
+
+    @app.get("/fast", response_model=list[BookSchema], response_class=FastJSONResponse)
+    async def fast():
+        return FastJSONResponse(dump_rows(BookSchema, books))
+
+    return app
+
+
+async def _measure(app, iterations: int, warmup: int):
+    import httpx
+
+    from bench.runner import percentile
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        bodies = {}
+        for path in ("current", "fast"):
+            for _ in range(warmup):
+                await client.get(f"/{path}")
+            latencies = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                response = await client.get(f"/{path}")
+                latencies.append((time.perf_counter() - started) * 1000)
+            bodies[path] = response.json()
+            latencies.sort()
+            results[path] = {
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "mean": round(sum(latencies) / len(latencies), 3),
+                "bytes": len(response.content),
+            }
+    if bodies["current"] != bodies["fast"]:
+        raise SystemExit("두 경로의 응답 본문이 다릅니다")
+    results["speedup_p50"] = round(results["current"]["p50"] / results["fast"]["p50"], 2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.serialization", description="목록 응답 직렬화 경로 비교")
+    parser.add_argument("--rows", type=int, default=100, help="응답 한 번의 도서 수")
+    parser.add_argument("--description-chars", type=int, default=2000, help="도서 설명 길이")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    # 설정 로딩 시 MySQL 드라이버가 필요 없도록 (DB에는 연결하지 않음)
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+    from app import serialization
+
+    books = _make_books(args.rows, args.description_chars, args.seed)
+    results = asyncio.run(_measure(_build_app(books), args.iterations, args.warmup))
+    results["meta"] = {
+        "rows": args.rows,
+        "description_chars": args.description_chars,
+        "iterations": args.iterations,
+        "encoder": "orjson" if serialization.orjson is not None else "json",
+    }
+    json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,7 @@ if not admin:
     sys.exit(1)
 
 admin_id = admin['user']['user_id']
+admin_token = admin['access_token']
 print(f"Logged in as Admin (ID: {admin_id})")
 
 member_email = f"verify_test_{int(time.time())}@example.com"
@@ -57,7 +58,7 @@ print(f"Member ID: {member_id}")
 
 # 2. Set Config (Limit 2)
 print("\n--- Setting Loan Limit to 2 ---")
-res = make_request("PUT", f"{API_URL}/admin/config/max_loan_limit", {"value": "2"}, {"x-user-id": str(admin_id)})
+res = make_request("PUT", f"{API_URL}/admin/config/max_loan_limit", {"value": "2"}, {"Authorization": f"Bearer {admin_token}"})
 if res:
     print(f"Config updated: {res['value']}")
 
@@ -98,7 +99,7 @@ else:
 
 # 4. Set Config (Limit 3)
 print("\n--- Setting Loan Limit to 3 ---")
-res = make_request("PUT", f"{API_URL}/admin/config/max_loan_limit", {"value": "3"}, {"x-user-id": str(admin_id)})
+res = make_request("PUT", f"{API_URL}/admin/config/max_loan_limit", {"value": "3"}, {"Authorization": f"Bearer {admin_token}"})
 if res:
     print(f"Config updated: {res['value']}")
 
@@ -38,7 +38,7 @@ function AuthModal({ isOpen, onClose, onLogin }) {
         })
         const data = await res.json()
         if (!res.ok) throw new Error(data.detail || '로그인 실패')
-        onLogin(data.user)
+        onLogin({ ...data.user, access_token: data.access_token })
         onClose()
       } else {
         const res = await fetch(`${API_URL}/users/`, {
@@ -324,7 +324,7 @@ function AdminConfigModal({ isOpen, onClose, user }) {
     try {
       const res = await fetch(`${API_URL}/admin/config`, {
         headers: {
-          'x-user-id': user?.user_id?.toString()
+          'Authorization': `Bearer ${user?.access_token}`
         }
       })
       if (!res.ok) throw new Error('설정 로드 실패')
@@ -342,7 +342,7 @@ function AdminConfigModal({ isOpen, onClose, user }) {
         method: 'PUT',
         headers: {
           'Content-Type': 'application/json',
-          'x-user-id': user?.user_id?.toString()
+          'Authorization': `Bearer ${user?.access_token}`
         },
         body: JSON.stringify({ value: newValue })
       })
@@ -647,6 +647,20 @@ function BooksSection({ user }) {
     fetchBooks()
   }, [searchTerm])
 
+  // 목록에 보이는 도서의 재고 변경을 실시간으로 반영 (다시 조회하지 않음)
+  const bookIds = books.map(b => b.book_id).join(',')
+  useEffect(() => {
+    if (!bookIds) return
+    const source = new EventSource(`${API_URL}/availability/stream?ids=${bookIds}`)
+    const applyStock = (e) => {
+      const updates = Object.fromEntries(JSON.parse(e.data).map(u => [u.book_id, u.stock_quantity]))
+      setBooks(prev => prev.map(b => (b.book_id in updates ? { ...b, stock_quantity: updates[b.book_id] } : b)))
+    }
+    source.addEventListener('snapshot', applyStock)
+    source.addEventListener('stock', applyStock)
+    return () => source.close()
+  }, [bookIds])
+
   const fetchBooks = async () => {
     try {
       const params = new URLSearchParams()
@@ -1496,15 +1510,17 @@ function Chatbot({ user }) {
     try {
       // Debug: 전송되는 user_id 확인
       console.log('🔍 [Chatbot] user object:', user)
-      console.log('🔍 [Chatbot] user_id being sent:', user?.user_id)
+      console.log('🔍 [Chatbot] token being sent:', Boolean(user?.access_token))
 
+      // 서버는 토큰으로 사용자를 확인 (대출/반납 도구, 사용자별 요청 제한)
+      const headers = { 'Content-Type': 'application/json' }
+      if (user?.access_token) {
+        headers['Authorization'] = `Bearer ${user.access_token}`
+      }
       const res = await fetch(`${API_URL}/ai/chat`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          message: userMessage,
-          user_id: user?.user_id || null
-        })
+        headers,
+        body: JSON.stringify({ message: userMessage })
       })
 
       if (res.ok) {
@@ -1656,6 +1672,12 @@ function App() {
   }
 
   const handleLogout = () => {
+    if (user?.access_token) {
+      fetch(`${API_URL}/users/logout`, {
+        method: 'POST',
+        headers: { 'Authorization': `Bearer ${user.access_token}` }
+      }).catch(() => {})
+    }
     setUser(null)
     localStorage.removeItem('user')
   }